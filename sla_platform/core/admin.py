@@ -7,7 +7,13 @@ from .models import (
     SLAContract,
     Ticket,
     EscalationRule,
-    EscalationLog
+    EscalationLog,
+    BusinessCalendar,
+    WorkingHours,
+    Holiday,
+    OutboundEmail,
+    AuditEvent,
+    ArchivedTicket
 )
 
 admin.site.site_header = "SLA Enterprise Control Panel"
@@ -18,7 +24,7 @@ admin.site.index_title = "SLA Governance Dashboard"
 class EngineerInline(admin.TabularInline):
     model = EngineerProfile
     extra = 0
-    fields = ('user', 'is_team_lead')
+    fields = ('user', 'is_team_lead', 'capacity', 'skills')
     show_change_link = True
 
 
@@ -58,6 +64,45 @@ class TicketAdmin(admin.ModelAdmin):
 
 
 
+class WorkingHoursInline(admin.TabularInline):
+    model = WorkingHours
+    extra = 0
+
+
+class HolidayInline(admin.TabularInline):
+    model = Holiday
+    extra = 0
+
+
+@admin.register(BusinessCalendar)
+class BusinessCalendarAdmin(admin.ModelAdmin):
+    list_display = ('name', 'timezone', 'client', 'department')
+    inlines = [WorkingHoursInline, HolidayInline]
+
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'event_type', 'ticket_id', 'actor_id', 'payload')
+    list_filter = ('event_type',)
+    search_fields = ('ticket_id',)
+    date_hierarchy = 'created_at'
+
+
+@admin.register(ArchivedTicket)
+class ArchivedTicketAdmin(admin.ModelAdmin):
+    list_display = ('ticket_id', 'client_id', 'priority', 'status', 'is_deleted', 'created_at', 'archived_at')
+    list_filter = ('status', 'priority', 'is_deleted')
+    search_fields = ('ticket_id',)
+
+
+
 # Simple Registrations
 admin.site.register(SLAContract)
 admin.site.register(EscalationRule)
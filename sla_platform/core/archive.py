@@ -0,0 +1,243 @@
+"""
+Cold storage for old resolved and soft-deleted tickets (ArchivedTicket).
+
+archive_tickets() moves tickets resolved more than
+TICKET_ARCHIVE_RESOLVED_DAYS ago, and tickets soft-deleted more than
+TICKET_ARCHIVE_DELETED_DAYS ago, out of the hot table in batches. Each
+batch is one transaction: the ticket rows and their escalation,
+notification and legacy audit rows are copied into ArchivedTicket.data
+with one bulk_create and then deleted. AuditEvent rows stay where they
+are, since the journal only stores ticket ids.
+
+Governance rollups keep the archived tickets' contribution: the deletes
+do not go through the rollup or engineer load signals (archived tickets
+carry no load anyway), and rebuild_rollups() counts the archive too.
+Single-ticket lookups in the views go through get_ticket(), which falls
+back to a read-only copy from the archive, or get_ticket_for_update(),
+which moves an archived ticket back with restore_ticket() before it is
+changed. The change feed serves archived rows as tombstones until they
+are restored.
+"""
+
+import datetime
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    ArchivedTicket,
+    EscalationLog,
+    Notification,
+    Ticket,
+    TicketAudit,
+    TicketAuditLog,
+)
+from .changes import stamp_values
+
+
+RESOLVED_DAYS = getattr(settings, "TICKET_ARCHIVE_RESOLVED_DAYS", 365)
+DELETED_DAYS = getattr(settings, "TICKET_ARCHIVE_DELETED_DAYS", 30)
+
+DEFAULT_BATCH_SIZE = 500
+
+# data key -> (model, timestamp field that auto_now_add would overwrite)
+RELATED = {
+    "escalations": (EscalationLog, "escalated_at"),
+    "notifications": (Notification, "created_at"),
+    "audit_log": (TicketAuditLog, "changed_at"),
+    "audit": (TicketAudit, "timestamp"),
+}
+
+# Columns copied out of `data` onto ArchivedTicket
+SUMMARY_FIELDS = (
+    "client_id",
+    "department_id",
+    "assigned_to_id",
+    "priority",
+    "status",
+    "breached",
+    "escalation_count",
+    "risk_level",
+    "is_deleted",
+    "created_at",
+    "resolved_at",
+)
+
+_moving = ContextVar("core_archive_moving", default=False)
+
+
+def moving_tickets():
+    """True while tickets are moved to or from the archive (signals skip)."""
+    return _moving.get()
+
+
+@contextmanager
+def _moving_block():
+    token = _moving.set(True)
+    try:
+        yield
+    finally:
+        _moving.reset(token)
+
+
+def _attnames(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _json_row(row):
+    # isoformat() keeps the microseconds that DjangoJSONEncoder would drop
+    return {
+        key: value.isoformat() if isinstance(value, datetime.datetime) else value
+        for key, value in row.items()
+    }
+
+
+def archivable(resolved_before=None, deleted_before=None):
+    now = timezone.now()
+    if resolved_before is None:
+        resolved_before = now - timezone.timedelta(days=RESOLVED_DAYS)
+    if deleted_before is None:
+        deleted_before = now - timezone.timedelta(days=DELETED_DAYS)
+
+    return Ticket.all_objects.filter(
+        Q(is_deleted=False, status="RESOLVED", resolved_at__lt=resolved_before)
+        | Q(is_deleted=True, deleted_at__lt=deleted_before)
+    )
+
+
+# ---------------- ARCHIVING ---------------- #
+
+def _archive_batch(candidates, ids):
+    rows = list(
+        candidates.filter(id__in=ids).select_for_update().values(*_attnames(Ticket))
+    )
+    if not rows:
+        return 0
+
+    ids = [row["id"] for row in rows]
+    related = {row["id"]: {key: [] for key in RELATED} for row in rows}
+
+    for key, (model, timestamp_field) in RELATED.items():
+        for related_row in model.objects.filter(ticket_id__in=ids).order_by("id").values(*_attnames(model)):
+            related[related_row["ticket_id"]][key].append(_json_row(related_row))
+
+    ArchivedTicket.objects.bulk_create([
+        ArchivedTicket(
+            ticket_id=row["id"],
+            data={"ticket": _json_row(row), **related[row["id"]]},
+            **{field: row[field] for field in SUMMARY_FIELDS}
+        )
+        for row in rows
+    ], batch_size=DEFAULT_BATCH_SIZE)
+
+    with _moving_block():
+        for model, timestamp_field in RELATED.values():
+            model.objects.filter(ticket_id__in=ids).delete()
+        Ticket.all_objects.filter(id__in=ids).delete()
+
+    return len(rows)
+
+
+def archive_tickets(resolved_before=None, deleted_before=None,
+                    batch_size=DEFAULT_BATCH_SIZE, limit=None):
+    """Move archivable tickets in batches; returns how many were moved."""
+    candidates = archivable(resolved_before, deleted_before)
+    archived = 0
+    last_id = 0
+
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        ids = list(
+            candidates.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:size]
+        )
+        if not ids:
+            break
+
+        with transaction.atomic():
+            archived += _archive_batch(candidates, ids)
+        last_id = ids[-1]
+
+    return archived
+
+
+# ---------------- READ-THROUGH ---------------- #
+
+def _from_data(model, values):
+    """Unsaved instance from a JSON row, with values converted back."""
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    return model(**{
+        attname: fields[attname].to_python(value)
+        for attname, value in values.items()
+        if attname in fields
+    })
+
+
+def as_ticket(archived):
+    """Read-only Ticket built from an archive row; never save() it."""
+    ticket = _from_data(Ticket, archived.data["ticket"])
+    ticket._state.adding = False
+    ticket.is_archived = True
+    return ticket
+
+
+def get_ticket(ticket_id, **filters):
+    """
+    A ticket by id from the hot table, else from the archive, else None.
+    `filters` (e.g. client_id=...) apply to both; archived tickets come
+    back read-only (ticket.is_archived).
+    """
+    ticket = Ticket.all_objects.filter(id=ticket_id, **filters).first()
+    if ticket is not None:
+        return ticket
+
+    archived = ArchivedTicket.objects.filter(ticket_id=ticket_id, **filters).first()
+    return as_ticket(archived) if archived else None
+
+
+def get_ticket_for_update(ticket_id, **filters):
+    """
+    Like get_ticket(), but the row is locked and an archived ticket is
+    restored first, so the result can be saved. Call inside
+    transaction.atomic().
+    """
+    ticket = Ticket.all_objects.select_for_update().filter(id=ticket_id, **filters).first()
+    if ticket is not None:
+        return ticket
+
+    archived = ArchivedTicket.objects.select_for_update().filter(ticket_id=ticket_id, **filters).first()
+    return restore_ticket(archived) if archived else None
+
+
+def _restore_rows(model, rows, timestamp_field):
+    instances = [_from_data(model, values) for values in rows]
+    if not instances:
+        return
+
+    # auto_now_add stamps the restore time on insert; put the originals back
+    timestamps = {instance.pk: getattr(instance, timestamp_field) for instance in instances}
+    model._base_manager.bulk_create(instances)
+    for pk, value in timestamps.items():
+        model._base_manager.filter(pk=pk).update(**{timestamp_field: value})
+
+
+def restore_ticket(archived):
+    """
+    Move a ticket and its related rows back into the hot table, in the
+    caller's transaction. Returns the ticket freshly loaded.
+    """
+    with transaction.atomic():
+        # bulk_create sends no signals, so the rollups keep their counts
+        _restore_rows(Ticket, [archived.data["ticket"]], "created_at")
+        # Back in the change feed as a fresh change
+        Ticket.all_objects.filter(id=archived.ticket_id).update(**stamp_values())
+
+        for key, (model, timestamp_field) in RELATED.items():
+            _restore_rows(model, archived.data.get(key, ()), timestamp_field)
+
+        archived.delete()
+
+    return Ticket.all_objects.get(id=archived.ticket_id)
@@ -0,0 +1,249 @@
+"""
+Ticket assignment policies.
+
+Candidates come from the per-department roster snapshot in sla_cache and
+their live load from one EngineerLoad query; a strategy ranks the eligible
+engineers (below their capacity) and the first one whose counter row can
+be locked still under capacity wins. When everybody is saturated the ticket
+is left unassigned in its department's queue, which drain_queue() works off
+as soon as an engineer's load drops. The active strategy is
+settings.TICKET_ASSIGNMENT_STRATEGY.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from .models import EngineerLoad, Ticket
+from .engineer_load import LOAD_STATUSES
+from .notifications import buffered_notifications, notify
+from .outbox import queue_email
+from . import audit
+from .risk_engine import PRIORITY_WEIGHTS
+from .sla_cache import get_assignment_candidates
+
+
+DEFAULT_STRATEGY = "least_loaded"
+
+# 🔥 Category → Department mapping (tickets are routed to that department)
+CATEGORY_DEPT_MAP = {
+    'NETWORK': 'Network Operations',
+    'CLOUD': 'Cloud Infrastructure',
+    'SERVER': 'Server Administration',
+    'DATABASE': 'Database Administration',
+    'DEVOPS': 'DevOps',
+    'CYBER': 'Cybersecurity',
+    'RISK': 'Risk & Compliance',
+    'APP': 'Application Support',
+    'AI': 'AI/ML Operations',
+    'DATA': 'Data Engineering',
+    'SRE': 'SRE (Site Reliability Engineering)',
+    'INCIDENT': 'Incident Response Team',
+}
+
+_NEVER = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+
+
+# ---------------- STRATEGIES ---------------- #
+
+class AssignmentStrategy:
+    """
+    Orders eligible candidates, best first. `loads` maps user_id to
+    (active_tickets, weighted_load, last_assigned_at).
+    """
+
+    def rank(self, candidates, loads, priority, category):
+        raise NotImplementedError
+
+
+class LeastLoadedStrategy(AssignmentStrategy):
+    """Fewest active tickets wins (the original balancer)."""
+
+    def rank(self, candidates, loads, priority, category):
+        return sorted(
+            candidates,
+            key=lambda candidate: (loads[candidate.user_id][0], candidate.user_id)
+        )
+
+
+class PriorityWeightedStrategy(AssignmentStrategy):
+    """Lowest priority-weighted load relative to capacity after taking the ticket."""
+
+    def rank(self, candidates, loads, priority, category):
+        weight = PRIORITY_WEIGHTS.get(priority, 1)
+        return sorted(
+            candidates,
+            key=lambda candidate: (
+                (loads[candidate.user_id][1] + weight) / max(candidate.capacity, 1),
+                candidate.user_id
+            )
+        )
+
+
+class RoundRobinStrategy(AssignmentStrategy):
+    """Engineer assigned longest ago goes next."""
+
+    def rank(self, candidates, loads, priority, category):
+        return sorted(
+            candidates,
+            key=lambda candidate: (loads[candidate.user_id][2] or _NEVER, candidate.user_id)
+        )
+
+
+class SkillMatchStrategy(AssignmentStrategy):
+    """
+    Engineers listing the ticket category first, then generalists (no
+    skills listed), each least-loaded first. Specialists in other
+    categories are only used when nobody else exists.
+    """
+
+    def rank(self, candidates, loads, priority, category):
+        skilled = [c for c in candidates if category in c.skills]
+        generalists = [c for c in candidates if not c.skills]
+
+        pool = skilled + generalists
+        if not pool:
+            pool = list(candidates)
+
+        return sorted(
+            pool,
+            key=lambda candidate: (
+                category not in candidate.skills,
+                loads[candidate.user_id][0],
+                candidate.user_id
+            )
+        )
+
+
+STRATEGIES = {
+    "least_loaded": LeastLoadedStrategy,
+    "priority_weighted": PriorityWeightedStrategy,
+    "round_robin": RoundRobinStrategy,
+    "skill_match": SkillMatchStrategy,
+}
+
+
+def get_strategy(name=None):
+    if name is None:
+        name = getattr(settings, "TICKET_ASSIGNMENT_STRATEGY", DEFAULT_STRATEGY)
+
+    try:
+        return STRATEGIES[name]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown TICKET_ASSIGNMENT_STRATEGY '{name}'. "
+            f"Choose one of: {', '.join(sorted(STRATEGIES))}."
+        )
+
+
+# ---------------- ASSIGNMENT ---------------- #
+
+def has_engineers(department_id):
+    return bool(get_assignment_candidates(department_id))
+
+
+def pick_engineer(department_id, priority, category, strategy=None):
+    """
+    Lock and return the chosen engineer's EngineerLoad row (user joined),
+    or None when every engineer is at capacity. Rows locked by concurrent
+    assignments are skipped and the cap is re-checked under the lock, so
+    two requests never push one engineer over capacity. Call inside
+    transaction.atomic(); the ticket's save then bumps the counter.
+    """
+    candidates = get_assignment_candidates(department_id)
+    if not candidates:
+        return None
+
+    if strategy is None:
+        strategy = get_strategy()
+
+    loads = {
+        user_id: (active, weighted, last_assigned_at)
+        for user_id, active, weighted, last_assigned_at in EngineerLoad.objects.filter(
+            department_id=department_id
+        ).values_list("user_id", "active_tickets", "weighted_load", "last_assigned_at")
+    }
+
+    eligible = [
+        candidate for candidate in candidates
+        if candidate.user_id in loads and loads[candidate.user_id][0] < candidate.capacity
+    ]
+
+    for candidate in strategy.rank(eligible, loads, priority, category):
+        load = EngineerLoad.objects.select_related("user").select_for_update(
+            skip_locked=True,
+            of=("self",)
+        ).filter(
+            user_id=candidate.user_id,
+            active_tickets__lt=candidate.capacity
+        ).first()
+
+        if load is not None:
+            return load
+
+    return None
+
+
+def notify_assignment(ticket, buffer=None):
+    """
+    Audit event, in-app notification and outbox email; call inside the
+    assigning transaction. With a NotificationBuffer the notification is only added
+    to it and written when the buffer flushes.
+    """
+    engineer = ticket.assigned_to
+    message = f"You have been assigned Ticket #{ticket.id}"
+
+    audit.record("ASSIGNED", ticket.id, new=engineer.id)
+
+    if buffer is None:
+        notify(engineer.id, message, ticket.id, "ASSIGNED")
+    else:
+        buffer.add(engineer.id, message, ticket.id, "ASSIGNED")
+
+    queue_email(
+        engineer.email,
+        "New SLA Ticket Assigned",
+        message,
+        ticket
+    )
+
+
+# ---------------- QUEUE ---------------- #
+
+def queued_tickets(department_id):
+    """Open, unassigned tickets of a department, oldest first."""
+    return Ticket.objects.filter(
+        department_id=department_id,
+        assigned_to__isnull=True,
+        status__in=LOAD_STATUSES
+    ).order_by("id")
+
+
+def drain_queue(department_id, limit=100):
+    """Assign queued tickets until the queue or the capacity runs out."""
+    strategy = get_strategy()
+    assigned = 0
+
+    with buffered_notifications() as buffer:
+        for ticket_id in queued_tickets(department_id).values_list("id", flat=True)[:limit]:
+            with transaction.atomic():
+                ticket = Ticket.objects.select_for_update(skip_locked=True).filter(
+                    id=ticket_id,
+                    assigned_to__isnull=True
+                ).first()
+                if ticket is None:
+                    continue
+
+                load = pick_engineer(department_id, ticket.priority, ticket.category, strategy)
+                if load is None:
+                    break
+
+                ticket.assigned_to = load.user
+                ticket.save()
+                notify_assignment(ticket, buffer)
+
+            assigned += 1
+
+    return assigned
@@ -0,0 +1,36 @@
+"""
+Ticket audit journal (AuditEvent).
+
+Events are written inside the caller's transaction, so they commit or
+roll back (savepoints included) exactly like the changes they describe.
+record() inserts one event; batch paths build events with event() and
+write them with a single bulk_create through record_many().
+"""
+
+from django.utils import timezone
+
+from .models import AuditEvent
+
+
+BATCH_SIZE = 500
+
+
+def event(event_type, ticket_id, actor_id=None, **payload):
+    """An unsaved AuditEvent, for record_many()."""
+    return AuditEvent(
+        event_type=event_type,
+        ticket_id=ticket_id,
+        actor_id=actor_id,
+        payload=payload,
+        created_at=timezone.now()
+    )
+
+
+def record(event_type, ticket_id, actor_id=None, **payload):
+    """Journal one event now."""
+    event(event_type, ticket_id, actor_id, **payload).save()
+
+
+def record_many(events):
+    """Journal many events with one bulk INSERT per BATCH_SIZE."""
+    AuditEvent.objects.bulk_create(list(events), batch_size=BATCH_SIZE)
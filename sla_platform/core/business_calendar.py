@@ -0,0 +1,192 @@
+import datetime
+from bisect import bisect_left, bisect_right
+from zoneinfo import ZoneInfo
+
+from django.utils import timezone
+
+from .models import BusinessCalendar, WorkingHours, Holiday
+
+
+class CalendarIndex:
+    """
+    Working intervals of one BusinessCalendar with cumulative prefix sums.
+
+    Intervals are materialised for a window of days and stored as parallel
+    sorted arrays of start/end epochs plus the number of business seconds
+    before each interval. "Business seconds between t1 and t2" and
+    "t + N business seconds" are then a bisect each. The window grows on
+    demand when a timestamp falls outside it.
+    """
+
+    # Grow the window in generous steps so edge lookups rarely rebuild
+    EXTEND_DAYS = 366
+
+    def __init__(self, weekly_hours, holidays, tz_name):
+        if not any(weekly_hours.values()):
+            raise ValueError("A business calendar needs at least one working period.")
+
+        self.weekly_hours = weekly_hours
+        self.holidays = frozenset(holidays)
+        self.tz = ZoneInfo(tz_name)
+        self.first_day = None
+        self.last_day = None
+        # (starts, ends, cumulative_before, cumulative_after) swapped as one unit
+        self._index = ([], [], [], [])
+
+    # ---------------- WINDOW ---------------- #
+
+    def _build(self, first_day, last_day):
+        intervals = []
+        day = first_day
+        one_day = datetime.timedelta(days=1)
+
+        while day < last_day:
+            if day not in self.holidays:
+                for start, end in self.weekly_hours.get(day.weekday(), ()):
+                    end_day = day if end > start else day + one_day
+                    intervals.append((
+                        datetime.datetime.combine(day, start, tzinfo=self.tz).timestamp(),
+                        datetime.datetime.combine(end_day, end, tzinfo=self.tz).timestamp(),
+                    ))
+            day += one_day
+
+        intervals.sort()
+        starts, ends = [], []
+        for start, end in intervals:
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+
+        before, after = [], []
+        total = 0.0
+        for start, end in zip(starts, ends):
+            before.append(total)
+            total += end - start
+            after.append(total)
+
+        self._index = (starts, ends, before, after)
+        self.first_day = first_day
+        self.last_day = last_day
+
+    def _local_day(self, ts):
+        return datetime.datetime.fromtimestamp(ts, tz=self.tz).date()
+
+    def _cover(self, *timestamps):
+        first = min(self._local_day(ts) for ts in timestamps) - datetime.timedelta(days=1)
+        last = max(self._local_day(ts) for ts in timestamps) + datetime.timedelta(days=2)
+
+        if self.first_day is not None and self.first_day <= first and last <= self.last_day:
+            return
+
+        step = datetime.timedelta(days=self.EXTEND_DAYS)
+        if self.first_day is None:
+            self._build(first - step, last + step)
+        else:
+            self._build(
+                min(first - step, self.first_day),
+                max(last + step, self.last_day)
+            )
+
+    # ---------------- QUERIES ---------------- #
+
+    def _position(self, ts):
+        """Business seconds from the window start up to ts."""
+        starts, ends, before, after = self._index
+        i = bisect_right(starts, ts) - 1
+        if i < 0:
+            return 0.0
+        return before[i] + min(ts, ends[i]) - starts[i]
+
+    def business_seconds(self, start, end):
+        """Business seconds elapsed between two aware datetimes."""
+        t1, t2 = start.timestamp(), end.timestamp()
+        if t2 <= t1:
+            return 0.0
+
+        self._cover(t1, t2)
+        return self._position(t2) - self._position(t1)
+
+    def add_business_seconds(self, start, seconds):
+        """The instant `seconds` business seconds after `start`."""
+        t = start.timestamp()
+        self._cover(t)
+        target = self._position(t) + seconds
+
+        while not self._index[3] or target > self._index[3][-1]:
+            self._build(
+                self.first_day,
+                self.last_day + datetime.timedelta(days=self.EXTEND_DAYS)
+            )
+
+        starts, ends, before, after = self._index
+        i = bisect_left(after, target)
+        result = max(t, starts[i] + (target - before[i]))
+
+        return datetime.datetime.fromtimestamp(result, tz=datetime.timezone.utc)
+
+
+class CalendarRegistry:
+    """Calendar lookup by client first, then by department."""
+
+    def __init__(self, indexes, by_client, by_department):
+        self.indexes = indexes
+        self.by_client = by_client
+        self.by_department = by_department
+
+    def __bool__(self):
+        return bool(self.indexes)
+
+    def for_ticket(self, client_id, department_id):
+        calendar_id = self.by_client.get(client_id)
+        if calendar_id is None:
+            calendar_id = self.by_department.get(department_id)
+        return self.indexes.get(calendar_id)
+
+
+def load_calendars():
+    weekly = {}
+    for calendar_id, weekday, start, end in WorkingHours.objects.values_list(
+        "calendar_id", "weekday", "start_time", "end_time"
+    ):
+        weekly.setdefault(calendar_id, {}).setdefault(weekday, []).append((start, end))
+
+    holidays = {}
+    for calendar_id, date in Holiday.objects.values_list("calendar_id", "date"):
+        holidays.setdefault(calendar_id, set()).add(date)
+
+    indexes, by_client, by_department = {}, {}, {}
+    for calendar_id, tz_name, client_id, department_id in BusinessCalendar.objects.values_list(
+        "id", "timezone", "client_id", "department_id"
+    ):
+        # A calendar without working hours is treated as 24x7
+        if not weekly.get(calendar_id):
+            continue
+
+        indexes[calendar_id] = CalendarIndex(
+            weekly[calendar_id],
+            holidays.get(calendar_id, ()),
+            tz_name
+        )
+        if client_id is not None:
+            by_client[client_id] = calendar_id
+        if department_id is not None:
+            by_department[department_id] = calendar_id
+
+    return CalendarRegistry(indexes, by_client, by_department)
+
+
+# ---------------- SLA TIME MATH ---------------- #
+
+def elapsed_seconds(start, end, calendar=None):
+    """SLA seconds between two instants: business time if a calendar applies."""
+    if calendar is None:
+        return (end - start).total_seconds()
+    return calendar.business_seconds(start, end)
+
+
+def sla_deadline_for(created_at, resolution_time_hours, calendar=None):
+    if calendar is None:
+        return created_at + timezone.timedelta(hours=resolution_time_hours)
+    return calendar.add_business_seconds(created_at, resolution_time_hours * 3600)
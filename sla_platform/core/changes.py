@@ -0,0 +1,159 @@
+"""
+Ticket change feed (api/tickets/changes/?since=<cursor>).
+
+Every write to a ticket stamps its updated_at: Ticket.save() does so in
+the same UPDATE, and the bulk writers (SLA and risk batches, ingestion,
+deadline recompute, archive restore) call stamp() on their rows before
+bulk_update/bulk_create. A poller keeps the (updated_at, id) of the last
+row it saw as an opaque cursor and asks for the rows after it, which the
+(scope, updated_at, id) indexes answer in time proportional to the delta
+rather than the table. No counter row is shared between writers.
+
+Timestamps are taken before the writing transaction commits, so a row
+can become visible with a stamp older than rows already served. The feed
+therefore only serves rows stamped more than CHANGE_FEED_SETTLE_SECONDS
+ago; a transaction that stays open longer than that after stamping can
+be missed by a cursor that has moved on.
+
+Soft-deleted tickets come through with is_deleted=True. Tickets moved to
+the archive come through once more as a tombstone (archived=True, stamped
+with archived_at); a restored ticket reappears as an ordinary change.
+"""
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+STAMP_FIELDS = ("updated_at",)
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+SETTLE_SECONDS = getattr(settings, "CHANGE_FEED_SETTLE_SECONDS", 5)
+
+FEED_FIELDS = (
+    "id", "updated_at", "client_id", "department_id", "assigned_to_id",
+    "priority", "category", "status", "created_at", "resolved_at", "sla_deadline",
+    "breached", "breach_time", "current_escalation_level", "escalation_count",
+    "risk_score", "risk_level", "is_deleted", "deleted_at",
+)
+
+TOMBSTONE_FIELDS = (
+    "ticket_id", "archived_at", "client_id", "department_id", "assigned_to_id",
+    "priority", "status", "is_deleted",
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def stamp(tickets, now=None):
+    """Set updated_at on unsaved ticket instances; returns the fields to save."""
+    if now is None:
+        now = timezone.now()
+
+    for ticket in tickets:
+        ticket.updated_at = now
+
+    return STAMP_FIELDS
+
+
+def stamp_values(now=None):
+    """STAMP_FIELDS values for a queryset.update()."""
+    return {"updated_at": now or timezone.now()}
+
+
+# ---------------- CURSOR ---------------- #
+
+def encode_cursor(updated_at, ticket_id):
+    raw = json.dumps([updated_at.isoformat(), ticket_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """(updated_at, id) of a cursor token, or None for an empty/"0" one."""
+    if not token or token == "0":
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        updated_at, ticket_id = json.loads(raw)
+        updated_at = parse_datetime(updated_at)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise InvalidCursor("Malformed cursor.")
+
+    if updated_at is None or not isinstance(ticket_id, int):
+        raise InvalidCursor("Malformed cursor.")
+
+    return updated_at, ticket_id
+
+
+# ---------------- FEED ---------------- #
+
+def _after(rows, time_field, id_field, position):
+    if position is None:
+        return rows
+    updated_at, ticket_id = position
+    return rows.filter(
+        Q(**{f"{time_field}__gt": updated_at})
+        | Q(**{time_field: updated_at, f"{id_field}__gt": ticket_id})
+    )
+
+
+def _tombstone(row):
+    row = dict(row)
+    row["id"] = row.pop("ticket_id")
+    row["updated_at"] = row.pop("archived_at")
+    row["archived"] = True
+    return row
+
+
+def changes_since(tickets, archived, since=None, limit=DEFAULT_LIMIT, now=None):
+    """
+    Rows of `tickets`, and tombstones of `archived` (ArchivedTicket rows of
+    the same scope), changed after cursor `since`, oldest change first.
+    Returns (rows, cursor, has_more); pass cursor back as the next `since`.
+    """
+    position = decode_cursor(since)
+    horizon = (now or timezone.now()) - timezone.timedelta(seconds=SETTLE_SECONDS)
+
+    live = _after(tickets.filter(updated_at__lte=horizon), "updated_at", "id", position)
+    gone = _after(archived.filter(archived_at__lte=horizon), "archived_at", "ticket_id", position)
+
+    rows = [
+        {**row, "archived": False}
+        for row in live.order_by("updated_at", "id").values(*FEED_FIELDS)[:limit + 1]
+    ]
+    rows += [
+        _tombstone(row)
+        for row in gone.order_by("archived_at", "ticket_id").values(*TOMBSTONE_FIELDS)[:limit + 1]
+    ]
+    rows.sort(key=lambda row: (row["updated_at"], row["id"]))
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    cursor = encode_cursor(rows[-1]["updated_at"], rows[-1]["id"]) if rows else since
+
+    return rows, cursor, has_more
+
+
+def scope_version(tickets, archived, count=False):
+    """
+    Value that moves whenever a ticket of the scope is written or archived,
+    read from the (scope, updated_at, id) indexes. `tickets` should include
+    soft-deleted rows so deletes register; pass count=True for scopes that
+    tickets can leave without a write to them (an engineer's, on reassign).
+    """
+    live = tickets.aggregate(
+        latest=Max("updated_at"),
+        **({"count": Count("id")} if count else {})
+    )
+    gone = archived.aggregate(latest=Max("archived_at"))
+    return live["latest"], live.get("count"), gone["latest"]
@@ -0,0 +1,165 @@
+"""
+Per-engineer active ticket counters (EngineerLoad).
+
+A ticket adds one (and its priority weight) to its assignee's counters while
+it is open (LOAD_STATUSES) and not soft-deleted. Ticket saves and SLA engine batches apply the
+difference between a ticket's old and new contribution with F() updates,
+so an assignment reads one department's loads in a single indexed query
+instead of counting tickets per engineer. `manage.py rebuild_engineer_load`
+repairs drift from writes that bypass both paths (queryset.update(),
+bulk_create).
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from .models import EngineerLoad, EngineerProfile, Ticket
+from .risk_engine import PRIORITY_WEIGHTS
+
+
+# Ticket statuses that occupy an engineer
+LOAD_STATUSES = ("NEW", "IN_PROGRESS", "REOPENED")
+
+LOAD_STATE_ATTRS = ("assigned_to_id", "status", "priority", "is_deleted")
+
+# Field names (as passed in update_fields) that can move a ticket's load
+LOAD_FIELDS = frozenset(("assigned_to", "status", "priority", "is_deleted"))
+
+
+# ---------------- INCREMENTAL MAINTENANCE ---------------- #
+
+def load_state(ticket, overrides=None):
+    state = {attr: getattr(ticket, attr) for attr in LOAD_STATE_ATTRS}
+    if overrides:
+        state.update((attr, value) for attr, value in overrides.items() if attr in state)
+    return state
+
+
+def loaded_load_state(ticket):
+    """State as last loaded/saved (dirty tracking), or None if unknown."""
+    loaded = getattr(ticket, "_loaded_values", None)
+    if loaded is None:
+        return None
+    return {attr: loaded.get(attr, getattr(ticket, attr)) for attr in LOAD_STATE_ATTRS}
+
+
+def _contribution(state):
+    """(engineer_id, weight) a ticket state adds, or (None, 0)."""
+    if state is None or state["is_deleted"] or state["status"] not in LOAD_STATUSES:
+        return None, 0
+    if state["assigned_to_id"] is None:
+        return None, 0
+    return state["assigned_to_id"], PRIORITY_WEIGHTS.get(state["priority"], 1)
+
+
+def record_load_changes(changes):
+    """
+    Apply (old_state, new_state) pairs to the counters; None = no ticket.
+    Engineers whose load dropped get their department's queue drained once
+    the transaction commits.
+    """
+    counts = Counter()
+    weights = Counter()
+    assigned = set()
+
+    for old_state, new_state in changes:
+        old_engineer, old_weight = _contribution(old_state)
+        new_engineer, new_weight = _contribution(new_state)
+
+        if old_engineer is not None:
+            counts[old_engineer] -= 1
+            weights[old_engineer] -= old_weight
+        if new_engineer is not None:
+            counts[new_engineer] += 1
+            weights[new_engineer] += new_weight
+            if new_engineer != old_engineer:
+                assigned.add(new_engineer)
+
+    now = timezone.now()
+    freed = []
+
+    for user_id in counts.keys() | weights.keys():
+        count, weight = counts[user_id], weights[user_id]
+        if not count and not weight and user_id not in assigned:
+            continue
+
+        update = {
+            "active_tickets": F("active_tickets") + count,
+            "weighted_load": F("weighted_load") + weight,
+        }
+        if user_id in assigned:
+            update["last_assigned_at"] = now
+
+        EngineerLoad.objects.filter(user_id=user_id).update(**update)
+        if count < 0:
+            freed.append(user_id)
+
+    if freed:
+        schedule_drain(freed)
+
+
+def schedule_drain(user_ids):
+    """Assign queued tickets of these engineers' departments after commit."""
+    transaction.on_commit(lambda: _drain_departments(user_ids))
+
+
+def _drain_departments(user_ids):
+    from .assignment import drain_queue
+
+    departments = EngineerLoad.objects.filter(
+        user_id__in=user_ids,
+        department__isnull=False
+    ).values_list("department_id", flat=True).distinct()
+
+    for department_id in departments:
+        drain_queue(department_id)
+
+
+def sync_engineer(profile):
+    """Create or re-home the counter row of an engineer profile."""
+    EngineerLoad.objects.update_or_create(
+        user_id=profile.user_id,
+        defaults={"department_id": profile.team.department_id if profile.team_id else None}
+    )
+
+
+# ---------------- REBUILD ---------------- #
+
+def rebuild_engineer_load():
+    """Recreate every counter row from engineer profiles and open tickets."""
+    weight = Case(
+        *[When(priority=priority, then=Value(w)) for priority, w in PRIORITY_WEIGHTS.items()],
+        default=Value(1),
+        output_field=IntegerField()
+    )
+    active = {
+        row["assigned_to"]: row
+        for row in Ticket.objects.filter(
+            status__in=LOAD_STATUSES,
+            assigned_to__isnull=False
+        ).values("assigned_to").annotate(
+            active=Count("id"),
+            weighted=Sum(weight),
+        ).order_by()
+    }
+    last_assigned = dict(EngineerLoad.objects.values_list("user_id", "last_assigned_at"))
+
+    loads = [
+        EngineerLoad(
+            user_id=user_id,
+            department_id=department_id,
+            active_tickets=active.get(user_id, {}).get("active", 0),
+            weighted_load=active.get(user_id, {}).get("weighted", 0),
+            last_assigned_at=last_assigned.get(user_id)
+        )
+        for user_id, department_id in EngineerProfile.objects.values_list(
+            "user_id", "team__department_id"
+        )
+    ]
+
+    EngineerLoad.objects.all().delete()
+    EngineerLoad.objects.bulk_create(loads, batch_size=1000)
+    return len(loads)
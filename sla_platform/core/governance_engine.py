@@ -1,103 +1,233 @@
 from django.utils import timezone
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, F, Q, Sum
 from .models import Ticket, EngineerProfile
-from .models import Team
+from .models import Team, ArchivedTicket
+
+
+def _archived_totals():
+    """Counters of archived (not deleted) tickets, with sums for averaging."""
+    return ArchivedTicket.objects.filter(is_deleted=False).aggregate(
+        total=Count("id"),
+        resolved=Count("id", filter=Q(status="RESOLVED")),
+        breached_total=Count("id", filter=Q(breached=True)),
+        high_risk=Count("id", filter=Q(risk_level="HIGH")),
+        escalation_sum=Sum("escalation_count"),
+        resolution_count=Count("id", filter=Q(resolved_at__isnull=False)),
+        resolution_time=Sum(
+            F("resolved_at") - F("created_at"),
+            filter=Q(resolved_at__isnull=False)
+        ),
+    )
 
-def calculate_sla_health():
 
-    total = Ticket.objects.count()
+def _with_archive(snapshot):
+    archived = _archived_totals()
+    if not archived["total"]:
+        return snapshot
+
+    hot_total = snapshot["total"]
+    total = hot_total + archived["total"]
+    escalation_sum = (snapshot["avg_escalations"] or 0) * hot_total + (archived["escalation_sum"] or 0)
+
+    resolution_count = snapshot["resolution_count"] + archived["resolution_count"]
+    resolution_time = archived["resolution_time"] or timezone.timedelta(0)
+    if snapshot["avg_resolution"] is not None:
+        resolution_time += snapshot["avg_resolution"] * snapshot["resolution_count"]
+
+    return {
+        **snapshot,
+        "total": total,
+        "resolved": snapshot["resolved"] + archived["resolved"],
+        "breached": snapshot["breached"] + archived["breached_total"],
+        "high_risk": snapshot["high_risk"] + archived["high_risk"],
+        "resolution_count": resolution_count,
+        "avg_escalations": escalation_sum / total,
+        "avg_resolution": resolution_time / resolution_count if resolution_count else None,
+    }
+
+
+def governance_snapshot(queryset=None):
+    """
+    Every governance counter in one aggregate() pass over the ticket table.
+    The calculate_* helpers derive their figures from this dict. Without a
+    queryset the whole history is covered, archived tickets included.
+    """
+    include_archive = queryset is None
+    if queryset is None:
+        queryset = Ticket.objects.all()
+
+    snapshot = queryset.aggregate(
+        total=Count("id"),
+        resolved=Count("id", filter=Q(status="RESOLVED")),
+        breached=Count("id", filter=Q(breached=True)),
+        in_progress=Count("id", filter=Q(status="IN_PROGRESS")),
+        high_risk=Count("id", filter=Q(risk_level="HIGH")),
+        avg_escalations=Avg("escalation_count"),
+        resolution_count=Count("id", filter=Q(resolved_at__isnull=False)),
+        avg_resolution=Avg(
+            F("resolved_at") - F("created_at"),
+            filter=Q(resolved_at__isnull=False)
+        ),
+    )
+
+    return _with_archive(snapshot) if include_archive else snapshot
 
-    if total == 0:
-        return 100
 
-    resolved = Ticket.objects.filter(status="RESOLVED").count()
+def calculate_sla_health(snapshot=None):
+    snapshot = snapshot or governance_snapshot()
 
-    breached = Ticket.objects.filter(breached=True).count()
+    total = snapshot["total"]
 
-    healthy = resolved - breached
+    if total == 0:
+        return 100
+
+    healthy = snapshot["resolved"] - snapshot["breached"]
 
     return round((healthy / total) * 100, 2)
 
 
 
-def calculate_breach_rate():
-    total_tickets = Ticket.objects.count()
-    breached_tickets = Ticket.objects.filter(breached=True).count()
+def calculate_breach_rate(snapshot=None):
+    snapshot = snapshot or governance_snapshot()
 
-    if total_tickets == 0:
+    if snapshot["total"] == 0:
         return 0
 
-    return round((breached_tickets / total_tickets) * 100, 2)
+    return round((snapshot["breached"] / snapshot["total"]) * 100, 2)
 
 
-def calculate_total_escalations():
-    return Ticket.objects.aggregate(
-        total_escalations=Avg("escalation_count")
-    )["total_escalations"] or 0
+def calculate_total_escalations(snapshot=None):
+    snapshot = snapshot or governance_snapshot()
 
+    return snapshot["avg_escalations"] or 0
 
-def calculate_average_resolution_time():
-    resolved_tickets = Ticket.objects.filter(
-        resolved_at__isnull=False
-    )
 
-    total_hours = 0
-    count = resolved_tickets.count()
+def calculate_average_resolution_time(snapshot=None):
+    snapshot = snapshot or governance_snapshot()
 
-    if count == 0:
+    if snapshot["avg_resolution"] is None:
         return 0
 
-    for ticket in resolved_tickets:
-        duration = (ticket.resolved_at - ticket.created_at).total_seconds() / 3600
-        total_hours += duration
-
-    return round(total_hours / count, 2)
-
-
-def engineer_performance():
+    return round(snapshot["avg_resolution"].total_seconds() / 3600, 2)
+
+
+# Ticket statuses that count towards an engineer's or team's current load
+ACTIVE_STATUSES = ("NEW", "IN_PROGRESS")
+
+# Public sort keys -> row keys
+ENGINEER_SORT_KEYS = {
+    "engineer": "engineer",
+    "success_rate": "success_rate",
+    "load": "active",
+    "resolved": "resolved",
+    "breached": "breached",
+}
+
+TEAM_SORT_KEYS = {
+    "team": "team",
+    "load": "active_tickets",
+}
+
+
+def _sort_rows(rows, sort, allowed):
+    """Sort dict rows by a Django-style key ("-field" for descending)."""
+    if not sort:
+        return rows
+
+    descending = sort.startswith("-")
+    key = sort.lstrip("-")
+    if key not in allowed:
+        raise ValueError(f"Cannot sort by '{key}'")
+
+    return sorted(rows, key=lambda row: row[allowed[key]], reverse=descending)
+
+
+def engineer_performance(team=None, department=None, sort=None):
+    """
+    Per-engineer ticket counters from one grouped query over tickets, one
+    over the archive and one for the engineers (with user and team
+    joined), regardless of staff size. `team`/`department` are ids; `sort` is one of
+    ENGINEER_SORT_KEYS, prefixed with "-" for descending.
+    """
+    engineers = EngineerProfile.objects.select_related("user", "team")
+    if team is not None:
+        engineers = engineers.filter(team_id=team)
+    if department is not None:
+        engineers = engineers.filter(team__department_id=department)
+
+    counters = {
+        row.pop("assigned_to"): row
+        for row in Ticket.objects.filter(
+            assigned_to__in=engineers.values("user_id")
+        ).values("assigned_to").annotate(
+            total=Count("id"),
+            active=Count("id", filter=Q(status__in=ACTIVE_STATUSES)),
+            resolved=Count("id", filter=Q(status="RESOLVED")),
+            breached_total=Count("id", filter=Q(breached=True)),
+            resolved_breached=Count("id", filter=Q(status="RESOLVED", breached=True)),
+        ).order_by()
+    }
+
+    empty = {"total": 0, "active": 0, "resolved": 0, "breached_total": 0, "resolved_breached": 0}
+
+    # Archived tickets are resolved (never active) but still count
+    for row in ArchivedTicket.objects.filter(
+        is_deleted=False,
+        assigned_to_id__in=engineers.values("user_id")
+    ).values("assigned_to_id").annotate(
+        total=Count("id"),
+        resolved=Count("id", filter=Q(status="RESOLVED")),
+        breached_total=Count("id", filter=Q(breached=True)),
+        resolved_breached=Count("id", filter=Q(status="RESOLVED", breached=True)),
+    ).order_by():
+        counter = counters.setdefault(row.pop("assigned_to_id"), dict(empty))
+        for name, value in row.items():
+            counter[name] += value
 
     data = []
 
-    engineers = EngineerProfile.objects.all()
-
-    for engineer in engineers:
-
-        resolved_tickets = Ticket.objects.filter(
-            assigned_to=engineer.user,
-            status="RESOLVED"
-        )
-
-        total_resolved = resolved_tickets.count()
-
-        breached = resolved_tickets.filter(breached=True).count()
+    for engineer in engineers.order_by("user__username"):
+        row = counters.get(engineer.user_id, empty)
 
         success_rate = 0
-        if total_resolved > 0:
-            success_rate = round(((total_resolved - breached) / total_resolved) * 100, 2)
+        if row["resolved"] > 0:
+            success_rate = round(((row["resolved"] - row["resolved_breached"]) / row["resolved"]) * 100, 2)
 
         data.append({
             "engineer": engineer.user.username,
-            "resolved": total_resolved,
-            "breached": breached,
+            "team": engineer.team.name if engineer.team else None,
+            "total": row["total"],
+            "active": row["active"],
+            "resolved": row["resolved"],
+            "breached": row["breached_total"],
             "success_rate": success_rate
         })
 
-    return data
+    return _sort_rows(data, sort, ENGINEER_SORT_KEYS)
 
-def team_load():
 
-    result = []
+def team_load(department=None, sort=None):
+    """Active tickets per team's department, in two queries."""
+    teams = Team.objects.select_related("department")
+    if department is not None:
+        teams = teams.filter(department_id=department)
 
-    for team in Team.objects.all():
+    active_by_department = dict(
+        Ticket.objects.filter(
+            department__in=teams.values("department_id"),
+            status__in=ACTIVE_STATUSES
+        ).values("department").annotate(
+            active=Count("id")
+        ).order_by().values_list("department", "active")
+    )
 
-        active_tickets = Ticket.objects.filter(
-            department=team.department,
-            status__in=["NEW", "IN_PROGRESS"]
-        ).count()
+    result = []
 
+    for team in teams.order_by("name", "id"):
         result.append({
             "team": team.name,
-            "active_tickets": active_tickets
+            "department": team.department.name,
+            "active_tickets": active_by_department.get(team.department_id, 0)
         })
 
-    return result
+    return _sort_rows(result, sort, TEAM_SORT_KEYS)
@@ -0,0 +1,156 @@
+"""
+Keyset (seek) pagination for the dashboard ticket tables.
+
+A page is fetched with WHERE <sort key> > <last row's key> ... LIMIT n
+instead of OFFSET, so page 1000 costs the same as page 1 and rows added
+meanwhile never shift the pages. The cursor is the last row's key,
+packed into an opaque URL-safe token.
+
+Orders:
+  urgency   open tickets by SLA deadline (nearest first), then resolved ones
+  deadline  all tickets by SLA deadline, nearest first
+  id        newest first
+
+Tickets without a deadline sort after those with one.
+"""
+
+import base64
+import binascii
+import json
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+
+DEFAULT_ORDER = "urgency"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# order -> segments walked one after the other; each is seeked on its own
+ORDERS = {
+    "urgency": (~Q(status="RESOLVED"), Q(status="RESOLVED")),
+    "deadline": (Q(),),
+    "id": (Q(),),
+}
+
+# ?param -> queryset lookup
+FILTERS = {
+    "status": "status",
+    "priority": "priority",
+    "category": "category",
+    "department": "department_id",
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class TicketPage:
+
+    __slots__ = ("tickets", "next_cursor")
+
+    def __init__(self, tickets, next_cursor):
+        self.tickets = tickets
+        self.next_cursor = next_cursor
+
+
+# ---------------- CURSOR ---------------- #
+
+def encode_cursor(segment, ticket, order):
+    deadline = None
+    if order != "id" and ticket.sla_deadline is not None:
+        deadline = ticket.sla_deadline.isoformat()
+
+    raw = json.dumps([segment, deadline, ticket.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, order):
+    """(segment, deadline, id) of a cursor token; raises InvalidCursor."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        segment, deadline, ticket_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise InvalidCursor("Malformed cursor.")
+
+    if not isinstance(segment, int) or not 0 <= segment < len(ORDERS[order]) \
+            or not isinstance(ticket_id, int):
+        raise InvalidCursor("Malformed cursor.")
+
+    if deadline is not None:
+        deadline = parse_datetime(deadline)
+        if deadline is None:
+            raise InvalidCursor("Malformed cursor.")
+
+    return segment, deadline, ticket_id
+
+
+# ---------------- QUERIES ---------------- #
+
+def filter_tickets(tickets, params):
+    """Apply the FILTERS present (and non-empty) in a QueryDict/dict."""
+    for param, lookup in FILTERS.items():
+        value = params.get(param)
+        if not value:
+            continue
+        # A non-numeric department id matches nothing rather than erroring
+        if lookup == "department_id" and not value.isdigit():
+            return tickets.none()
+        tickets = tickets.filter(**{lookup: value})
+    return tickets
+
+
+def _ordered(tickets, order):
+    if order == "id":
+        return tickets.order_by("-id")
+    return tickets.order_by(F("sla_deadline").asc(nulls_last=True), "id")
+
+
+def _after(tickets, order, deadline, ticket_id):
+    """Rows strictly after (deadline, id) in the order's sort."""
+    if order == "id":
+        return tickets.filter(id__lt=ticket_id)
+
+    if deadline is None:
+        return tickets.filter(sla_deadline__isnull=True, id__gt=ticket_id)
+
+    return tickets.filter(
+        Q(sla_deadline__gt=deadline)
+        | Q(sla_deadline=deadline, id__gt=ticket_id)
+        | Q(sla_deadline__isnull=True)
+    )
+
+
+def ticket_page(tickets, order=DEFAULT_ORDER, cursor=None, size=DEFAULT_PAGE_SIZE):
+    """
+    One page of `tickets` (already filtered and select_related) in `order`,
+    starting after `cursor`. Returns TicketPage; next_cursor is None on the
+    last page.
+    """
+    if order not in ORDERS:
+        raise ValueError(f"Unknown order '{order}', expected one of: {', '.join(ORDERS)}")
+
+    segments = ORDERS[order]
+    segment, deadline, ticket_id = decode_cursor(cursor, order) if cursor else (0, None, None)
+
+    rows = []
+    while segment < len(segments) and len(rows) <= size:
+        page = tickets.filter(segments[segment])
+        if ticket_id is not None:
+            page = _after(page, order, deadline, ticket_id)
+
+        # One extra row tells whether another page follows
+        for ticket in _ordered(page, order)[:size + 1 - len(rows)]:
+            rows.append((segment, ticket))
+
+        segment += 1
+        deadline = ticket_id = None
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last_segment, last_ticket = rows[-1]
+        next_cursor = encode_cursor(last_segment, last_ticket, order)
+
+    return TicketPage([ticket for _, ticket in rows], next_cursor)
@@ -0,0 +1,355 @@
+"""
+In-process pub/sub behind the Server-Sent Events stream (api/stream/).
+
+Each connected browser is one asyncio.Queue registered under its user id;
+an idle connection costs a coroutine and an empty queue, nothing else.
+A single poller task per process (started with the first subscriber,
+stopped with the last) reads new Notification rows past a high-water-mark
+id and follows the SLA state of the subscribed users' open tickets,
+publishing only changes. A user's open tickets are read once, when they
+connect; after that a poll only looks at tickets written since the last
+one (the change feed's updated_at stamps) and at tickets whose usage is
+due to cross the next alert threshold, kept in a min-heap. Notifications
+written by this process (new rows and coalesced count bumps) are also
+pushed immediately through announce_notifications(); per-connection
+de-duplication hides the poller's later copy. Requires an ASGI server.
+"""
+
+import asyncio
+import heapq
+import json
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .business_calendar import sla_deadline_for
+from .changes import SETTLE_SECONDS
+from .models import Notification, Ticket
+from . import sla_cache
+
+
+POLL_SECONDS = getattr(settings, "LIVE_STREAM_POLL_SECONDS", 2)
+
+# Per-connection backlog; the oldest events are dropped past this
+QUEUE_SIZE = 100
+
+# SLA states worth pushing
+ALERT_STATES = ("WARNING", "CRITICAL_RISK", "BREACHED")
+
+# usage_percent where the SLA state changes (sla_status_label, breach)
+USAGE_THRESHOLDS = (70, 90, 100)
+
+# Tickets re-evaluated per query
+CHUNK_SIZE = 500
+
+
+def notification_event(notification_id, ticket_id, message, count, created_at):
+    return {
+        "event": "notification",
+        "id": notification_id,
+        "data": {
+            "id": notification_id,
+            "ticket": ticket_id,
+            "message": message,
+            "count": count,
+            "created_at": created_at.isoformat(),
+        },
+    }
+
+
+class LiveBroker:
+
+    def __init__(self):
+        self._subscribers = {}
+        self._loop = None
+        self._poller = None
+        self._reset()
+
+    def _reset(self):
+        self.high_water_id = None
+        self.changed_since = None
+        self.generation = None
+        # Users whose open tickets are being followed
+        self._watched_users = set()
+        # ticket id -> (sla state, user ids the ticket belongs to)
+        self._watched = {}
+        # (due timestamp, ticket id) of the next threshold crossing; stale
+        # entries (ticket re-evaluated since) are skipped lazily
+        self._due = []
+        self._due_at = {}
+
+    # ---------------- SUBSCRIPTIONS (event loop only) ---------------- #
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+
+        self._loop = asyncio.get_running_loop()
+        if self._poller is None or self._poller.done():
+            self._poller = self._loop.create_task(self._poll_forever())
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def connection_count(self):
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, user_id, event):
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def publish_threadsafe(self, user_id, event):
+        """publish() from a sync view or worker thread of this process."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed() and user_id in self._subscribers:
+            loop.call_soon_threadsafe(self.publish, user_id, event)
+
+    # ---------------- POLLER ---------------- #
+
+    async def _poll_forever(self):
+        while self._subscribers:
+            user_ids = frozenset(self._subscribers)
+            try:
+                events = await sync_to_async(self._poll_once, thread_sensitive=False)(user_ids)
+            except Exception:
+                # A failed poll (DB restart, lock timeout) is retried next tick
+                events = []
+
+            for user_id, event in events:
+                self.publish(user_id, event)
+
+            await asyncio.sleep(POLL_SECONDS)
+
+        self._reset()
+
+    def _poll_once(self, user_ids):
+        """Runs in a worker thread; returns [(user_id, event)]."""
+        events = []
+
+        top = Notification.objects.aggregate(top=Max("id"))["top"] or 0
+        if self.high_water_id is None:
+            self.high_water_id = top
+
+        # Bounded above so rows committed mid-poll are picked up next time;
+        # rows of users who are not connected still move the mark forward
+        rows = Notification.objects.filter(
+            id__gt=self.high_water_id,
+            id__lte=top
+        ).order_by("id").values_list("id", "user_id", "ticket_id", "message", "count", "created_at")
+
+        for notification_id, user_id, ticket_id, message, count, created_at in rows:
+            if user_id in user_ids:
+                events.append((user_id, notification_event(notification_id, ticket_id, message, count, created_at)))
+
+        self.high_water_id = max(self.high_water_id, top)
+
+        events.extend(self._sla_changes(user_ids))
+        return events
+
+    # ---------------- SLA STATE ---------------- #
+
+    def _sla_changes(self, user_ids):
+        now = timezone.now()
+        recheck = set()
+
+        # A contract, rule or calendar edit moves every crossing
+        generation = sla_cache.generation()
+        if generation != self.generation:
+            self.generation = generation
+            recheck.update(self._watched)
+
+        left = self._watched_users - user_ids
+        if left:
+            self._watched_users -= left
+            for ticket_id, (_, owners) in list(self._watched.items()):
+                if not owners & user_ids:
+                    self._forget(ticket_id)
+
+        if self.changed_since is None:
+            self.changed_since = now
+        else:
+            # Stamps are taken before commit; re-read the window a late commit can land in
+            changed = Ticket.all_objects.filter(
+                updated_at__gt=self.changed_since - timezone.timedelta(seconds=SETTLE_SECONDS)
+            ).values_list("id", "assigned_to_id", "client__user_id", "updated_at")
+
+            for ticket_id, assigned_to_id, client_user_id, updated_at in changed:
+                if ticket_id in self._watched or {assigned_to_id, client_user_id} & user_ids:
+                    recheck.add(ticket_id)
+                self.changed_since = max(self.changed_since, updated_at)
+
+        deadline = now.timestamp()
+        while self._due and self._due[0][0] <= deadline:
+            due_at, ticket_id = heapq.heappop(self._due)
+            if self._due_at.get(ticket_id) == due_at:
+                del self._due_at[ticket_id]
+                recheck.add(ticket_id)
+
+        events = self._evaluate(sorted(recheck), user_ids, now)
+
+        # Newly connected users: their open tickets, read once
+        for user_id in user_ids - self._watched_users:
+            self._watched_users.add(user_id)
+            ticket_ids = Ticket.objects.filter(
+                Q(assigned_to_id=user_id) | Q(client__user_id=user_id)
+            ).exclude(status="RESOLVED").values_list("id", flat=True)
+            self._evaluate([ticket_id for ticket_id in ticket_ids if ticket_id not in self._watched], user_ids, now)
+
+        return events
+
+    def _forget(self, ticket_id):
+        self._watched.pop(ticket_id, None)
+        self._due_at.pop(ticket_id, None)
+
+    def _evaluate(self, ticket_ids, user_ids, now):
+        """Re-read these tickets, record their state and return alert events."""
+        # sla_engine -> notifications -> live: import here, not at module load
+        from . import sla_engine
+
+        calendars = sla_cache.get_calendars()
+        events = []
+
+        for start in range(0, len(ticket_ids), CHUNK_SIZE):
+            chunk = ticket_ids[start:start + CHUNK_SIZE]
+            tickets = Ticket.objects.filter(
+                id__in=chunk
+            ).exclude(status="RESOLVED").select_related("client").with_sla_metrics(now)
+
+            seen = set()
+            for ticket in tickets:
+                seen.add(ticket.id)
+                owners = frozenset(
+                    user_id for user_id in (ticket.assigned_to_id, ticket.client.user_id)
+                    if user_id is not None
+                )
+                if not owners & user_ids:
+                    self._forget(ticket.id)
+                    continue
+
+                sla_status, remaining_hours, usage_percent = sla_engine.sla_row_metrics(ticket, now, calendars)
+                if ticket.status == "BREACHED" or (usage_percent is not None and usage_percent >= 100):
+                    sla_status = "BREACHED"
+
+                previous = self._watched.get(ticket.id, (None,))[0]
+                self._watched[ticket.id] = (sla_status, owners)
+                self._schedule(ticket, usage_percent, calendars)
+
+                # The first sight of a ticket only records its state
+                if previous is None or previous == sla_status or sla_status not in ALERT_STATES:
+                    continue
+
+                event = {
+                    "event": "sla",
+                    "data": {
+                        "ticket": ticket.id,
+                        "state": sla_status,
+                        "previous": previous,
+                        "remaining_hours": remaining_hours,
+                        "usage_percent": usage_percent,
+                    },
+                }
+                for user_id in owners & user_ids:
+                    events.append((user_id, event))
+
+            # Resolved, deleted or archived
+            for ticket_id in set(chunk) - seen:
+                self._forget(ticket_id)
+
+        return events
+
+    def _schedule(self, ticket, usage_percent, calendars):
+        """Put the ticket's next threshold crossing on the heap."""
+        self._due_at.pop(ticket.id, None)
+        if usage_percent is None or ticket.status == "BREACHED":
+            return
+
+        upcoming = [threshold for threshold in USAGE_THRESHOLDS if threshold > usage_percent]
+        if not upcoming:
+            return
+
+        # usage = (elapsed - pauses) / allowed, so the crossing lies pauses later
+        due_at = sla_deadline_for(
+            ticket.created_at,
+            ticket.sla_hours * upcoming[0] / 100 + (ticket.total_pause_duration or 0),
+            calendars.for_ticket(ticket.client_id, ticket.department_id)
+        ).timestamp()
+        self._due_at[ticket.id] = due_at
+        heapq.heappush(self._due, (due_at, ticket.id))
+
+
+broker = LiveBroker()
+
+
+def announce_notifications(notifications):
+    """Push freshly written Notification rows to connected users at once."""
+    for notification in notifications:
+        if notification.pk is None:
+            continue
+        broker.publish_threadsafe(notification.user_id, notification_event(
+            notification.pk,
+            notification.ticket_id,
+            notification.message,
+            notification.count,
+            notification.created_at or timezone.now()
+        ))
+
+
+def format_sse(event):
+    """Serialise one event dict in text/event-stream framing."""
+    lines = []
+    if "id" in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['event']}")
+    lines.append(f"data: {json.dumps(event['data'], default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(user_id, last_event_id=None, keepalive_seconds=15):
+    """Async generator of SSE frames for one connection."""
+    queue = broker.subscribe(user_id)
+    # (id, count) of notifications already sent, so direct pushes and polls
+    # do not repeat while a coalesced count bump still gets through
+    seen = deque(maxlen=500)
+
+    try:
+        yield "retry: 5000\n\n"
+
+        if last_event_id is not None:
+            missed = await sync_to_async(list, thread_sensitive=False)(
+                Notification.objects.filter(
+                    user_id=user_id,
+                    id__gt=last_event_id
+                ).order_by("id").values_list(
+                    "id", "ticket_id", "message", "count", "created_at"
+                )[:QUEUE_SIZE]
+            )
+            for row in missed:
+                seen.append((row[0], row[3]))
+                yield format_sse(notification_event(*row))
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if event["event"] == "notification":
+                key = (event["id"], event["data"]["count"])
+                if key in seen:
+                    continue
+                seen.append(key)
+
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(user_id, queue)
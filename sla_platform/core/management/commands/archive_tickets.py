@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.archive import DEFAULT_BATCH_SIZE, DELETED_DAYS, RESOLVED_DAYS, archive_tickets
+
+
+class Command(BaseCommand):
+    help = "Move old resolved and soft-deleted tickets into the ArchivedTicket table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--resolved-days",
+            type=int,
+            default=RESOLVED_DAYS,
+            help="Archive tickets resolved more than this many days ago.",
+        )
+        parser.add_argument(
+            "--deleted-days",
+            type=int,
+            default=DELETED_DAYS,
+            help="Archive tickets soft-deleted more than this many days ago.",
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--limit", type=int, help="Stop after this many tickets.")
+
+    def handle(self, *args, **options):
+        if options["resolved_days"] < 0 or options["deleted_days"] < 0:
+            raise CommandError("Day counts cannot be negative.")
+
+        now = timezone.now()
+        started = time.monotonic()
+
+        archived = archive_tickets(
+            resolved_before=now - timezone.timedelta(days=options["resolved_days"]),
+            deleted_before=now - timezone.timedelta(days=options["deleted_days"]),
+            batch_size=options["batch_size"],
+            limit=options["limit"]
+        )
+
+        self.stdout.write(
+            f"Archived {archived} tickets in {time.monotonic() - started:.2f}s"
+        )
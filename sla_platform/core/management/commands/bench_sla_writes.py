@@ -0,0 +1,136 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import (
+    Client,
+    Department,
+    EngineerProfile,
+    EscalationRule,
+    SLAContract,
+    Team,
+    Ticket,
+)
+from core.risk_engine import calculate_risk
+from core.sla_engine import calculate_sla_status, evaluate_sla_batch, sla_usage_percent
+from core import views
+
+
+class Command(BaseCommand):
+    help = (
+        "Count the UPDATE statements each SLA write path issues for the dashboard "
+        "ticket set, split into ticket rows and the counters they move "
+        "(governance rollups, engineer load). Seeds its own data and rolls "
+        "everything back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            admin = self._seed(options["tickets"])
+
+            self.stdout.write(
+                f"{'path':<32}{'pass':<8}{'queries':>9}{'updates':>9}{'tickets':>9}{'counters':>10}{'ms':>10}"
+            )
+            self._measure("legacy (2 full saves/ticket)", self._legacy_path)
+            self._measure("per-ticket, dirty fields", self._per_ticket_path)
+            self._measure("evaluate_sla_batch", self._batch_path)
+            self._measure("dashboard view", lambda: self._dashboard_path(admin))
+
+            transaction.set_rollback(True)
+
+    # ---------------- PATHS ---------------- #
+
+    def tickets(self):
+        return Ticket.objects.filter(client=self.client)
+
+    def _legacy_path(self):
+        """What calculate_sla_status did before: risk save + final save, all columns."""
+        now = timezone.now()
+        for ticket in self.tickets():
+            hours = SLAContract.objects.get(client=ticket.client_id, priority=ticket.priority).resolution_time_hours
+            calculate_risk(ticket, sla_usage_percent(ticket, hours, now), commit=False)
+            models.Model.save(ticket)
+            models.Model.save(ticket)
+
+    def _per_ticket_path(self):
+        for ticket in self.tickets():
+            calculate_sla_status(ticket)
+
+    def _batch_path(self):
+        evaluate_sla_batch(self.tickets())
+
+    def _dashboard_path(self, admin):
+        request = RequestFactory().get("/")
+        request.user = admin
+        views.dashboard(request)
+
+    def _measure(self, label, path):
+        savepoint = transaction.savepoint()
+
+        for run in ("first", "steady"):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                path()
+                elapsed = (time.perf_counter() - started) * 1000
+
+            updates = [
+                query["sql"] for query in queries.captured_queries
+                if query["sql"].lstrip().upper().startswith("UPDATE")
+            ]
+            # A ticket that crosses a threshold also moves its rollup and load counters
+            tickets = sum(1 for sql in updates if Ticket._meta.db_table in sql.split("SET")[0])
+            self.stdout.write(
+                f"{label:<32}{run:<8}{len(queries.captured_queries):>9}{len(updates):>9}"
+                f"{tickets:>9}{len(updates) - tickets:>10}{elapsed:>10.1f}"
+            )
+
+        transaction.savepoint_rollback(savepoint)
+
+    # ---------------- DATA ---------------- #
+
+    def _seed(self, count):
+        suffix = timezone.now().strftime("%H%M%S%f")
+        admin = User.objects.create(username=f"bench-admin-{suffix}", is_superuser=True)
+        client_user = User.objects.create(username=f"bench-client-{suffix}")
+        client = Client.objects.create(user=client_user, name="bench", email=f"bench-{suffix}@example.com")
+        self.client = client
+
+        department = Department.objects.create(name=f"Bench {suffix}")
+        team = Team.objects.create(name="bench", department=department)
+        engineer = User.objects.create(username=f"bench-eng-{suffix}")
+        lead = User.objects.create(username=f"bench-lead-{suffix}")
+        EngineerProfile.objects.create(user=engineer, team=team)
+        EngineerProfile.objects.create(user=lead, team=team, is_team_lead=True)
+
+        SLAContract.objects.create(client=client, priority="HIGH", resolution_time_hours=24)
+        EscalationRule.objects.create(priority="HIGH", threshold_percent=50, escalate_to_level=1)
+        EscalationRule.objects.create(priority="HIGH", threshold_percent=80, escalate_to_level=2)
+
+        Ticket.objects.bulk_create([
+            Ticket(
+                client=client,
+                assigned_to=engineer,
+                department=department,
+                priority="HIGH",
+                category="NETWORK",
+                description="bench",
+            )
+            for _ in range(count)
+        ])
+
+        # Spread ages over 0-30h so some tickets escalate and breach
+        now = timezone.now()
+        for index, ticket_id in enumerate(Ticket.objects.filter(client=client).values_list("id", flat=True)):
+            Ticket.objects.filter(id=ticket_id).update(
+                created_at=now - timezone.timedelta(minutes=(index * 37) % 1800)
+            )
+
+        return admin
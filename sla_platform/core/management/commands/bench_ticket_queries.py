@@ -0,0 +1,304 @@
+import json
+import random
+import time
+
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import views
+from core import sla_cache
+from core.assignment import queued_tickets
+from core.changes import SETTLE_SECONDS, encode_cursor
+from core.engineer_load import rebuild_engineer_load
+from core.governance_engine import engineer_performance, governance_snapshot, team_load
+from core.keyset import ticket_page
+from core.models import Client, Department, EngineerProfile, SLAContract, Team, Ticket
+from core.sla_scheduler import SLAScheduler
+
+
+# Ticket indexes designed for the paths below; dropped for the "before" pass
+HOT_PATH_INDEXES = (
+    "core_ticket_open_deadline_idx",
+    "core_ticket_assignee_open_idx",
+    "core_ticket_assignee_idx",
+    "core_ticket_client_idx",
+    "core_ticket_department_idx",
+    "core_ticket_risk_idx",
+)
+
+# ...and the plain foreign key indexes they replaced, put back for it
+BASELINE_INDEXES = {
+    "bench_ticket_client_id": "client_id",
+    "bench_ticket_assigned_to_id": "assigned_to_id",
+    "bench_ticket_department_id": "department_id",
+}
+
+STATUS_WEIGHTS = {"NEW": 10, "IN_PROGRESS": 15, "REOPENED": 2, "BREACHED": 3, "RESOLVED": 70}
+PRIORITY_WEIGHTS = {"CRITICAL": 5, "HIGH": 20, "MEDIUM": 45, "LOW": 30}
+RISK_WEIGHTS = {"LOW": 60, "MEDIUM": 30, "HIGH": 10}
+
+SEED_BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed tickets, run every Ticket query the views and engines issue with "
+        "and without the hot-path indexes, and report plans and latencies. "
+        "Everything is rolled back; needs transactional DDL (SQLite, PostgreSQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=1_000_000)
+        parser.add_argument("--runs", type=int, default=5, help="Timed runs per path; the best is kept.")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed for the generated data.")
+        parser.add_argument("-o", "--output", help="Write the report as JSON to this file.")
+        parser.add_argument(
+            "--baseline",
+            help="Earlier JSON report; paths that got slower or lost their index are flagged."
+        )
+
+    def handle(self, *args, **options):
+        if not connection.features.can_rollback_ddl:
+            raise CommandError("The before/after comparison drops indexes inside a transaction; "
+                               f"{connection.vendor} cannot roll that back.")
+
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as handle:
+                baseline = json.load(handle)
+
+        self.random = random.Random(options["seed"])
+        self.runs = options["runs"]
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            self._seed(options["tickets"])
+            self._analyze()
+            self.stdout.write(f"Seeded {options['tickets']} tickets in {time.perf_counter() - started:.1f}s")
+
+            after = self._measure_all()
+            self._use_baseline_indexes()
+            before = self._measure_all()
+
+            transaction.set_rollback(True)
+
+        report = {
+            "vendor": connection.vendor,
+            "tickets": options["tickets"],
+            "paths": {
+                label: {"before": before[label], "after": after[label]}
+                for label in after
+            },
+        }
+        self._print(report, baseline)
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    # ---------------- PATHS ---------------- #
+
+    def paths(self):
+        """(label, callable) for every hot query path, run as the real code runs it."""
+        factory = RequestFactory()
+
+        def view(func, user, path="/", **params):
+            def run():
+                request = factory.get(path, params)
+                request.user = User.objects.get(pk=user.pk)
+                response = func(request)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            return run
+
+        return [
+            ("dashboard (admin)", view(views.dashboard, self.admin)),
+            ("dashboard (engineer)", view(views.dashboard, self.engineer)),
+            ("dashboard (client)", view(views.dashboard, self.client_user)),
+            ("dashboard deadline order", view(views.dashboard, self.admin, order="deadline")),
+            ("client_dashboard", view(views.client_dashboard, self.client_user)),
+            ("risk_data_api (client, HIGH)", view(views.risk_data_api, self.client_user, risk_level="HIGH")),
+            ("risk_data_api (admin, HIGH)", view(views.risk_data_api, self.admin, risk_level="HIGH", fields="ticket_id,risk_score")),
+            ("risk_data_api closest", view(views.risk_data_api, self.admin, closest="50")),
+            ("ticket changes (engineer)", view(views.ticket_changes_api, self.engineer, since=self.recent_cursor)),
+            ("closest_to_breach", lambda: list(Ticket.objects.closest_to_breach(50))),
+            ("keyset urgency page", lambda: ticket_page(Ticket.objects.filter(assigned_to=self.engineer))),
+            ("scheduler poll", self._scheduler_poll),
+            ("assignment queue", lambda: list(queued_tickets(self.department.id)[:100])),
+            ("team_load", team_load),
+            ("engineer_performance", engineer_performance),
+            ("rebuild_engineer_load", rebuild_engineer_load),
+            ("governance_snapshot", lambda: governance_snapshot(Ticket.objects.all())),
+        ]
+
+    def _scheduler_poll(self):
+        scheduler = SLAScheduler()
+        scheduler.generation = sla_cache.generation()
+        scheduler.changed_since = self.recent_changes
+        scheduler.poll_changes()
+
+    def _measure_all(self):
+        results = {}
+        for label, run in self.paths():
+            # Seeding overflows the bounded query log, which would hide the capture
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries:
+                run()
+
+            timings = []
+            for _ in range(self.runs):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+
+            results[label] = {
+                "ms": round(min(timings), 2),
+                "queries": len(queries.captured_queries),
+                "plans": [
+                    self._explain(query["sql"])
+                    for query in queries.captured_queries
+                    if self._reads_tickets(query["sql"])
+                ],
+            }
+        return results
+
+    @staticmethod
+    def _reads_tickets(sql):
+        return sql.lstrip().upper().startswith("SELECT") and Ticket._meta.db_table in sql
+
+    @staticmethod
+    def _explain(sql):
+        prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            rows = cursor.fetchall()
+        # SQLite rows are (id, parent, notused, detail); others are one text column
+        return [str(row[-1]) for row in rows]
+
+    # ---------------- INDEXES ---------------- #
+
+    def _use_baseline_indexes(self):
+        editor = connection.schema_editor()
+        quote = connection.ops.quote_name
+        table = quote(Ticket._meta.db_table)
+        with connection.cursor() as cursor:
+            for name in HOT_PATH_INDEXES:
+                cursor.execute(editor.sql_delete_index % {"name": quote(name), "table": table})
+            for name, column in BASELINE_INDEXES.items():
+                cursor.execute(f"CREATE INDEX {quote(name)} ON {table} ({quote(column)})")
+        self._analyze()
+
+    @staticmethod
+    def _analyze():
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE" if connection.vendor == "sqlite" else f"ANALYZE {Ticket._meta.db_table}")
+
+    # ---------------- REPORT ---------------- #
+
+    @staticmethod
+    def _full_scans(plans):
+        table = Ticket._meta.db_table
+        return sum(
+            1 for plan in plans for line in plan
+            if (f"SCAN {table}" in line and "INDEX" not in line) or f"Seq Scan on {table}" in line
+        )
+
+    def _print(self, report, baseline):
+        self.stdout.write(f"\n{'path':<32}{'before ms':>11}{'after ms':>10}{'speedup':>9}{'queries':>9}{'scans':>7}")
+        for label, result in report["paths"].items():
+            before, after = result["before"], result["after"]
+            speedup = before["ms"] / after["ms"] if after["ms"] else 0
+            scans = self._full_scans(after["plans"])
+            line = (
+                f"{label:<32}{before['ms']:>11.1f}{after['ms']:>10.1f}{speedup:>8.1f}x"
+                f"{after['queries']:>9}{scans:>7}"
+            )
+
+            old = (baseline or {}).get("paths", {}).get(label)
+            if old:
+                if after["ms"] > old["after"]["ms"] * 1.5:
+                    line += f"  REGRESSED (was {old['after']['ms']:.1f} ms)"
+                if scans > self._full_scans(old["after"]["plans"]):
+                    line += "  NEW FULL SCAN"
+            self.stdout.write(line)
+
+        self.stdout.write("\nQuery plans with the indexes:")
+        for label, result in report["paths"].items():
+            self.stdout.write(f"\n{label}")
+            for plan in result["after"]["plans"]:
+                self.stdout.write("  " + " | ".join(plan))
+
+    # ---------------- DATA ---------------- #
+
+    def _pick(self, weights):
+        return self.random.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _seed(self, count):
+        suffix = timezone.now().strftime("%H%M%S%f")
+        engineers_group, _ = Group.objects.get_or_create(name="ENGINEERS")
+
+        self.admin = User.objects.create(username=f"bench-admin-{suffix}", is_superuser=True)
+
+        departments = [Department.objects.create(name=f"Bench {suffix} {index}") for index in range(12)]
+        self.department = departments[0]
+
+        engineers = []
+        for index in range(100):
+            engineer = User.objects.create(username=f"bench-eng-{suffix}-{index}")
+            engineer.groups.add(engineers_group)
+            team = Team.objects.create(name=f"bench {index}", department=departments[index % len(departments)])
+            EngineerProfile.objects.create(user=engineer, team=team)
+            engineers.append(engineer)
+        self.engineer = engineers[0]
+
+        clients = []
+        for index in range(200):
+            user = User.objects.create(username=f"bench-client-{suffix}-{index}")
+            client = Client.objects.create(user=user, name=f"bench {index}", email=f"bench-{suffix}-{index}@example.com")
+            SLAContract.objects.bulk_create([
+                SLAContract(client=client, priority=priority, resolution_time_hours=hours)
+                for priority, hours in (("CRITICAL", 4), ("HIGH", 8), ("MEDIUM", 24), ("LOW", 72))
+            ])
+            clients.append(client)
+        self.client_user = clients[0].user
+
+        now = timezone.now()
+        tickets = []
+        for index in range(count):
+            status = self._pick(STATUS_WEIGHTS)
+            deleted = self.random.random() < 0.02
+            age = timezone.timedelta(minutes=self.random.randrange(60 * 24 * 365))
+            engineer = self.random.choice(engineers) if self.random.random() < 0.95 else None
+
+            tickets.append(Ticket(
+                client=self.random.choice(clients),
+                assigned_to=engineer,
+                department=self.random.choice(departments),
+                priority=self._pick(PRIORITY_WEIGHTS),
+                category="NETWORK",
+                description="bench",
+                status=status,
+                resolved_at=now - age / 2 if status == "RESOLVED" else None,
+                sla_deadline=now - age + timezone.timedelta(hours=self.random.choice((4, 8, 24, 72))),
+                breached=status == "BREACHED" or self.random.random() < 0.08,
+                risk_score=self.random.uniform(0, 100),
+                risk_level=self._pick(RISK_WEIGHTS),
+                is_deleted=deleted,
+                deleted_at=now if deleted else None,
+                # One change a second, the newest just outside the feed's settle window
+                updated_at=now - timezone.timedelta(seconds=SETTLE_SECONDS + count - index),
+            ))
+
+            if len(tickets) >= SEED_BATCH_SIZE:
+                Ticket.all_objects.bulk_create(tickets)
+                tickets = []
+
+        Ticket.all_objects.bulk_create(tickets)
+        # Pollers (change feed, scheduler) only ever look at the newest rows
+        self.recent_changes = now - timezone.timedelta(seconds=SETTLE_SECONDS + 200)
+        self.recent_cursor = encode_cursor(self.recent_changes, 0)
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import dispatch_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued OutboundEmail rows over a reused mail connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Seconds to sleep when the outbox is empty. 0 drains it once and exits.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Emails claimed (and sent over one connection) per batch.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        batch_size = options["batch_size"]
+
+        try:
+            while True:
+                sent, failed = self.drain(batch_size)
+                if sent or failed:
+                    self.stdout.write(f"Outbox: sent {sent}, failed {failed}")
+                if interval <= 0:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write("Outbox dispatcher stopped.")
+
+    def drain(self, batch_size):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = dispatch_outbox(batch_size)
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < batch_size:
+                return total_sent, total_failed
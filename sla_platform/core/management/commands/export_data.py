@@ -0,0 +1,62 @@
+import datetime
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exports import DATASETS, DEFAULT_CHUNK_SIZE, FORMATS, stream_export
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = "Stream a dataset (tickets, audit, escalations, ...) as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(DATASETS))
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument("--start", type=_date, help="First day (YYYY-MM-DD), inclusive.")
+        parser.add_argument("--end", type=_date, help="Last day (YYYY-MM-DD), inclusive.")
+        parser.add_argument(
+            "--include-deleted",
+            action="store_true",
+            help="Tickets only: include soft-deleted rows."
+        )
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("-o", "--output", help="File to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        chunks = stream_export(
+            options["dataset"],
+            options["format"],
+            compress=options["gzip"],
+            start=options["start"],
+            end=options["end"],
+            include_deleted=options["include_deleted"],
+            chunk_size=options["chunk_size"]
+        )
+
+        if options["output"]:
+            try:
+                handle = open(options["output"], "wb")
+            except OSError as exc:
+                raise CommandError(f"Cannot open {options['output']}: {exc}")
+        else:
+            handle = sys.stdout.buffer
+
+        written = 0
+        try:
+            for chunk in chunks:
+                handle.write(chunk)
+                written += len(chunk)
+        finally:
+            if options["output"]:
+                handle.close()
+
+        if options["output"]:
+            self.stdout.write(f"Wrote {written} bytes to {options['output']}")
@@ -0,0 +1,39 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ingestion import DEFAULT_BATCH_SIZE, ingest_tickets
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create tickets from a CSV file with columns description, priority, "
+        "category and (unless --client is given) client."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument("--client", type=int, help="Client id for every row.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            handle = open(options["csv_path"], newline="", encoding="utf-8")
+        except OSError as exc:
+            raise CommandError(f"Cannot open {options['csv_path']}: {exc}")
+
+        with handle:
+            result = ingest_tickets(
+                csv.DictReader(handle),
+                client_id=options["client"],
+                batch_size=options["batch_size"]
+            )
+
+        for row_number, message in result.errors:
+            self.stderr.write(f"Row {row_number}: {message}")
+
+        self.stdout.write(
+            f"Created {result.created} tickets ({result.queued} queued), "
+            f"{len(result.errors)} rejected in {result.elapsed:.2f}s "
+            f"({result.tickets_per_second} tickets/s)"
+        )
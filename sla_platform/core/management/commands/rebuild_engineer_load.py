@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.engineer_load import rebuild_engineer_load
+
+
+class Command(BaseCommand):
+    help = "Recompute EngineerLoad counters from engineer profiles and open tickets."
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        with transaction.atomic():
+            engineers = rebuild_engineer_load()
+
+        self.stdout.write(
+            f"Rebuilt load counters for {engineers} engineers in {time.monotonic() - started:.2f}s"
+        )
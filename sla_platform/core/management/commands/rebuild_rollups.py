@@ -0,0 +1,34 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the GovernanceRollup buckets from the ticket table and the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Only rebuild buckets for tickets created on or after this date (YYYY-MM-DD)."
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = datetime.date.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format.")
+
+        started = time.monotonic()
+
+        with transaction.atomic():
+            buckets = rebuild_rollups(since)
+
+        self.stdout.write(
+            f"Rebuilt {buckets} rollup buckets in {time.monotonic() - started:.2f}s"
+        )
@@ -0,0 +1,83 @@
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.business_calendar import sla_deadline_for
+from core.models import Ticket
+from core import sla_cache
+from core.changes import stamp
+from core.risk_engine import calculate_risk_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute sla_deadline and risk for every ticket "
+        "(run after editing business calendars or contracts)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        started = time.monotonic()
+
+        sla_cache.clear_local()
+        contracts = sla_cache.get_contracts()
+        calendars = sla_cache.get_calendars()
+
+        rows = Ticket.all_objects.filter(
+            created_at__isnull=False
+        ).order_by("id").values_list(
+            "id", "client_id", "department_id", "priority", "created_at", "sla_deadline"
+        )
+
+        scanned = 0
+        updated = 0
+        last_id = 0
+
+        # One short transaction per chunk: memory stays flat and each chunk's
+        # stamps commit well inside the change feed's settle window
+        while True:
+            chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+            scanned += len(chunk)
+
+            changed = []
+            for ticket_id, client_id, department_id, priority, created_at, deadline in chunk:
+                hours = contracts.get((client_id, priority))
+                if hours is None:
+                    continue
+
+                new_deadline = sla_deadline_for(
+                    created_at,
+                    hours,
+                    calendars.for_ticket(client_id, department_id)
+                )
+                if new_deadline != deadline:
+                    changed.append(Ticket(id=ticket_id, sla_deadline=new_deadline))
+
+            with transaction.atomic():
+                fields = ["sla_deadline", *stamp(changed)]
+                Ticket.all_objects.bulk_update(changed, fields, batch_size=500)
+            updated += len(changed)
+
+        self.stdout.write(
+            f"Scanned {scanned} tickets, updated {updated} deadlines "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+
+        # Usage, and so risk, moved with the contract hours and calendars;
+        # the sweep only revisits open tickets
+        started = time.monotonic()
+        try:
+            rescored = calculate_risk_batch(Ticket.all_objects.all())
+        except ImproperlyConfigured as exc:
+            self.stderr.write(f"Risk scores not refreshed: {exc}")
+            return
+
+        self.stdout.write(f"Re-scored risk, updated {rescored} tickets in {time.monotonic() - started:.2f}s")
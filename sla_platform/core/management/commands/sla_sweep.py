@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Ticket
+from core.sla_engine import evaluate_sla_batch
+
+
+class Command(BaseCommand):
+    help = "Advance SLA state (risk, escalation, breach) for all active tickets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Seconds between sweeps. 0 runs a single sweep and exits.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Tickets evaluated (and committed) per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        chunk_size = options["chunk_size"]
+
+        try:
+            while True:
+                self.sweep(chunk_size)
+                if interval <= 0:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write("SLA sweeper stopped.")
+
+    def sweep(self, chunk_size):
+        started = time.monotonic()
+        now = timezone.now()
+
+        tickets = Ticket.objects.exclude(
+            status="RESOLVED"
+        ).order_by("id").iterator(chunk_size=chunk_size)
+
+        totals = {"tickets": 0, "chunks": 0, "CRITICAL_RISK": 0, "WARNING": 0}
+        chunk = []
+
+        for ticket in tickets:
+            chunk.append(ticket)
+            if len(chunk) >= chunk_size:
+                self._evaluate_chunk(chunk, now, totals)
+                chunk = []
+
+        if chunk:
+            self._evaluate_chunk(chunk, now, totals)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"[{now:%Y-%m-%d %H:%M:%S}] swept {totals['tickets']} tickets "
+            f"in {totals['chunks']} chunks, {elapsed:.2f}s "
+            f"(critical={totals['CRITICAL_RISK']}, warning={totals['WARNING']})"
+        )
+
+    def _evaluate_chunk(self, chunk, now, totals):
+        with transaction.atomic():
+            results = evaluate_sla_batch(chunk, now=now)
+
+        totals["tickets"] += len(chunk)
+        totals["chunks"] += 1
+        for status in results.values():
+            if status in totals:
+                totals[status] += 1
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_ticket_deleted_at_ticket_is_deleted_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticket',
+            name='sla_deadline',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
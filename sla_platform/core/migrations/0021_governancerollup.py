@@ -0,0 +1,64 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Ticket = apps.get_model('core', 'Ticket')
+    GovernanceRollup = apps.get_model('core', 'GovernanceRollup')
+
+    rows = Ticket.objects.filter(is_deleted=False).annotate(
+        day=TruncDate('created_at')
+    ).values('day', 'department_id', 'priority').annotate(
+        created=Count('id'),
+        resolved=Count('id', filter=Q(status='RESOLVED')),
+        breached=Count('id', filter=Q(breached=True)),
+        in_progress=Count('id', filter=Q(status='IN_PROGRESS')),
+        escalated=Count('id', filter=Q(escalation_count__gt=0)),
+        escalation_sum=Sum('escalation_count'),
+        resolution_count=Count('id', filter=Q(resolved_at__isnull=False)),
+        resolution_time=Sum(F('resolved_at') - F('created_at'), filter=Q(resolved_at__isnull=False)),
+    ).order_by()
+
+    rollups = []
+    for row in rows:
+        resolution_time = row.pop('resolution_time')
+        rollups.append(GovernanceRollup(
+            resolution_seconds=resolution_time.total_seconds() if resolution_time else 0,
+            **row
+        ))
+    GovernanceRollup.objects.bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_businesscalendar_workinghours_holiday'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GovernanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('priority', models.CharField(max_length=20)),
+                ('created', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+                ('breached', models.IntegerField(default=0)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('escalated', models.IntegerField(default=0)),
+                ('escalation_sum', models.IntegerField(default=0)),
+                ('resolution_count', models.IntegerField(default=0)),
+                ('resolution_seconds', models.FloatField(default=0)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.department')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'department', 'priority'], name='core_rollup_bucket_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
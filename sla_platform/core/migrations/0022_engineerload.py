@@ -0,0 +1,49 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_engineer_load(apps, schema_editor):
+    Ticket = apps.get_model('core', 'Ticket')
+    EngineerProfile = apps.get_model('core', 'EngineerProfile')
+    EngineerLoad = apps.get_model('core', 'EngineerLoad')
+
+    active = dict(
+        Ticket.objects.filter(
+            is_deleted=False,
+            status__in=['NEW', 'IN_PROGRESS', 'REOPENED'],
+            assigned_to__isnull=False
+        ).values('assigned_to').annotate(active=Count('id')).order_by().values_list('assigned_to', 'active')
+    )
+
+    EngineerLoad.objects.bulk_create([
+        EngineerLoad(user_id=user_id, department_id=department_id, active_tickets=active.get(user_id, 0))
+        for user_id, department_id in EngineerProfile.objects.values_list('user_id', 'team__department_id')
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_governancerollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EngineerLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('active_tickets', models.IntegerField(default=0)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.department')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='load', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['department', 'active_tickets'], name='core_engineer_load_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_engineer_load, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0.1 on 2026-10-17 22:10
+
+from django.db import migrations, models
+from django.db.models import Case, IntegerField, Sum, Value, When
+
+
+def backfill_weighted_load(apps, schema_editor):
+    Ticket = apps.get_model('core', 'Ticket')
+    EngineerLoad = apps.get_model('core', 'EngineerLoad')
+
+    weight = Case(
+        When(priority='CRITICAL', then=Value(4)),
+        When(priority='HIGH', then=Value(3)),
+        When(priority='MEDIUM', then=Value(2)),
+        default=Value(1),
+        output_field=IntegerField()
+    )
+    weighted = Ticket.objects.filter(
+        is_deleted=False,
+        status__in=['NEW', 'IN_PROGRESS', 'REOPENED'],
+        assigned_to__isnull=False
+    ).values('assigned_to').annotate(weighted=Sum(weight)).order_by()
+
+    for row in weighted:
+        EngineerLoad.objects.filter(user_id=row['assigned_to']).update(weighted_load=row['weighted'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_engineerload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='engineerload',
+            name='last_assigned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='engineerload',
+            name='weighted_load',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='engineerprofile',
+            name='capacity',
+            field=models.PositiveIntegerField(default=5),
+        ),
+        migrations.AddField(
+            model_name='engineerprofile',
+            name='skills',
+            field=models.CharField(blank=True, help_text='Comma-separated ticket categories, e.g. NETWORK,CLOUD. Empty = any category.', max_length=255),
+        ),
+        migrations.RunPython(backfill_weighted_load, migrations.RunPython.noop),
+    ]
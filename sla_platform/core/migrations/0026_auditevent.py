@@ -0,0 +1,75 @@
+# Generated by Django 6.0.1 on 2026-10-17 23:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+CHUNK_SIZE = 2000
+
+# TicketAudit rows with this prefix repeat a TicketAuditLog row
+STATUS_ACTION_PREFIX = 'Status changed to '
+
+
+def _chunks(queryset):
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).order_by('id')[:CHUNK_SIZE])
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def copy_legacy_audit(apps, schema_editor):
+    TicketAuditLog = apps.get_model('core', 'TicketAuditLog')
+    TicketAudit = apps.get_model('core', 'TicketAudit')
+    AuditEvent = apps.get_model('core', 'AuditEvent')
+
+    for rows in _chunks(TicketAuditLog.objects.all()):
+        AuditEvent.objects.bulk_create([
+            AuditEvent(
+                event_type='STATUS_CHANGED',
+                ticket_id=row.ticket_id,
+                actor_id=row.changed_by_id,
+                payload={'old': row.old_status, 'new': row.new_status},
+                created_at=row.changed_at
+            )
+            for row in rows
+        ])
+
+    for rows in _chunks(TicketAudit.objects.exclude(action__startswith=STATUS_ACTION_PREFIX)):
+        AuditEvent.objects.bulk_create([
+            AuditEvent(
+                event_type='NOTE',
+                ticket_id=row.ticket_id,
+                actor_id=row.performed_by_id,
+                payload={'action': row.action},
+                created_at=row.timestamp
+            )
+            for row in rows
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_notification_coalescing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('STATUS_CHANGED', 'Status changed'), ('ASSIGNED', 'Assigned'), ('REASSIGNED', 'Reassigned'), ('ESCALATED', 'Escalated'), ('REOPENED', 'Reopened'), ('DELETED', 'Deleted'), ('NOTE', 'Note')], max_length=20)),
+                ('ticket_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('actor_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ticket_id', 'created_at'], name='core_audit_ticket_idx'), models.Index(fields=['created_at'], name='core_audit_time_idx')],
+            },
+        ),
+        migrations.RunPython(copy_legacy_audit, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-18 00:25
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_auditevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_id', models.PositiveBigIntegerField(unique=True)),
+                ('client_id', models.PositiveBigIntegerField(db_index=True)),
+                ('department_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('assigned_to_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('priority', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('breached', models.BooleanField(default=False)),
+                ('escalation_count', models.IntegerField(default=0)),
+                ('risk_level', models.CharField(blank=True, max_length=20, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='core_archive_created_idx'), models.Index(fields=['assigned_to_id'], name='core_archive_engineer_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 6.0.1 on 2026-10-18 00:55
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Max
+from django.db.models.functions import Coalesce
+
+
+def stamp_existing_tickets(apps, schema_editor):
+    # Existing rows enter the feed in id order, ahead of any new write
+    Ticket = apps.get_model('core', 'Ticket')
+    ChangeSequence = apps.get_model('core', 'ChangeSequence')
+
+    Ticket.objects.update(
+        change_seq=F('id'),
+        updated_at=Coalesce('deleted_at', 'resolved_at', 'created_at')
+    )
+    last_id = Ticket.objects.aggregate(last=Max('id'))['last'] or 0
+    ChangeSequence.objects.create(name='tickets', value=last_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_archivedticket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(stamp_existing_tickets, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['change_seq'], name='core_ticket_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['client', 'change_seq'], name='core_ticket_client_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['assigned_to', 'change_seq'], name='core_ticket_engineer_seq_idx'),
+        ),
+    ]
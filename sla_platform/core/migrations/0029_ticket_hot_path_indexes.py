@@ -0,0 +1,55 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_ticket_change_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticket',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='client',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.client'),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='department',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.department'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('is_deleted', False), models.Q(('status', 'RESOLVED'), _negated=True)), fields=['sla_deadline', 'id'], name='core_ticket_open_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('is_deleted', False), models.Q(('status', 'RESOLVED'), _negated=True)), fields=['assigned_to', 'sla_deadline', 'id'], name='core_ticket_assignee_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['assigned_to', 'status', 'breached', 'is_deleted'], name='core_ticket_assignee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['client', 'status', 'breached', 'is_deleted'], name='core_ticket_client_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['department', 'status', 'assigned_to', 'is_deleted'], name='core_ticket_department_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['risk_level', 'id'], name='core_ticket_risk_idx'),
+        ),
+    ]
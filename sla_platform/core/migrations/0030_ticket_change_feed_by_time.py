@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_ticket_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='ChangeSequence',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='core_ticket_seq_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='core_ticket_client_seq_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='core_ticket_engineer_seq_idx',
+        ),
+        migrations.RemoveField(
+            model_name='ticket',
+            name='change_seq',
+        ),
+        migrations.AddIndex(
+            model_name='archivedticket',
+            index=models.Index(fields=['archived_at', 'ticket_id'], name='core_archive_archived_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['updated_at', 'id'], name='core_ticket_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['client', 'updated_at', 'id'], name='core_ticket_client_upd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['assigned_to', 'updated_at', 'id'], name='core_ticket_engineer_upd_idx'),
+        ),
+    ]
@@ -1,11 +1,119 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
 from django.utils import timezone
 
 
+# ---------------- SQL HELPERS ---------------- #
+
+class EpochSeconds(models.Func):
+    """Seconds since the Unix epoch for a datetime expression."""
+
+    template = "EXTRACT(EPOCH FROM %(expressions)s)"
+    output_field = models.FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="((julianday(%(expressions)s) - 2440587.5) * 86400.0)",
+            **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="UNIX_TIMESTAMP(%(expressions)s)",
+            **extra_context
+        )
+
+
+# ---------------- TICKET QUERYSET ---------------- #
+
+class TicketQuerySet(models.QuerySet):
+
+    def with_sla_metrics(self, now=None):
+        """
+        Annotate SLA usage computed by the database, mirroring
+        calculate_time_metrics: sla_hours, sla_used_seconds,
+        remaining_seconds, usage_percent and sla_bucket
+        (NO_SLA_DEFINED / RESOLVED / CRITICAL_RISK / WARNING / ON_TRACK).
+
+        Figures are wall-clock; tickets under a BusinessCalendar are
+        corrected per row by sla_engine.sla_row_metrics().
+        """
+        if now is None:
+            now = timezone.now()
+
+        contract_hours = SLAContract.objects.filter(
+            client=OuterRef("client"),
+            priority=OuterRef("priority")
+        ).values("resolution_time_hours")[:1]
+
+        end_time = Coalesce(
+            "resolved_at",
+            Value(now, output_field=models.DateTimeField())
+        )
+        allowed_seconds = F("sla_hours") * 3600.0
+
+        return self.annotate(
+            sla_hours=Subquery(contract_hours, output_field=models.IntegerField()),
+            sla_used_seconds=Greatest(
+                EpochSeconds(end_time)
+                - EpochSeconds("created_at")
+                - Coalesce("total_pause_duration", 0.0) * 3600.0,
+                Value(0.0)
+            ),
+        ).annotate(
+            remaining_seconds=Greatest(
+                allowed_seconds - F("sla_used_seconds"),
+                Value(0.0)
+            ),
+            usage_percent=Case(
+                When(
+                    sla_hours__gt=0,
+                    then=F("sla_used_seconds") * 100.0 / allowed_seconds
+                ),
+                default=Value(0.0),
+                output_field=models.FloatField()
+            ),
+        ).annotate(
+            sla_bucket=Case(
+                When(sla_hours__isnull=True, then=Value("NO_SLA_DEFINED")),
+                When(status="RESOLVED", then=Value("RESOLVED")),
+                When(usage_percent__gte=90, then=Value("CRITICAL_RISK")),
+                When(usage_percent__gte=70, then=Value("WARNING")),
+                default=Value("ON_TRACK"),
+                output_field=models.CharField()
+            ),
+        )
+
+    def closest_to_breach(self, limit=50, now=None):
+        """
+        Open tickets whose SLA deadline is still ahead, nearest first,
+        walked via the open-deadline index. Tickets already past their
+        deadline have breached and are left out.
+        """
+        if now is None:
+            now = timezone.now()
+
+        # Separate excludes so the open-deadline index's condition matches
+        return self.exclude(
+            status="RESOLVED"
+        ).exclude(
+            status="BREACHED"
+        ).filter(
+            sla_deadline__gte=now
+        ).order_by("sla_deadline", "id").with_sla_metrics(now)[:limit]
+
+
 # ---------------- SOFT DELETE MANAGER ---------------- #
 
-class ActiveTicketManager(models.Manager):
+class ActiveTicketManager(models.Manager.from_queryset(TicketQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(is_deleted=False)
 
@@ -41,6 +149,21 @@ class EngineerProfile(models.Model):
     team = models.ForeignKey(Team, on_delete=models.CASCADE, null=True, blank=True)
     is_team_lead = models.BooleanField(default=False)
 
+    # Assignment policy inputs (see core.assignment)
+    capacity = models.PositiveIntegerField(default=5)
+    skills = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Comma-separated ticket categories, e.g. NETWORK,CLOUD. Empty = any category."
+    )
+
+    def skill_set(self):
+        return frozenset(
+            skill.strip().upper()
+            for skill in self.skills.split(",")
+            if skill.strip()
+        )
+
     def __str__(self):
         return f"{self.user.username} - {self.team.name if self.team else 'No Team'}"
 
@@ -64,6 +187,52 @@ class SLAContract(models.Model):
         return f"{self.client.name} - {self.priority}"
 
 
+# ---------------- BUSINESS CALENDARS ---------------- #
+
+class BusinessCalendar(models.Model):
+    name = models.CharField(max_length=100)
+    timezone = models.CharField(max_length=64, default=settings.TIME_ZONE)
+
+    # A client calendar wins over its ticket's department calendar
+    client = models.OneToOneField(Client, on_delete=models.CASCADE, null=True, blank=True)
+    department = models.OneToOneField(Department, on_delete=models.CASCADE, null=True, blank=True)
+
+    def __str__(self):
+        return self.name
+
+
+class WorkingHours(models.Model):
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+
+    calendar = models.ForeignKey(BusinessCalendar, on_delete=models.CASCADE, related_name="working_hours")
+    weekday = models.IntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    def __str__(self):
+        return f"{self.get_weekday_display()} {self.start_time}-{self.end_time}"
+
+
+class Holiday(models.Model):
+    calendar = models.ForeignKey(BusinessCalendar, on_delete=models.CASCADE, related_name="holidays")
+    date = models.DateField()
+    name = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        unique_together = ("calendar", "date")
+
+    def __str__(self):
+        return f"{self.date} {self.name}"
+
+
 # ---------------- TICKET MODEL ---------------- #
 
 class Ticket(models.Model):
@@ -102,9 +271,10 @@ class Ticket(models.Model):
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
-    client = models.ForeignKey(Client, on_delete=models.CASCADE)
-    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
-    department = models.ForeignKey(Department, null=True, blank=True, on_delete=models.SET_NULL)
+    # Foreign key lookups use the composite indexes in Meta, which lead with them
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, db_index=False)
+    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, db_index=False)
+    department = models.ForeignKey(Department, null=True, blank=True, on_delete=models.SET_NULL, db_index=False)
 
     priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
@@ -121,15 +291,60 @@ class Ticket(models.Model):
     breach_time = models.DateTimeField(null=True, blank=True)
     risk_score = models.FloatField(null=True, blank=True)
     risk_level = models.CharField(max_length=20, null=True, blank=True)
-    sla_deadline = models.DateTimeField(null=True, blank=True)
+    # Serves the resolved urgency segment and the all-ticket deadline order,
+    # which core_ticket_open_deadline_idx cannot; set once per ticket
+    sla_deadline = models.DateTimeField(null=True, blank=True, db_index=True)
 
     sla_paused = models.BooleanField(default=False)
     pause_started_at = models.DateTimeField(null=True, blank=True)
     total_pause_duration = models.FloatField(default=0)
 
+    # Change feed (core.changes): stamped on every write
+    updated_at = models.DateTimeField(default=timezone.now)
+
     # Managers
     objects = ActiveTicketManager()
-    all_objects = models.Manager()
+    all_objects = TicketQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="core_ticket_updated_idx"),
+            models.Index(fields=["client", "updated_at", "id"], name="core_ticket_client_upd_idx"),
+            models.Index(fields=["assigned_to", "updated_at", "id"], name="core_ticket_engineer_upd_idx"),
+
+            # Hot paths (manage.py bench_ticket_queries). Ticket.objects always
+            # adds is_deleted=False; the partial indexes only hold those rows.
+            # is_deleted is repeated as a column so counts stay index-only.
+            models.Index(
+                fields=["sla_deadline", "id"],
+                condition=Q(is_deleted=False) & ~Q(status="RESOLVED"),
+                name="core_ticket_open_deadline_idx",
+            ),
+            models.Index(
+                fields=["assigned_to", "sla_deadline", "id"],
+                condition=Q(is_deleted=False) & ~Q(status="RESOLVED"),
+                name="core_ticket_assignee_open_idx",
+            ),
+            models.Index(
+                fields=["assigned_to", "status", "breached", "is_deleted"],
+                condition=Q(is_deleted=False),
+                name="core_ticket_assignee_idx",
+            ),
+            models.Index(
+                fields=["client", "status", "breached", "is_deleted"],
+                condition=Q(is_deleted=False),
+                name="core_ticket_client_idx",
+            ),
+            models.Index(
+                fields=["department", "status", "assigned_to", "is_deleted"],
+                name="core_ticket_department_idx",
+            ),
+            models.Index(
+                fields=["risk_level", "id"],
+                condition=Q(is_deleted=False),
+                name="core_ticket_risk_idx",
+            ),
+        ]
 
     def soft_delete(self):
         self.is_deleted = True
@@ -141,26 +356,83 @@ class Ticket(models.Model):
         self.deleted_at = None
         self.save()
 
+    # ---------------- DIRTY FIELD TRACKING ---------------- #
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def mark_clean(self, fields=None):
+        """Record the current values of `fields` (default: all) as persisted."""
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            loaded = self._loaded_values = {}
+
+        for field in self._meta.concrete_fields:
+            if fields is None or field.name in fields or field.attname in fields:
+                loaded[field.attname] = getattr(self, field.attname)
+
+    def get_dirty_fields(self):
+        """
+        Names of fields whose value changed since the last load/save, or
+        None when the instance was not loaded from the database. Deferred
+        fields count as dirty once they hold a value.
+        """
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return None
+
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.attname in loaded:
+                if getattr(self, field.attname) != loaded[field.attname]:
+                    dirty.append(field.name)
+            elif field.attname in self.__dict__:
+                dirty.append(field.name)
+
+        return dirty
+
     def save(self, *args, **kwargs):
 
         # Set SLA deadline
         if not self.sla_deadline and self.created_at:
-            try:
-                sla = SLAContract.objects.get(
-                    client=self.client,
-                    priority=self.priority
-                )
-                self.sla_deadline = self.created_at + timezone.timedelta(
-                    hours=sla.resolution_time_hours
+            from .business_calendar import sla_deadline_for
+            from .sla_cache import get_contract_hours, get_ticket_calendar
+
+            hours = get_contract_hours(self.client_id, self.priority)
+            if hours is not None:
+                self.sla_deadline = sla_deadline_for(
+                    self.created_at,
+                    hours,
+                    get_ticket_calendar(self.client_id, self.department_id)
                 )
-            except SLAContract.DoesNotExist:
-                pass
 
         # Auto set resolved_at
         if self.status == "RESOLVED" and not self.resolved_at:
             self.resolved_at = timezone.now()
 
+        # Coalesce plain saves of loaded rows into an UPDATE of changed columns only
+        if not args and not self._state.adding and kwargs.get("update_fields") is None \
+                and not kwargs.get("force_insert") and not kwargs.get("force_update"):
+            dirty = self.get_dirty_fields()
+            if dirty is not None:
+                if not dirty:
+                    return
+                kwargs["update_fields"] = dirty
+
+        from .changes import STAMP_FIELDS, stamp
+
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = [
+                *kwargs["update_fields"],
+                *(field for field in STAMP_FIELDS if field not in kwargs["update_fields"])
+            ]
+
+        stamp([self])
         super().save(*args, **kwargs)
+        self.mark_clean(kwargs.get("update_fields"))
 
     def __str__(self):
         return f"Ticket #{self.id}"
@@ -183,6 +455,9 @@ class EscalationLog(models.Model):
     level = models.IntegerField()
 
 
+# Legacy audit tables, superseded by AuditEvent and no longer written.
+# Migration 0026 copied their rows into the journal.
+
 class TicketAuditLog(models.Model):
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE)
     changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
@@ -198,9 +473,193 @@ class TicketAudit(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
 
 
+# ---------------- AUDIT JOURNAL ---------------- #
+
+class AuditEvent(models.Model):
+    """
+    Append-only ticket journal, written in batches through core.audit.
+    Ticket and actor are plain ids so entries outlive archived or
+    deleted rows.
+    """
+    EVENT_CHOICES = [
+        ('STATUS_CHANGED', 'Status changed'),
+        ('ASSIGNED', 'Assigned'),
+        ('REASSIGNED', 'Reassigned'),
+        ('ESCALATED', 'Escalated'),
+        ('REOPENED', 'Reopened'),
+        ('DELETED', 'Deleted'),
+        ('NOTE', 'Note'),
+    ]
+
+    event_type = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    ticket_id = models.PositiveBigIntegerField(null=True, blank=True)
+    actor_id = models.PositiveIntegerField(null=True, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ticket_id", "created_at"], name="core_audit_ticket_idx"),
+            models.Index(fields=["created_at"], name="core_audit_time_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.ticket_id}"
+
+
 class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, null=True, blank=True)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Written by core.notifications: repeated events fold into one row
+    event_type = models.CharField(max_length=20, blank=True)
+    count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "is_read", "created_at"], name="core_notification_inbox_idx"),
+        ]
+
+
+# ---------------- GOVERNANCE ROLLUPS ---------------- #
+
+class GovernanceRollup(models.Model):
+    """
+    Governance counters for the tickets created on `day` in one
+    department/priority, maintained incrementally by core.rollups.
+    Readers always Sum() over rows, so a duplicated bucket is harmless.
+    """
+    day = models.DateField()
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True)
+    priority = models.CharField(max_length=20)
+
+    created = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+    breached = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    escalated = models.IntegerField(default=0)
+    escalation_sum = models.IntegerField(default=0)
+    resolution_count = models.IntegerField(default=0)
+    resolution_seconds = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["day", "department", "priority"], name="core_rollup_bucket_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.department_id} {self.priority}"
+
+
+# ---------------- ENGINEER LOAD ---------------- #
+
+class EngineerLoad(models.Model):
+    """
+    Active ticket count per engineer, maintained by core.engineer_load on
+    every assignment, status change and soft delete. `department` mirrors
+    the engineer's team so a department's loads are one indexed query.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="load")
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True)
+    active_tickets = models.IntegerField(default=0)
+    # Active tickets weighted by priority (risk_engine.PRIORITY_WEIGHTS)
+    weighted_load = models.IntegerField(default=0)
+    last_assigned_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["department", "active_tickets"], name="core_engineer_load_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.active_tickets}"
+
+
+# ---------------- EMAIL OUTBOX ---------------- #
+
+class OutboundEmail(models.Model):
+    """
+    Email queued in the same transaction as the change it reports and
+    delivered later by `manage.py dispatch_outbox` (core.outbox).
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    ticket = models.ForeignKey(Ticket, on_delete=models.SET_NULL, null=True, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="core_outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject}"
+
+
+# ---------------- ARCHIVE ---------------- #
+
+class ArchivedTicket(models.Model):
+    """
+    Resolved or soft-deleted ticket moved out of the hot table by
+    core.archive. `data` holds the ticket row and its escalation,
+    notification and legacy audit rows; the columns that lookups and
+    governance history filter on are copied out as plain values.
+    """
+    ticket_id = models.PositiveBigIntegerField(unique=True)
+    client_id = models.PositiveBigIntegerField(db_index=True)
+    department_id = models.PositiveBigIntegerField(null=True, blank=True)
+    assigned_to_id = models.PositiveIntegerField(null=True, blank=True)
+
+    priority = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    breached = models.BooleanField(default=False)
+    escalation_count = models.IntegerField(default=0)
+    risk_level = models.CharField(max_length=20, null=True, blank=True)
+    is_deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"], name="core_archive_created_idx"),
+            models.Index(fields=["assigned_to_id"], name="core_archive_engineer_idx"),
+            # Tombstones in the change feed (core.changes)
+            models.Index(fields=["archived_at", "ticket_id"], name="core_archive_archived_idx"),
+        ]
+
+    def __str__(self):
+        return f"Archived ticket #{self.ticket_id}"
+
+
+# ---------------- CACHE GENERATIONS ---------------- #
+
+class CacheGeneration(models.Model):
+    """
+    Named counter bumped whenever the data behind a process-local cache
+    changes (core.sla_cache); readers reload when it moved.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
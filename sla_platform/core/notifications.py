@@ -0,0 +1,173 @@
+"""
+In-app notification service.
+
+Callers add events to a NotificationBuffer and flush it once per request or
+batch, so a fan-out is one SELECT plus one bulk_create/bulk_update instead
+of a row per event. A repeat of an unread (user, ticket, event) notification
+inside the coalescing window bumps the existing row's count instead of
+adding a row, and a user receiving more than the digest threshold of new
+rows in one flush gets a single summary row instead.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification
+from . import live
+
+
+COALESCE_SECONDS = getattr(settings, "NOTIFICATION_COALESCE_SECONDS", 600)
+DIGEST_THRESHOLD = getattr(settings, "NOTIFICATION_DIGEST_THRESHOLD", 10)
+
+# Unread rows shown on the dashboard
+DASHBOARD_LIMIT = 50
+
+EVENT_LABELS = {
+    "ASSIGNED": "assigned",
+    "REOPENED": "reopened",
+    "DELETED": "deleted",
+    "ESCALATED": "escalated",
+}
+
+
+class NotificationBuffer:
+
+    def __init__(self, coalesce_seconds=COALESCE_SECONDS, digest_threshold=DIGEST_THRESHOLD):
+        self.coalesce_seconds = coalesce_seconds
+        self.digest_threshold = digest_threshold
+        # (user_id, ticket_id, event_type) -> [message, count], in arrival order
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, user_id, message, ticket_id=None, event_type=""):
+        if user_id is None:
+            return
+
+        key = (user_id, ticket_id, event_type)
+        entry = self._pending.get(key)
+        if entry is None:
+            self._pending[key] = [message, 1]
+        else:
+            entry[0] = message
+            entry[1] += 1
+
+    # ---------------- FLUSH ---------------- #
+
+    def _coalesce_existing(self, now):
+        """Fold pending events into matching unread rows inside the window."""
+        if not self.coalesce_seconds:
+            return []
+
+        since = now - timezone.timedelta(seconds=self.coalesce_seconds)
+        existing = Notification.objects.filter(
+            user_id__in={user_id for user_id, ticket_id, event_type in self._pending},
+            is_read=False,
+            created_at__gte=since
+        ).exclude(event_type="").order_by("created_at")
+
+        updated = {}
+        for notification in existing:
+            key = (notification.user_id, notification.ticket_id, notification.event_type)
+            if key in self._pending:
+                updated[key] = notification
+
+        for key, notification in updated.items():
+            message, count = self._pending.pop(key)
+            notification.message = message
+            notification.count += count
+            notification.created_at = now
+
+        return list(updated.values())
+
+    def _digest(self, rows):
+        """Collapse each user's rows above the threshold into one summary."""
+        if not self.digest_threshold:
+            return rows
+
+        per_user = Counter(row.user_id for row in rows)
+        heavy = {user_id for user_id, total in per_user.items() if total > self.digest_threshold}
+        if not heavy:
+            return rows
+
+        kept = [row for row in rows if row.user_id not in heavy]
+        for user_id in heavy:
+            events = Counter()
+            tickets = []
+            for row in rows:
+                if row.user_id == user_id:
+                    events[row.event_type] += row.count
+                    if row.ticket_id and row.ticket_id not in tickets:
+                        tickets.append(row.ticket_id)
+
+            total = sum(events.values())
+            summary = ", ".join(
+                f"{count} {EVENT_LABELS.get(event_type, event_type.lower() or 'other')}"
+                for event_type, count in events.most_common()
+            )
+            shown = ", ".join(f"#{ticket_id}" for ticket_id in tickets[:10])
+            more = f" and {len(tickets) - 10} more" if len(tickets) > 10 else ""
+
+            kept.append(Notification(
+                user_id=user_id,
+                message=f"{total} new updates ({summary}) on tickets {shown}{more}.",
+                event_type="DIGEST",
+                count=total
+            ))
+
+        return kept
+
+    def flush(self):
+        """Write everything buffered; returns the number of rows touched."""
+        if not self._pending:
+            return 0
+
+        now = timezone.now()
+        updated = self._coalesce_existing(now)
+        if updated:
+            Notification.objects.bulk_update(updated, ["message", "count", "created_at"], batch_size=500)
+
+        rows = self._digest([
+            Notification(
+                user_id=user_id,
+                ticket_id=ticket_id,
+                event_type=event_type,
+                message=message,
+                count=count
+            )
+            for (user_id, ticket_id, event_type), (message, count) in self._pending.items()
+        ])
+        Notification.objects.bulk_create(rows, batch_size=500)
+
+        # Live stream fast path for connections served by this process
+        written = updated + rows
+        transaction.on_commit(lambda: live.announce_notifications(written))
+
+        self._pending = {}
+        return len(updated) + len(rows)
+
+
+@contextmanager
+def buffered_notifications(**options):
+    """Collect notifications for a block and write them when it exits."""
+    buffer = NotificationBuffer(**options)
+    yield buffer
+    buffer.flush()
+
+
+def notify(user_id, message, ticket_id=None, event_type=""):
+    """Write one notification now, still coalescing with recent repeats."""
+    buffer = NotificationBuffer(digest_threshold=0)
+    buffer.add(user_id, message, ticket_id, event_type)
+    buffer.flush()
+
+
+def unread_notifications(user, limit=DASHBOARD_LIMIT):
+    """(newest unread rows capped at limit, total unread count)."""
+    unread = Notification.objects.filter(user=user, is_read=False)
+    return list(unread.order_by("-created_at")[:limit]), unread.count()
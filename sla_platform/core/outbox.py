@@ -0,0 +1,151 @@
+"""
+Transactional email outbox.
+
+Views and engines call queue_email()/queue_emails() inside the transaction
+that changes the ticket, so a rolled-back change never mails anybody and a
+slow SMTP server never blocks a request. dispatch_outbox() (run by
+`manage.py dispatch_outbox`) claims due rows with a short lease, coalesces
+messages per recipient, sends them over one reused connection and
+reschedules failures with exponential backoff.
+"""
+
+from django.core import mail
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+FROM_EMAIL = "noreply@sla-enterprise.com"
+
+# A claimed row is invisible to other dispatchers for this long
+LEASE_SECONDS = 300
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 3600
+
+
+# ---------------- QUEUEING ---------------- #
+
+def queue_email(recipient, subject, body, ticket=None):
+    """Queue one email; a blank recipient is ignored."""
+    if not recipient:
+        return None
+    return OutboundEmail.objects.create(
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        ticket=ticket
+    )
+
+
+def queue_emails(messages):
+    """Queue many (recipient, subject, body, ticket) tuples in one INSERT."""
+    OutboundEmail.objects.bulk_create([
+        OutboundEmail(recipient=recipient, subject=subject, body=body, ticket=ticket)
+        for recipient, subject, body, ticket in messages
+        if recipient
+    ], batch_size=500)
+
+
+# ---------------- DISPATCH ---------------- #
+
+def backoff_seconds(attempts):
+    return min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+
+
+def _claim(batch_size, now):
+    """Lease up to batch_size due rows so concurrent dispatchers skip them."""
+    with transaction.atomic():
+        rows = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True).filter(
+                status="PENDING",
+                next_attempt_at__lte=now
+            ).order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if rows:
+            OutboundEmail.objects.filter(
+                id__in=[row.id for row in rows]
+            ).update(next_attempt_at=now + timezone.timedelta(seconds=LEASE_SECONDS))
+    return rows
+
+
+def _coalesce(rows):
+    """One EmailMessage per recipient; several rows become a digest."""
+    by_recipient = {}
+    for row in rows:
+        by_recipient.setdefault(row.recipient, []).append(row)
+
+    for recipient, group in by_recipient.items():
+        if len(group) == 1:
+            subject, body = group[0].subject, group[0].body
+        else:
+            subject = f"{len(group)} SLA notifications"
+            body = "\n\n".join(f"{row.subject}\n{row.body}" for row in group)
+
+        message = mail.EmailMessage(
+            subject=subject,
+            body=body,
+            from_email=FROM_EMAIL,
+            to=[recipient]
+        )
+        yield message, group
+
+
+def dispatch_outbox(batch_size=200, now=None, connection=None):
+    """
+    Deliver one batch of due emails. Returns (sent_rows, failed_rows);
+    rows that exhaust MAX_ATTEMPTS are marked FAILED. If the connection
+    cannot be opened, every claimed row fails this attempt.
+    """
+    if now is None:
+        now = timezone.now()
+
+    rows = _claim(batch_size, now)
+    if not rows:
+        return 0, 0
+
+    if connection is None:
+        connection = mail.get_connection()
+
+    sent, failed = [], []
+    try:
+        connection.open()
+    except Exception as exc:
+        for row in rows:
+            row.last_error = str(exc)[:1000]
+        failed.extend(rows)
+    else:
+        try:
+            for message, group in _coalesce(rows):
+                try:
+                    connection.send_messages([message])
+                except Exception as exc:
+                    for row in group:
+                        row.last_error = str(exc)[:1000]
+                    failed.extend(group)
+                else:
+                    sent.extend(group)
+        finally:
+            connection.close()
+
+    finished = timezone.now()
+    for row in sent:
+        row.status = "SENT"
+        row.sent_at = finished
+        row.attempts += 1
+
+    for row in failed:
+        row.attempts += 1
+        if row.attempts >= MAX_ATTEMPTS:
+            row.status = "FAILED"
+        else:
+            row.next_attempt_at = finished + timezone.timedelta(seconds=backoff_seconds(row.attempts))
+
+    OutboundEmail.objects.bulk_update(
+        sent + failed,
+        ["status", "sent_at", "attempts", "next_attempt_at", "last_error"],
+        batch_size=500
+    )
+    return len(sent), len(failed)
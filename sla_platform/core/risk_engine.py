@@ -1,4 +1,18 @@
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
+from .business_calendar import elapsed_seconds
 from .models import Ticket
+from .sla_cache import get_calendars, get_contracts
+from .changes import stamp
+
+try:
+    import numpy as np
+except ImportError:  # only calculate_risk_batch / RiskFrame need it
+    np = None
 
 
 PRIORITY_WEIGHTS = {
@@ -8,14 +22,26 @@ PRIORITY_WEIGHTS = {
     "LOW": 1,
 }
 
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH")
 
-def calculate_risk(ticket, usage_percent):
-    priority_weight = PRIORITY_WEIGHTS.get(ticket.priority, 1)
+# Coefficients of score_risk(); RiskFrame.score() accepts overrides of any of them
+DEFAULT_RISK_MODEL = {
+    "priority_weights": PRIORITY_WEIGHTS,
+    "usage_weight": 0.6,
+    "priority_factor": 10,
+    "escalation_weight": 5,
+    "thresholds": (40, 70),
+}
+
+
+def score_risk(priority, usage_percent, escalation_count):
+    """Pure risk formula shared by the per-ticket and batch paths."""
+    priority_weight = PRIORITY_WEIGHTS.get(priority, 1)
 
     risk_score = (
         (usage_percent * 0.6)
         + (priority_weight * 10)
-        + (ticket.escalation_count * 5)
+        + (escalation_count * 5)
     )
 
     risk_score = min(risk_score, 100)
@@ -27,8 +53,200 @@ def calculate_risk(ticket, usage_percent):
     else:
         risk_level = "HIGH"
 
+    return risk_score, risk_level
+
+
+def calculate_risk(ticket, usage_percent, commit=True):
+    """Score a ticket; commit=False leaves the write to the caller's single flush."""
+    risk_score, risk_level = score_risk(
+        ticket.priority,
+        usage_percent,
+        ticket.escalation_count
+    )
+
     ticket.risk_score = round(risk_score, 2)
     ticket.risk_level = risk_level
-    ticket.save()
+
+    if commit:
+        ticket.save()
 
     return risk_score, risk_level
+
+
+# ---------------- VECTORIZED BATCH SCORING ---------------- #
+
+def _require_numpy():
+    if np is None:
+        raise ImproperlyConfigured("Batch risk scoring requires numpy (pip install numpy).")
+
+
+class RiskFrame:
+    """
+    Column snapshot of tickets (usage, priority, escalations, current risk)
+    held as NumPy arrays, so the whole set can be re-scored with a handful
+    of vectorized operations. Priorities and levels are stored as integer
+    codes (indexes into `priority_names` / RISK_LEVELS, -1 for unset).
+    """
+
+    def __init__(self, ids, priority_codes, priority_names, usage, escalations,
+                 scores, level_codes, loaded_at):
+        self.ids = ids
+        self.priority_codes = priority_codes
+        self.priority_names = priority_names
+        self.usage = usage
+        self.escalations = escalations
+        self.scores = scores
+        self.level_codes = level_codes
+        self.loaded_at = loaded_at
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, queryset=None, now=None, chunk_size=5000):
+        """Read the scoring columns of every ticket (with an SLA) in `queryset`."""
+        _require_numpy()
+
+        if queryset is None:
+            queryset = Ticket.objects.all()
+        if now is None:
+            now = timezone.now()
+
+        contracts = get_contracts()
+        calendars = get_calendars()
+        now_ts = now.timestamp()
+
+        priority_index = {}
+        level_index = {level: code for code, level in enumerate(RISK_LEVELS)}
+
+        ids, priorities, escalations, scores, levels = [], [], [], [], []
+        used, allowed = [], []
+
+        rows = queryset.values_list(
+            "id", "client_id", "department_id", "priority", "created_at",
+            "resolved_at", "escalation_count", "risk_score", "risk_level"
+        )
+
+        for (ticket_id, client_id, department_id, priority, created_at,
+             resolved_at, escalation_count, risk_score, risk_level) in rows.iterator(chunk_size=chunk_size):
+
+            hours = contracts.get((client_id, priority))
+            if not hours:
+                continue
+
+            calendar = calendars.for_ticket(client_id, department_id) if calendars else None
+            if calendar is None:
+                end_ts = resolved_at.timestamp() if resolved_at else now_ts
+                used.append(end_ts - created_at.timestamp())
+            else:
+                used.append(elapsed_seconds(created_at, resolved_at or now, calendar))
+
+            allowed.append(hours * 3600)
+            ids.append(ticket_id)
+            priorities.append(priority_index.setdefault(priority, len(priority_index)))
+            escalations.append(escalation_count)
+            scores.append(np.nan if risk_score is None else risk_score)
+            levels.append(level_index.get(risk_level, -1))
+
+        return cls(
+            ids=np.array(ids, dtype=np.int64),
+            priority_codes=np.array(priorities, dtype=np.int16),
+            priority_names=list(priority_index),
+            usage=np.array(used, dtype=np.float64) / np.array(allowed, dtype=np.float64) * 100,
+            escalations=np.array(escalations, dtype=np.float64),
+            scores=np.array(scores, dtype=np.float64),
+            level_codes=np.array(levels, dtype=np.int8),
+            loaded_at=now,
+        )
+
+    def score(self, **model):
+        """
+        Vectorized score_risk() over the frame. Returns (scores, level_codes);
+        keyword arguments override DEFAULT_RISK_MODEL entries.
+        """
+        unknown = set(model) - set(DEFAULT_RISK_MODEL)
+        if unknown:
+            raise ValueError(f"Unknown risk model parameters: {', '.join(sorted(unknown))}")
+
+        model = {**DEFAULT_RISK_MODEL, **model}
+        weights = {**PRIORITY_WEIGHTS, **model["priority_weights"]}
+
+        # Unknown priorities weigh 1, as in score_risk()
+        weight_by_code = np.array(
+            [weights.get(name, 1) for name in self.priority_names] or [1],
+            dtype=np.float64
+        )
+        priority_weight = weight_by_code[self.priority_codes]
+
+        thresholds = np.asarray(model["thresholds"], dtype=np.float64)
+        if thresholds.shape != (2,) or not thresholds[0] < thresholds[1]:
+            raise ValueError("Risk thresholds must be two increasing numbers (low_max, medium_max).")
+
+        scores = np.minimum(
+            self.usage * model["usage_weight"]
+            + priority_weight * model["priority_factor"]
+            + self.escalations * model["escalation_weight"],
+            100
+        )
+
+        # score <= low_max -> LOW, <= medium_max -> MEDIUM, else HIGH; the
+        # level comes from the unrounded score, as in score_risk()
+        level_codes = np.searchsorted(thresholds, scores, side="left").astype(np.int8)
+
+        return np.round(scores, 2), level_codes
+
+    def simulate(self, **model):
+        """Re-score without writing and summarise the resulting level distribution."""
+        started = time.perf_counter()
+        scores, level_codes = self.score(**model)
+
+        counts = np.bincount(level_codes, minlength=len(RISK_LEVELS))
+        distribution = {level: int(counts[code]) for code, level in enumerate(RISK_LEVELS)}
+
+        return {
+            "tickets": len(self),
+            "distribution": distribution,
+            "level_changes": int(np.count_nonzero(level_codes != self.level_codes)),
+            "mean_score": round(float(scores.mean()), 2) if len(self) else 0,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+
+def calculate_risk_batch(queryset=None, now=None, batch_size=1000):
+    """
+    Re-score every ticket in `queryset` with vectorized ops and bulk-write
+    only the rows whose score or level moved. Returns the number written.
+    """
+    frame = RiskFrame.load(queryset, now=now)
+    if not len(frame):
+        return 0
+
+    scores, level_codes = frame.score()
+    changed = np.flatnonzero((scores != frame.scores) | (level_codes != frame.level_codes))
+
+    updates = [
+        Ticket(
+            id=int(frame.ids[i]),
+            risk_score=float(scores[i]),
+            risk_level=RISK_LEVELS[level_codes[i]]
+        )
+        for i in changed
+    ]
+
+    with transaction.atomic():
+        fields = ["risk_score", "risk_level", *stamp(updates)]
+        Ticket.all_objects.bulk_update(updates, fields, batch_size=batch_size)
+
+    return len(updates)
+
+
+_frame_cache = {"frame": None}
+
+
+def get_risk_frame(max_age=300):
+    """Process-wide RiskFrame over all tickets, reloaded after `max_age` seconds."""
+    frame = _frame_cache["frame"]
+    if frame is None or (timezone.now() - frame.loaded_at).total_seconds() > max_age:
+        frame = RiskFrame.load()
+        _frame_cache["frame"] = frame
+    return frame
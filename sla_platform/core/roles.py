@@ -0,0 +1,162 @@
+"""
+Per-request role resolution.
+
+RoleMiddleware attaches request.roles, an immutable Roles built from one
+query covering the user's groups, client profile and engineer profile.
+The result is memoised on the user object for the rest of the request
+and kept in Django's cache for ROLE_CACHE_SECONDS across requests; group
+membership, superuser and profile changes drop the cached entry once
+their transaction commits (see signals.py). Other processes only see
+the invalidation with a shared CACHES backend; the short TTL bounds
+staleness otherwise.
+"""
+
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.utils.functional import SimpleLazyObject
+
+
+KEY_PREFIX = "core:roles:"
+
+ROLE_CACHE_SECONDS = getattr(settings, "ROLE_CACHE_SECONDS", 60)
+
+ADMIN = "ADMIN"
+ENGINEERS = "ENGINEERS"
+CLIENTS = "CLIENTS"
+
+
+class Roles:
+    """What a user may act as; read-only."""
+
+    __slots__ = ("user_id", "groups", "is_superuser", "client_id", "engineer_profile_id")
+
+    def __init__(self, user_id=None, groups=(), is_superuser=False,
+                 client_id=None, engineer_profile_id=None):
+        for name, value in (
+            ("user_id", user_id),
+            ("groups", frozenset(groups)),
+            ("is_superuser", is_superuser),
+            ("client_id", client_id),
+            ("engineer_profile_id", engineer_profile_id),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Roles is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("Roles is read-only")
+
+    def __repr__(self):
+        return f"<Roles user={self.user_id} groups={sorted(self.groups)} client={self.client_id}>"
+
+    @property
+    def is_admin(self):
+        return ADMIN in self.groups or self.is_superuser
+
+    @property
+    def is_engineer(self):
+        return ENGINEERS in self.groups
+
+    @property
+    def is_client(self):
+        # A client is whoever has a Client profile, whatever the groups say
+        return self.client_id is not None
+
+    def has(self, role):
+        if role == ADMIN:
+            return self.is_admin
+        if role == CLIENTS:
+            return self.is_client
+        return role in self.groups
+
+    def cache_value(self):
+        return (tuple(sorted(self.groups)), self.is_superuser, self.client_id, self.engineer_profile_id)
+
+
+ANONYMOUS = Roles()
+
+
+def _load_roles(user_id):
+    rows = User.objects.filter(pk=user_id).values_list(
+        "is_superuser", "client__id", "engineerprofile__id", "groups__name"
+    )
+
+    groups = set()
+    is_superuser, client_id, engineer_profile_id = False, None, None
+    for is_superuser, client_id, engineer_profile_id, group in rows:
+        if group is not None:
+            groups.add(group)
+
+    return Roles(user_id, groups, is_superuser, client_id, engineer_profile_id)
+
+
+def get_roles(user):
+    """Roles of a user, resolved at most once per request."""
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS
+
+    roles = getattr(user, "_core_roles", None)
+    if roles is not None:
+        return roles
+
+    key = KEY_PREFIX + str(user.pk)
+    cached = cache.get(key)
+    if cached is not None:
+        roles = Roles(user.pk, *cached)
+    else:
+        roles = _load_roles(user.pk)
+        cache.set(key, roles.cache_value(), ROLE_CACHE_SECONDS)
+
+    user._core_roles = roles
+    return roles
+
+
+def forget_roles(user_ids):
+    """Drop cached roles of these users once the current transaction commits."""
+    keys = [KEY_PREFIX + str(user_id) for user_id in set(user_ids) if user_id is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# ---------------- MIDDLEWARE ---------------- #
+
+class RoleMiddleware:
+    """Set request.roles (lazily, so anonymous and static hits cost nothing)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.roles = SimpleLazyObject(lambda: get_roles(getattr(request, "user", None)))
+        return self.get_response(request)
+
+
+# ---------------- DECORATOR ---------------- #
+
+def require_role(*roles, redirect_to=None):
+    """
+    Login required, plus any one of `roles` (ADMIN, ENGINEERS, CLIENTS or a
+    group name). Others get a 403 JSON error, or a redirect to the
+    `redirect_to` URL name when given.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            user_roles = get_roles(request.user)
+            if not any(user_roles.has(role) for role in roles):
+                if redirect_to:
+                    return redirect(redirect_to)
+                return JsonResponse({"error": "Unauthorized"}, status=403)
+            return view(request, *args, **kwargs)
+
+        return login_required(wrapped)
+
+    return decorator
@@ -0,0 +1,239 @@
+"""
+Materialized governance counters per (creation day, department, priority).
+
+Every ticket save and every SLA engine batch applies the difference between
+the ticket's old and new contribution with F() increments, so governance
+reads sum a few hundred rows instead of scanning the ticket table. Tickets
+moved to the archive keep their contribution. Writes that bypass both
+paths (queryset.update(), raw SQL) are not tracked; run
+`manage.py rebuild_rollups` after such bulk edits.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ArchivedTicket, GovernanceRollup, Ticket
+
+
+# Counters kept per (day, department, priority) bucket, in contribution order
+ROLLUP_COUNTERS = (
+    "created",
+    "resolved",
+    "breached",
+    "in_progress",
+    "escalated",
+    "escalation_sum",
+    "resolution_count",
+    "resolution_seconds",
+)
+
+# Ticket attributes a bucket contribution depends on
+ROLLUP_STATE_ATTRS = (
+    "created_at",
+    "department_id",
+    "priority",
+    "status",
+    "breached",
+    "escalation_count",
+    "resolved_at",
+    "is_deleted",
+)
+
+# Field names (as passed in update_fields) that can move a ticket's buckets
+ROLLUP_FIELDS = frozenset(
+    attr[:-3] if attr.endswith("_id") else attr
+    for attr in ROLLUP_STATE_ATTRS
+)
+
+
+# ---------------- INCREMENTAL MAINTENANCE ---------------- #
+
+def ticket_state(ticket, overrides=None):
+    """The rollup-relevant attributes of a ticket, optionally patched."""
+    state = {attr: getattr(ticket, attr) for attr in ROLLUP_STATE_ATTRS}
+    if overrides:
+        state.update((attr, value) for attr, value in overrides.items() if attr in state)
+    return state
+
+
+def loaded_ticket_state(ticket):
+    """State as last loaded/saved (dirty tracking), or None if unknown."""
+    loaded = getattr(ticket, "_loaded_values", None)
+    if loaded is None:
+        return None
+    return {attr: loaded.get(attr, getattr(ticket, attr)) for attr in ROLLUP_STATE_ATTRS}
+
+
+def _contribution(state):
+    if state is None or state["is_deleted"] or state["created_at"] is None:
+        return None, None
+
+    resolution_seconds = 0.0
+    if state["resolved_at"]:
+        resolution_seconds = (state["resolved_at"] - state["created_at"]).total_seconds()
+
+    key = (
+        timezone.localdate(state["created_at"]),
+        state["department_id"],
+        state["priority"],
+    )
+    counters = (
+        1,
+        int(state["status"] == "RESOLVED"),
+        int(bool(state["breached"])),
+        int(state["status"] == "IN_PROGRESS"),
+        int(state["escalation_count"] > 0),
+        state["escalation_count"],
+        int(state["resolved_at"] is not None),
+        resolution_seconds,
+    )
+    return key, counters
+
+
+def record_ticket_changes(changes):
+    """
+    Apply (old_state, new_state) pairs to the rollups. old_state is None
+    for a new ticket; a soft-deleted state contributes nothing.
+    """
+    deltas = defaultdict(lambda: [0] * len(ROLLUP_COUNTERS))
+
+    for old_state, new_state in changes:
+        for sign, state in ((-1, old_state), (1, new_state)):
+            key, counters = _contribution(state)
+            if key is None:
+                continue
+            bucket = deltas[key]
+            for index, value in enumerate(counters):
+                bucket[index] += sign * value
+
+    for (day, department_id, priority), values in deltas.items():
+        changed = {
+            name: value
+            for name, value in zip(ROLLUP_COUNTERS, values)
+            if value
+        }
+        if not changed:
+            continue
+
+        updated = GovernanceRollup.objects.filter(
+            day=day,
+            department_id=department_id,
+            priority=priority
+        ).order_by("id")[:1].values_list("id", flat=True)
+
+        bucket_id = next(iter(updated), None)
+        if bucket_id is None:
+            GovernanceRollup.objects.create(
+                day=day,
+                department_id=department_id,
+                priority=priority,
+                **changed
+            )
+        else:
+            GovernanceRollup.objects.filter(id=bucket_id).update(**{
+                name: F(name) + value for name, value in changed.items()
+            })
+
+
+# ---------------- REBUILD ---------------- #
+
+def _bucket_rows(tickets):
+    return tickets.annotate(
+        day=TruncDate("created_at")
+    ).values(
+        "day", "department_id", "priority"
+    ).annotate(
+        created=Count("id"),
+        resolved=Count("id", filter=Q(status="RESOLVED")),
+        breached=Count("id", filter=Q(breached=True)),
+        in_progress=Count("id", filter=Q(status="IN_PROGRESS")),
+        escalated=Count("id", filter=Q(escalation_count__gt=0)),
+        escalation_sum=Sum("escalation_count"),
+        resolution_count=Count("id", filter=Q(resolved_at__isnull=False)),
+        resolution_time=Sum(
+            F("resolved_at") - F("created_at"),
+            filter=Q(resolved_at__isnull=False)
+        ),
+    ).order_by()
+
+
+def rebuild_rollups(since=None):
+    """
+    Recompute buckets (all, or days >= since) from the ticket table and
+    the archive.
+    """
+    sources = [Ticket.objects.all(), ArchivedTicket.objects.filter(is_deleted=False)]
+    buckets = GovernanceRollup.objects.all()
+    if since is not None:
+        sources = [tickets.filter(created_at__date__gte=since) for tickets in sources]
+        buckets = buckets.filter(day__gte=since)
+
+    totals = {}
+    for tickets in sources:
+        for row in _bucket_rows(tickets):
+            resolution_time = row.pop("resolution_time")
+            row["resolution_seconds"] = resolution_time.total_seconds() if resolution_time else 0
+            row["escalation_sum"] = row["escalation_sum"] or 0
+
+            key = (row.pop("day"), row.pop("department_id"), row.pop("priority"))
+            bucket = totals.setdefault(key, dict.fromkeys(ROLLUP_COUNTERS, 0))
+            for name in ROLLUP_COUNTERS:
+                bucket[name] += row[name]
+
+    rollups = [
+        GovernanceRollup(day=day, department_id=department_id, priority=priority, **counters)
+        for (day, department_id, priority), counters in totals.items()
+    ]
+
+    buckets.delete()
+    GovernanceRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+# ---------------- READERS ---------------- #
+
+def _rollup_range(start=None, end=None):
+    rollups = GovernanceRollup.objects.all()
+    if start is not None:
+        rollups = rollups.filter(day__gte=start)
+    if end is not None:
+        rollups = rollups.filter(day__lte=end)
+    return rollups
+
+
+def _as_snapshot(sums):
+    sums = {name: sums.get(name) or 0 for name in ROLLUP_COUNTERS}
+    total = sums["created"]
+
+    return {
+        "total": total,
+        "resolved": sums["resolved"],
+        "breached": sums["breached"],
+        "in_progress": sums["in_progress"],
+        "escalated": sums["escalated"],
+        "avg_escalations": sums["escalation_sum"] / total if total else None,
+        "avg_resolution": (
+            timezone.timedelta(seconds=sums["resolution_seconds"] / sums["resolution_count"])
+            if sums["resolution_count"] else None
+        ),
+    }
+
+
+def rollup_snapshot(start=None, end=None):
+    """governance_snapshot()-shaped totals for tickets created in [start, end]."""
+    sums = _rollup_range(start, end).aggregate(
+        **{name: Sum(name) for name in ROLLUP_COUNTERS}
+    )
+    return _as_snapshot(sums)
+
+
+def rollup_trend(start=None, end=None):
+    """Per-day snapshots for tickets created in [start, end]."""
+    rows = _rollup_range(start, end).values("day").annotate(
+        **{name: Sum(name) for name in ROLLUP_COUNTERS}
+    ).order_by("day")
+
+    return [{"day": row["day"], **_as_snapshot(row)} for row in rows]
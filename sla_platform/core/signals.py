@@ -0,0 +1,142 @@
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import SLAContract, EscalationRule
+from .models import BusinessCalendar, WorkingHours, Holiday
+from .models import Ticket, Client, EngineerProfile, EngineerLoad, Team
+from . import sla_cache
+from . import rollups
+from . import engineer_load
+from .archive import moving_tickets
+from .roles import forget_roles
+
+
+# ---------------- SLA CACHE INVALIDATION ---------------- #
+
+@receiver(post_save, sender=SLAContract)
+@receiver(post_delete, sender=SLAContract)
+@receiver(post_save, sender=EscalationRule)
+@receiver(post_delete, sender=EscalationRule)
+@receiver(post_save, sender=BusinessCalendar)
+@receiver(post_delete, sender=BusinessCalendar)
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+@receiver(post_save, sender=EngineerProfile)
+@receiver(post_delete, sender=EngineerProfile)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def invalidate_sla_cache(sender, **kwargs):
+    sla_cache.invalidate()
+
+
+# ---------------- GOVERNANCE ROLLUPS ---------------- #
+
+@receiver(post_save, sender=Ticket)
+def update_governance_rollups(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & rollups.ROLLUP_FIELDS:
+        return
+
+    if created:
+        old_state = None
+    else:
+        # post_save runs before Ticket.save() marks the row clean
+        old_state = rollups.loaded_ticket_state(instance)
+        if old_state is None:
+            return
+
+    rollups.record_ticket_changes([(old_state, rollups.ticket_state(instance))])
+
+
+@receiver(post_delete, sender=Ticket)
+def remove_from_governance_rollups(sender, instance, **kwargs):
+    # Archived tickets keep counting towards governance history
+    if moving_tickets():
+        return
+
+    old_state = rollups.loaded_ticket_state(instance) or rollups.ticket_state(instance)
+    rollups.record_ticket_changes([(old_state, None)])
+
+
+# ---------------- ENGINEER LOAD ---------------- #
+
+@receiver(post_save, sender=Ticket)
+def update_engineer_load(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & engineer_load.LOAD_FIELDS:
+        return
+
+    if created:
+        old_state = None
+    else:
+        old_state = engineer_load.loaded_load_state(instance)
+        if old_state is None:
+            return
+
+    engineer_load.record_load_changes([(old_state, engineer_load.load_state(instance))])
+
+
+@receiver(post_delete, sender=Ticket)
+def remove_from_engineer_load(sender, instance, **kwargs):
+    if moving_tickets():
+        return
+
+    old_state = engineer_load.loaded_load_state(instance) or engineer_load.load_state(instance)
+    engineer_load.record_load_changes([(old_state, None)])
+
+
+@receiver(post_save, sender=EngineerProfile)
+def sync_engineer_load(sender, instance, **kwargs):
+    engineer_load.sync_engineer(instance)
+    # New engineer or more capacity: queued tickets may now fit
+    engineer_load.schedule_drain([instance.user_id])
+
+
+@receiver(post_delete, sender=EngineerProfile)
+def drop_engineer_load(sender, instance, **kwargs):
+    EngineerLoad.objects.filter(user_id=instance.user_id).delete()
+
+
+@receiver(post_save, sender=Team)
+def move_team_engineer_load(sender, instance, **kwargs):
+    EngineerLoad.objects.filter(
+        user__engineerprofile__team=instance
+    ).update(department_id=instance.department_id)
+
+
+# ---------------- ROLE CACHE INVALIDATION ---------------- #
+
+@receiver(m2m_changed, sender=User.groups.through)
+def forget_roles_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        forget_roles([instance.pk])
+    elif action == "pre_clear":
+        forget_roles(instance.user_set.values_list("pk", flat=True))
+    else:
+        forget_roles(pk_set)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def forget_group_member_roles(sender, instance, **kwargs):
+    forget_roles(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=User)
+def forget_user_roles(sender, instance, update_fields=None, **kwargs):
+    # Every login saves last_login; that changes no role
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    forget_roles([instance.pk])
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+@receiver(post_save, sender=EngineerProfile)
+@receiver(post_delete, sender=EngineerProfile)
+def forget_profile_roles(sender, instance, **kwargs):
+    forget_roles([instance.user_id])
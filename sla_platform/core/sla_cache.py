@@ -0,0 +1,239 @@
+"""
+Process-local cache for SLAContract, EscalationRule, business calendars and
+the engineer roster used for assignment.
+
+These tables are small and rarely edited, so each process keeps a full copy:
+contracts keyed by (client_id, priority), escalation rules pre-sorted per
+priority for bisect lookups and assignment candidates grouped by
+department. post_save/post_delete signals bump the "sla_cache"
+CacheGeneration row in the writing transaction, so the bump commits (or
+rolls back) with the edit. Every process compares its copy against that
+row at most once per SLA_CACHE_CHECK_SECONDS and reloads when it moved;
+the writing process drops its own copy at once.
+"""
+
+import time
+from bisect import bisect_right
+
+from django.conf import settings
+from django.db.models import F
+
+from .business_calendar import load_calendars
+from .models import CacheGeneration, SLAContract, EscalationRule, EngineerProfile
+
+
+GENERATION_NAME = "sla_cache"
+
+CHECK_SECONDS = getattr(settings, "SLA_CACHE_CHECK_SECONDS", 5)
+
+_state = {
+    "generation": None,
+    "checked_at": 0.0,
+    "contracts": None,
+    "rules": None,
+    "calendars": None,
+    "candidates": None,
+}
+
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "invalidations": 0,
+}
+
+
+class PriorityRules:
+    """Escalation rules of one priority, ascending by threshold."""
+
+    __slots__ = ("thresholds", "levels")
+
+    def __init__(self, rules):
+        self.thresholds = [threshold for threshold, level in rules]
+        self.levels = [level for threshold, level in rules]
+
+    def __iter__(self):
+        return iter(zip(self.thresholds, self.levels))
+
+    def __len__(self):
+        return len(self.thresholds)
+
+    def match(self, usage_percent):
+        """Level of the highest threshold <= usage_percent, or None."""
+        index = bisect_right(self.thresholds, usage_percent) - 1
+        if index < 0:
+            return None
+        return self.levels[index]
+
+
+# ---------------- GENERATION ---------------- #
+
+def _shared_generation():
+    generation = CacheGeneration.objects.filter(
+        name=GENERATION_NAME
+    ).values_list("value", flat=True).first()
+    return generation or 0
+
+
+def generation():
+    """The shared generation, re-read at most once per CHECK_SECONDS."""
+    _ensure_fresh()
+    return _state["generation"]
+
+
+def _ensure_fresh():
+    checked_at = time.monotonic()
+    if _state["generation"] is not None and checked_at - _state["checked_at"] < CHECK_SECONDS:
+        return
+
+    generation = _shared_generation()
+    _state["checked_at"] = checked_at
+    if generation != _state["generation"]:
+        _state["generation"] = generation
+        _state["contracts"] = None
+        _state["rules"] = None
+        _state["calendars"] = None
+        _state["candidates"] = None
+
+
+def invalidate():
+    """Drop the local copy now, and everywhere once the write commits."""
+    _stats["invalidations"] += 1
+    clear_local()
+
+    counter = CacheGeneration.objects.filter(name=GENERATION_NAME)
+    if not counter.update(value=F("value") + 1):
+        CacheGeneration.objects.get_or_create(name=GENERATION_NAME, defaults={"value": 1})
+
+
+def clear_local():
+    _state["generation"] = None
+    _state["contracts"] = None
+    _state["rules"] = None
+    _state["calendars"] = None
+    _state["candidates"] = None
+
+
+# ---------------- LOOKUPS ---------------- #
+
+def get_contracts():
+    """Map (client_id, priority) -> resolution_time_hours."""
+    _ensure_fresh()
+
+    contracts = _state["contracts"]
+    if contracts is None:
+        _stats["misses"] += 1
+        contracts = {
+            (client_id, priority): hours
+            for client_id, priority, hours in SLAContract.objects.values_list(
+                "client_id", "priority", "resolution_time_hours"
+            )
+        }
+        _state["contracts"] = contracts
+    else:
+        _stats["hits"] += 1
+
+    return contracts
+
+
+def get_contract_hours(client_id, priority):
+    return get_contracts().get((client_id, priority))
+
+
+def get_escalation_rules():
+    """Map priority -> PriorityRules."""
+    _ensure_fresh()
+
+    rules = _state["rules"]
+    if rules is None:
+        _stats["misses"] += 1
+        grouped = {}
+        # Among equal thresholds the lowest id must sort last so bisect picks it
+        rows = EscalationRule.objects.order_by(
+            "threshold_percent", "-id"
+        ).values_list("priority", "threshold_percent", "escalate_to_level")
+
+        for priority, threshold, level in rows:
+            grouped.setdefault(priority, []).append((threshold, level))
+
+        rules = {
+            priority: PriorityRules(priority_rules)
+            for priority, priority_rules in grouped.items()
+        }
+        _state["rules"] = rules
+    else:
+        _stats["hits"] += 1
+
+    return rules
+
+
+def get_calendars():
+    """CalendarRegistry of every calendar with working hours."""
+    _ensure_fresh()
+
+    calendars = _state["calendars"]
+    if calendars is None:
+        _stats["misses"] += 1
+        calendars = load_calendars()
+        _state["calendars"] = calendars
+    else:
+        _stats["hits"] += 1
+
+    return calendars
+
+
+def get_ticket_calendar(client_id, department_id):
+    return get_calendars().for_ticket(client_id, department_id)
+
+
+class Candidate:
+    """Static assignment attributes of one engineer."""
+
+    __slots__ = ("user_id", "capacity", "skills")
+
+    def __init__(self, user_id, capacity, skills):
+        self.user_id = user_id
+        self.capacity = capacity
+        self.skills = skills
+
+
+def get_assignment_candidates(department_id):
+    """Engineers of a department's teams, as a tuple of Candidate."""
+    _ensure_fresh()
+
+    candidates = _state["candidates"]
+    if candidates is None:
+        _stats["misses"] += 1
+        candidates = {}
+        profiles = EngineerProfile.objects.filter(
+            team__isnull=False
+        ).select_related("team").only(
+            "user_id", "capacity", "skills", "team__department_id"
+        ).order_by("user_id")
+
+        for profile in profiles:
+            candidates.setdefault(profile.team.department_id, []).append(
+                Candidate(profile.user_id, profile.capacity, profile.skill_set())
+            )
+
+        candidates = {
+            department: tuple(members)
+            for department, members in candidates.items()
+        }
+        _state["candidates"] = candidates
+    else:
+        _stats["hits"] += 1
+
+    return candidates.get(department_id, ())
+
+
+# ---------------- MONITORING ---------------- #
+
+def cache_stats():
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        "hits": _stats["hits"],
+        "misses": _stats["misses"],
+        "invalidations": _stats["invalidations"],
+        "hit_rate": round(_stats["hits"] / lookups * 100, 2) if lookups else 0,
+        "generation": _state["generation"],
+    }
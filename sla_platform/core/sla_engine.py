@@ -1,72 +1,99 @@
+from django.contrib.auth.models import User
+from django.db import transaction
 from django.utils import timezone
-from .models import SLAContract, EscalationRule, EscalationLog
-from .risk_engine import calculate_risk
+from .models import Ticket, EscalationLog
+from .risk_engine import score_risk
 from .models import EngineerProfile
+from .sla_cache import get_contracts, get_contract_hours, get_escalation_rules
+from .sla_cache import get_calendars, get_ticket_calendar
+from .business_calendar import elapsed_seconds, sla_deadline_for
+from .changes import stamp
+from .rollups import record_ticket_changes, ticket_state
+from .engineer_load import record_load_changes, load_state
+from .notifications import buffered_notifications
+from .outbox import queue_emails
+from . import audit
+
+
+# Ticket columns the SLA engine is allowed to change. Only rows whose values
+# actually moved are written back, and only these columns.
+SLA_ENGINE_FIELDS = (
+    "status",
+    "breached",
+    "breach_time",
+    "current_escalation_level",
+    "escalation_count",
+    "assigned_to",
+    "risk_score",
+    "risk_level",
+    "sla_deadline",
+    "resolved_at",
+)
+
+# Rows per statement for the batch engine's bulk writes
+BATCH_SIZE = 500
+
+_SNAPSHOT_ATTRS = tuple(
+    "assigned_to_id" if field == "assigned_to" else field
+    for field in SLA_ENGINE_FIELDS
+)
+
+
+def _snapshot(ticket):
+    return tuple(getattr(ticket, attr) for attr in _SNAPSHOT_ATTRS)
+
+
+# ---------------- PRELOADERS ---------------- #
+
+def load_sla_contracts():
+    """Map (client_id, priority) -> resolution_time_hours (served from sla_cache)."""
+    return get_contracts()
+
+
+def _load_team_leads(assignee_ids):
+    """Map engineer user_id -> User of their team lead (if any)."""
+    if not assignee_ids:
+        return {}
+
+    team_by_user = dict(
+        EngineerProfile.objects.filter(
+            user_id__in=assignee_ids,
+            team__isnull=False
+        ).values_list("user_id", "team_id")
+    )
+    if not team_by_user:
+        return {}
+
+    lead_by_team = {}
+    leads = EngineerProfile.objects.filter(
+        team_id__in=set(team_by_user.values()),
+        is_team_lead=True
+    ).select_related("user").order_by("id")
+
+    for lead in leads:
+        lead_by_team.setdefault(lead.team_id, lead.user)
 
+    return {
+        user_id: lead_by_team[team_id]
+        for user_id, team_id in team_by_user.items()
+        if team_id in lead_by_team
+    }
 
-def calculate_sla_status(ticket):
-
-    try:
-        sla = SLAContract.objects.get(
-            client=ticket.client,
-            priority=ticket.priority
-        )
-    except SLAContract.DoesNotExist:
-        return "NO_SLA_DEFINED"
 
-    now = timezone.now()
+# ---------------- PURE HELPERS ---------------- #
 
-    # Freeze timer if resolved
+def sla_usage_percent(ticket, resolution_time_hours, now, calendar=None):
     end_time = ticket.resolved_at if ticket.resolved_at else now
 
-    total_allowed_seconds = sla.resolution_time_hours * 3600
-    used_seconds = (end_time - ticket.created_at).total_seconds()
-
-    usage_percent = (used_seconds / total_allowed_seconds) * 100
-
-    # Risk update
-    calculate_risk(ticket, usage_percent)
-
-    # Escalation logic
-    rules = EscalationRule.objects.filter(
-        priority=ticket.priority,
-        threshold_percent__lte=usage_percent
-    ).order_by('-threshold_percent')
-    if rules.exists():
-        highest_rule = rules.first()
-
-        if ticket.current_escalation_level < highest_rule.escalate_to_level:
-
-        # Assign to Team Lead automatically
-            engineer_profile = EngineerProfile.objects.filter(
-                user=ticket.assigned_to
-            ).first()
-
-            if engineer_profile and engineer_profile.team:
-                team_lead = EngineerProfile.objects.filter(
-                    team=engineer_profile.team,
-                    is_team_lead=True
-                 ).first()
-
-                if team_lead:
-                    ticket.assigned_to = team_lead.user
+    total_allowed_seconds = resolution_time_hours * 3600
+    if total_allowed_seconds <= 0:
+        return 0
 
-            ticket.current_escalation_level = highest_rule.escalate_to_level
-            ticket.escalation_count += 1
-
-            EscalationLog.objects.create(
-                ticket=ticket,
-                level=highest_rule.escalate_to_level
-            )
+    used_seconds = elapsed_seconds(ticket.created_at, end_time, calendar)
+    return (used_seconds / total_allowed_seconds) * 100
 
-    # Breach detection
-    if usage_percent >= 100 and ticket.status != "RESOLVED":
-        ticket.breached = True
-        ticket.breach_time = now
-        ticket.status = "BREACHED"
-
-    ticket.save()
 
+def sla_status_label(ticket, usage_percent):
     if ticket.status == "RESOLVED":
         return "RESOLVED"
 
@@ -79,21 +106,11 @@ def calculate_sla_status(ticket):
     return "ON_TRACK"
 
 
-
-def calculate_time_metrics(ticket):
-    try:
-        sla = SLAContract.objects.get(
-            client=ticket.client,
-            priority=ticket.priority
-        )
-    except SLAContract.DoesNotExist:
-        return None
-
-    now = timezone.now()
+def sla_time_metrics(ticket, resolution_time_hours, now, calendar=None):
     end_time = ticket.resolved_at if ticket.resolved_at else now
 
-    total_allowed_seconds = sla.resolution_time_hours * 3600
-    used_seconds = (end_time - ticket.created_at).total_seconds()
+    total_allowed_seconds = resolution_time_hours * 3600
+    used_seconds = elapsed_seconds(ticket.created_at, end_time, calendar)
 
     # 🔥 Handle pause safely
     pause_hours = ticket.total_pause_duration if ticket.total_pause_duration else 0
@@ -119,3 +136,218 @@ def calculate_time_metrics(ticket):
         "usage_percent": round(usage_percent, 2),
         "is_breached": remaining_seconds <= 0
     }
+
+
+def sla_row_metrics(ticket, now, calendars=None):
+    """
+    (sla_status, remaining_hours, usage_percent) for a ticket annotated by
+    Ticket.objects.with_sla_metrics(now). The SQL figures are wall-clock,
+    so tickets under a business calendar are recomputed here.
+    """
+    if ticket.sla_hours is None:
+        return "NO_SLA_DEFINED", None, None
+
+    if calendars is None:
+        calendars = get_calendars()
+
+    calendar = calendars.for_ticket(ticket.client_id, ticket.department_id)
+    if calendar is None:
+        return (
+            ticket.sla_bucket,
+            round(ticket.remaining_seconds / 3600, 2),
+            round(ticket.usage_percent, 2),
+        )
+
+    metrics = sla_time_metrics(ticket, ticket.sla_hours, now, calendar)
+    return (
+        sla_status_label(ticket, metrics["usage_percent"]),
+        metrics["remaining_hours"],
+        metrics["usage_percent"],
+    )
+
+
+# ---------------- BATCH ENGINE ---------------- #
+
+def evaluate_sla_batch(tickets, now=None, contracts=None):
+    """
+    Run risk, escalation and breach detection over many tickets at once.
+
+    Contracts, escalation rules and team leads are loaded once for the whole
+    set, the rules are applied in memory, and only the tickets that changed
+    are written back with a single bulk_update (plus one bulk_create for the
+    escalation logs). Returns {ticket_id: sla_status}.
+    """
+    tickets = list(tickets)
+    if now is None:
+        now = timezone.now()
+    if contracts is None:
+        contracts = load_sla_contracts()
+
+    rules = get_escalation_rules()
+    calendars = get_calendars()
+
+    results = {}
+    evaluated = []
+    escalations = []
+
+    for ticket in tickets:
+        hours = contracts.get((ticket.client_id, ticket.priority))
+        if hours is None:
+            results[ticket.pk] = "NO_SLA_DEFINED"
+            continue
+
+        before = _snapshot(ticket)
+        calendar = calendars.for_ticket(ticket.client_id, ticket.department_id)
+        usage_percent = sla_usage_percent(ticket, hours, now, calendar)
+
+        # Risk update
+        risk_score, risk_level = score_risk(
+            ticket.priority,
+            usage_percent,
+            ticket.escalation_count
+        )
+        ticket.risk_score = round(risk_score, 2)
+        ticket.risk_level = risk_level
+
+        # Escalation logic: highest threshold already crossed wins
+        priority_rules = rules.get(ticket.priority)
+        level = priority_rules.match(usage_percent) if priority_rules else None
+        if level is not None and ticket.current_escalation_level < level:
+            escalations.append((ticket, level))
+
+        evaluated.append((ticket, hours, calendar, usage_percent, before))
+
+    reassignments = []
+    if escalations:
+        team_leads = _load_team_leads({
+            ticket.assigned_to_id
+            for ticket, level in escalations
+            if ticket.assigned_to_id
+        })
+
+        for ticket, level in escalations:
+            # Assign to Team Lead automatically
+            team_lead = team_leads.get(ticket.assigned_to_id)
+            if team_lead and team_lead.id != ticket.assigned_to_id:
+                reassignments.append((ticket.id, ticket.assigned_to_id, team_lead.id))
+                ticket.assigned_to = team_lead
+
+            ticket.current_escalation_level = level
+            ticket.escalation_count += 1
+
+    changed = []
+    changed_fields = set()
+    rollup_changes = []
+    load_changes = []
+
+    status_changes = []
+
+    for ticket, hours, calendar, usage_percent, before in evaluated:
+        before_status = ticket.status
+
+        # Breach detection
+        if usage_percent >= 100 and ticket.status != "RESOLVED":
+            if not ticket.breached:
+                ticket.breach_time = now
+            ticket.breached = True
+            ticket.status = "BREACHED"
+
+        # Mirror Ticket.save() housekeeping, which bulk_update bypasses
+        if not ticket.sla_deadline and ticket.created_at:
+            ticket.sla_deadline = sla_deadline_for(ticket.created_at, hours, calendar)
+
+        if ticket.status == "RESOLVED" and not ticket.resolved_at:
+            ticket.resolved_at = now
+
+        after = _snapshot(ticket)
+        if after != before:
+            changed.append(ticket)
+            if ticket.status != before_status:
+                status_changes.append((ticket.id, before_status, ticket.status))
+            before_values = dict(zip(_SNAPSHOT_ATTRS, before))
+            rollup_changes.append((ticket_state(ticket, before_values), ticket_state(ticket)))
+            load_changes.append((load_state(ticket, before_values), load_state(ticket)))
+            changed_fields.update(
+                field
+                for field, old, new in zip(SLA_ENGINE_FIELDS, before, after)
+                if old != new
+            )
+
+        results[ticket.pk] = sla_status_label(ticket, usage_percent)
+
+    with transaction.atomic():
+        if changed:
+            # bulk_update builds a CASE per column, so only send the columns that moved
+            fields = [field for field in SLA_ENGINE_FIELDS if field in changed_fields]
+            fields += stamp(changed)
+            Ticket.all_objects.bulk_update(changed, fields, batch_size=BATCH_SIZE)
+
+            for ticket in changed:
+                ticket.mark_clean(fields)
+
+            record_ticket_changes(rollup_changes)
+            record_load_changes(load_changes)
+
+            audit.record_many(
+                audit.event("STATUS_CHANGED", ticket_id, old=old_status, new=new_status)
+                for ticket_id, old_status, new_status in status_changes
+            )
+
+        if escalations:
+            EscalationLog.objects.bulk_create([
+                EscalationLog(ticket=ticket, level=level)
+                for ticket, level in escalations
+            ], batch_size=BATCH_SIZE)
+
+            audit.record_many([
+                *(audit.event("ESCALATED", ticket.id, level=level) for ticket, level in escalations),
+                *(
+                    audit.event("REASSIGNED", ticket_id, old=old_engineer, new=new_engineer)
+                    for ticket_id, old_engineer, new_engineer in reassignments
+                ),
+            ])
+
+            with buffered_notifications() as buffer:
+                for ticket, level in escalations:
+                    buffer.add(
+                        ticket.assigned_to_id,
+                        f"Ticket #{ticket.id} escalated to level {level}.",
+                        ticket.id,
+                        "ESCALATED"
+                    )
+
+            emails = dict(
+                User.objects.filter(
+                    id__in={ticket.assigned_to_id for ticket, level in escalations}
+                ).values_list("id", "email")
+            )
+            queue_emails(
+                (
+                    emails.get(ticket.assigned_to_id),
+                    f"SLA Escalation: Ticket #{ticket.id}",
+                    f"Ticket #{ticket.id} ({ticket.priority}) was escalated to level {level}.",
+                    ticket
+                )
+                for ticket, level in escalations
+            )
+
+    return results
+
+
+# ---------------- PER-TICKET WRAPPERS ---------------- #
+
+def calculate_sla_status(ticket):
+    return evaluate_sla_batch([ticket])[ticket.pk]
+
+
+def calculate_time_metrics(ticket):
+    hours = get_contract_hours(ticket.client_id, ticket.priority)
+    if hours is None:
+        return None
+
+    return sla_time_metrics(
+        ticket,
+        hours,
+        timezone.now(),
+        get_ticket_calendar(ticket.client_id, ticket.department_id)
+    )
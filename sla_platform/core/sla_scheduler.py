@@ -0,0 +1,213 @@
+import heapq
+
+from django.utils import timezone
+
+from .models import Ticket
+from .sla_engine import evaluate_sla_batch
+from .business_calendar import sla_deadline_for
+from .changes import SETTLE_SECONDS
+from . import sla_cache
+
+
+# Columns needed to place a ticket on the timeline without loading the model.
+SCHEDULE_FIELDS = (
+    "id",
+    "client_id",
+    "department_id",
+    "priority",
+    "created_at",
+    "current_escalation_level",
+    "breached",
+)
+
+
+def next_sla_event(created_at, resolution_time_hours, escalation_level,
+                   breached, priority_rules, after=None, calendar=None):
+    """
+    Return (due_at, kind) for the next SLA event of a ticket, or None.
+
+    Events are the crossings of EscalationRule.threshold_percent that would
+    raise the escalation level, and the 100% breach (== sla_deadline).
+    Crossings at or before `after` are ignored so a ticket that was just
+    evaluated is not rescheduled for the same instant. With a business
+    calendar the crossings are placed in business time.
+    """
+    candidates = []
+
+    for threshold, level in priority_rules:
+        if level > escalation_level:
+            due_at = sla_deadline_for(
+                created_at,
+                resolution_time_hours * threshold / 100,
+                calendar
+            )
+            candidates.append((due_at, "ESCALATION"))
+
+    if not breached:
+        candidates.append((
+            sla_deadline_for(created_at, resolution_time_hours, calendar),
+            "BREACH"
+        ))
+
+    if after is not None:
+        candidates = [event for event in candidates if event[0] > after]
+
+    if not candidates:
+        return None
+
+    return min(candidates, key=lambda event: event[0])
+
+
+class SLAScheduler:
+    """
+    Deadline-ordered SLA event queue.
+
+    Every open ticket holds at most one entry in a min-heap keyed by the
+    time its next escalation threshold or breach is due, so each event
+    costs O(log n) instead of re-scanning every ticket on every poll.
+    Stale heap entries (ticket rescheduled or closed) are skipped lazily.
+    State is rebuilt from the database by recover(), which walks open
+    tickets through the sla_deadline index, and kept current by
+    poll_changes(), which follows ticket updated_at stamps.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._scheduled = {}
+        self.contracts = {}
+        self.rules = {}
+        self.calendars = None
+        self.generation = None
+        # Tickets written after this have not been polled yet
+        self.changed_since = None
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    # ---------------- LOADING ---------------- #
+
+    def recover(self, chunk_size=2000):
+        """Rebuild the queue from persisted ticket state."""
+        self._heap = []
+        self._scheduled = {}
+        # Writes racing the scan are picked up again by the next poll
+        self.changed_since = timezone.now()
+        # A resync must not trust a copy that a missed invalidation left behind
+        sla_cache.clear_local()
+        self.generation = sla_cache.generation()
+        self.rules = sla_cache.get_escalation_rules()
+        self.contracts = sla_cache.get_contracts()
+        self.calendars = sla_cache.get_calendars()
+
+        rows = Ticket.objects.exclude(
+            status="RESOLVED"
+        ).order_by("sla_deadline", "id").values_list(*SCHEDULE_FIELDS)
+
+        for row in rows.iterator(chunk_size=chunk_size):
+            self.schedule(row)
+
+    def poll_changes(self):
+        """
+        Reschedule tickets written since the last poll: new, reopened,
+        reprioritised, reassigned, escalated, resolved or deleted ones.
+        A contract, rule or calendar edit (sla_cache generation) moves
+        every deadline, so it triggers a full recover() instead. Returns
+        the number of tickets looked at.
+        """
+        if self.changed_since is None or sla_cache.generation() != self.generation:
+            self.recover()
+            return len(self)
+
+        # Stamps are taken before commit; re-read the window a late commit can land in
+        since = self.changed_since - timezone.timedelta(seconds=SETTLE_SECONDS)
+        rows = list(
+            Ticket.all_objects.filter(
+                updated_at__gt=since
+            ).order_by("updated_at", "id").values_list(
+                *SCHEDULE_FIELDS, "status", "is_deleted", "updated_at"
+            )
+        )
+
+        for row in rows:
+            if row[-3] == "RESOLVED" or row[-2]:
+                self._scheduled.pop(row[0], None)
+            else:
+                self.schedule(row[:len(SCHEDULE_FIELDS)])
+            self.changed_since = max(self.changed_since, row[-1])
+
+        return len(rows)
+
+    # ---------------- QUEUE ---------------- #
+
+    def schedule(self, row, after=None):
+        ticket_id, client_id, department_id, priority, created_at, level, breached = row
+
+        hours = self.contracts.get((client_id, priority))
+        event = None
+        if hours is not None and created_at is not None:
+            event = next_sla_event(
+                created_at,
+                hours,
+                level,
+                breached,
+                self.rules.get(priority, ()),
+                after=after,
+                calendar=self.calendars.for_ticket(client_id, department_id)
+            )
+
+        if event is None:
+            self._scheduled.pop(ticket_id, None)
+            return None
+
+        due_at = event[0].timestamp()
+        self._scheduled[ticket_id] = due_at
+        heapq.heappush(self._heap, (due_at, ticket_id))
+        return event
+
+    def next_due(self):
+        """Timestamp of the earliest live event, or None when idle."""
+        while self._heap:
+            due_at, ticket_id = self._heap[0]
+            if self._scheduled.get(ticket_id) == due_at:
+                return due_at
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now):
+        """Remove and return the ids of all tickets whose event is due."""
+        deadline = now.timestamp()
+        due = []
+
+        while self._heap and self._heap[0][0] <= deadline:
+            due_at, ticket_id = heapq.heappop(self._heap)
+            if self._scheduled.get(ticket_id) == due_at:
+                del self._scheduled[ticket_id]
+                due.append(ticket_id)
+
+        return due
+
+    # ---------------- FIRING ---------------- #
+
+    def fire_due(self, now=None, chunk_size=500):
+        """Evaluate every ticket with a due event and reschedule it."""
+        if now is None:
+            now = timezone.now()
+
+        due_ids = self.pop_due(now)
+        results = {}
+
+        for start in range(0, len(due_ids), chunk_size):
+            tickets = list(
+                Ticket.objects.filter(
+                    id__in=due_ids[start:start + chunk_size]
+                ).exclude(status="RESOLVED")
+            )
+            results.update(evaluate_sla_batch(tickets, now=now))
+
+            for ticket in tickets:
+                self.schedule(
+                    tuple(getattr(ticket, field) for field in SCHEDULE_FIELDS),
+                    after=now
+                )
+
+        return results
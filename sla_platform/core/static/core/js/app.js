@@ -203,4 +203,36 @@ document.addEventListener("DOMContentLoaded", () => {
       }
     });
   }
-});
\ No newline at end of file
+
+  /* ===========================
+     LIVE UPDATES (Server-Sent Events)
+     =========================== */
+  const liveFeed = document.querySelector("[data-live-stream]");
+
+  if (liveFeed && window.EventSource) {
+    const list = liveFeed.querySelector("[data-live-list]");
+    const unread = document.querySelector("[data-unread-count]");
+
+    const addLine = (text) => {
+      const item = document.createElement("li");
+      item.textContent = text;
+      list.prepend(item);
+      while (list.children.length > 20) list.lastElementChild.remove();
+      liveFeed.hidden = false;
+    };
+
+    const source = new EventSource(liveFeed.dataset.liveStream);
+
+    source.addEventListener("notification", (e) => {
+      const data = JSON.parse(e.data);
+      addLine(data.count > 1 ? `${data.message} (x${data.count})` : data.message);
+      if (unread) unread.textContent = String((parseInt(unread.textContent, 10) || 0) + 1);
+    });
+
+    source.addEventListener("sla", (e) => {
+      const data = JSON.parse(e.data);
+      const label = { WARNING: "is at SLA warning", CRITICAL_RISK: "is at critical SLA risk", BREACHED: "breached its SLA" };
+      addLine(`Ticket #${data.ticket} ${label[data.state] || data.state}`);
+    });
+  }
+});
@@ -1,3 +1,1299 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count, F
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import audit, sla_cache
+from .archive import archive_tickets, get_ticket, restore_ticket
+from .assignment import LeastLoadedStrategy, drain_queue, pick_engineer
+from .changes import changes_since, stamp_values
+from .engineer_load import rebuild_engineer_load
+from .exports import DATASETS
+from .governance_engine import (
+    calculate_average_resolution_time,
+    calculate_breach_rate,
+    calculate_sla_health,
+    calculate_total_escalations,
+    engineer_performance,
+    governance_snapshot,
+    team_load,
+)
+from .assignment import queued_tickets
+from .keyset import ORDERS, InvalidCursor, _ordered, decode_cursor, encode_cursor, ticket_page
+from .live import LiveBroker
+from .models import (
+    ArchivedTicket,
+    AuditEvent,
+    BusinessCalendar,
+    CacheGeneration,
+    Client,
+    Department,
+    EngineerLoad,
+    EngineerProfile,
+    EscalationRule,
+    GovernanceRollup,
+    Holiday,
+    Notification,
+    OutboundEmail,
+    SLAContract,
+    Team,
+    Ticket,
+    WorkingHours,
+)
+from .notifications import COALESCE_SECONDS, NotificationBuffer, notify
+from .outbox import BACKOFF_BASE_SECONDS, dispatch_outbox, queue_email
+from .roles import ADMIN, get_roles
+from .risk_engine import RISK_LEVELS, RiskFrame, score_risk
+from .rollups import rebuild_rollups, rollup_snapshot
+from .sla_engine import calculate_sla_status, evaluate_sla_batch, sla_time_metrics
+from .sla_scheduler import SLAScheduler
+
+
+class CoreTestCase(TestCase):
+
+    def setUp(self):
+        # Cached roles are keyed by user id, which the next test reuses
+        cache.clear()
+        super().setUp()
+
+
+def make_client(name="acme"):
+    user = User.objects.create_user(name, f"{name}@example.com", "pass")
+    client = Client.objects.create(user=user, name=name, email=f"{name}@example.com")
+    for priority, hours in (("CRITICAL", 4), ("HIGH", 8), ("MEDIUM", 24), ("LOW", 72)):
+        SLAContract.objects.create(client=client, priority=priority, resolution_time_hours=hours)
+    return client
+
+
+def make_engineer(name="eng"):
+    user = User.objects.create_user(name, f"{name}@example.com", "pass")
+    user.groups.add(Group.objects.get_or_create(name="ENGINEERS")[0])
+    return user
+
+
+def make_ticket(client, **fields):
+    fields.setdefault("priority", "HIGH")
+    fields.setdefault("category", "NETWORK")
+    fields.setdefault("description", "test")
+    return Ticket.objects.create(client=client, **fields)
+
+
+# ---------------- SLA CACHE ---------------- #
+
+class SLACacheTests(CoreTestCase):
+
+    def test_edit_in_another_process_is_picked_up_after_the_check_interval(self):
+        client = make_client()
+        self.assertEqual(sla_cache.get_contract_hours(client.id, "HIGH"), 8)
+
+        # Another process edits the contract: only the database row moves
+        SLAContract.objects.filter(client=client, priority="HIGH").update(resolution_time_hours=2)
+        CacheGeneration.objects.filter(name=sla_cache.GENERATION_NAME).update(value=F("value") + 1)
+        self.assertEqual(sla_cache.get_contract_hours(client.id, "HIGH"), 8)
+
+        sla_cache._state["checked_at"] -= sla_cache.CHECK_SECONDS
+        self.assertEqual(sla_cache.get_contract_hours(client.id, "HIGH"), 2)
+
+    def test_local_edit_is_seen_at_once(self):
+        client = make_client()
+        self.assertEqual(sla_cache.get_contract_hours(client.id, "LOW"), 72)
+
+        contract = SLAContract.objects.get(client=client, priority="LOW")
+        contract.resolution_time_hours = 48
+        contract.save()
+        self.assertEqual(sla_cache.get_contract_hours(client.id, "LOW"), 48)
+
+
+# ---------------- SLA SCHEDULER ---------------- #
+
+class SLASchedulerPollTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        self.ticket = make_ticket(self.client_obj, priority="LOW")
+        self.scheduler = SLAScheduler()
+        self.scheduler.recover()
+
+    def due_at(self):
+        return self.scheduler._scheduled.get(self.ticket.id)
+
+    def test_resolved_and_reopened_tickets_are_rescheduled(self):
+        self.assertIsNotNone(self.due_at())
+
+        self.ticket.status = "RESOLVED"
+        self.ticket.save()
+        self.scheduler.poll_changes()
+        self.assertIsNone(self.due_at())
+
+        self.ticket.status = "REOPENED"
+        self.ticket.save()
+        self.scheduler.poll_changes()
+        self.assertIsNotNone(self.due_at())
+
+    def test_priority_change_moves_the_deadline(self):
+        low = self.due_at()
+        self.ticket.priority = "CRITICAL"
+        self.ticket.save()
+        self.scheduler.poll_changes()
+        self.assertLess(self.due_at(), low)
+
+    def test_contract_edit_triggers_a_rebuild(self):
+        low = self.due_at()
+        SLAContract.objects.filter(client=self.client_obj, priority="LOW").update(resolution_time_hours=1)
+        sla_cache.invalidate()
+        self.scheduler.poll_changes()
+        self.assertLess(self.due_at(), low)
+
+
+# ---------------- LIVE STREAM ---------------- #
+
+class LiveStreamTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        self.user_ids = frozenset({self.client_obj.user_id})
+
+    def age(self, ticket, hours):
+        ticket.created_at = timezone.now() - datetime.timedelta(hours=hours)
+        ticket.save()
+
+    def test_wsgi_gets_no_stream(self):
+        self.client.force_login(self.client_obj.user)
+        self.assertEqual(self.client.get("/api/stream/").status_code, 204)
+        self.assertNotContains(self.client.get("/"), "data-live-stream")
+
+    def test_written_ticket_crossing_a_threshold_is_pushed(self):
+        ticket = make_ticket(self.client_obj)
+        self.age(ticket, 5)
+        broker = LiveBroker()
+        self.assertEqual(broker._poll_once(self.user_ids), [])
+
+        self.age(ticket, 6)
+        events = broker._poll_once(self.user_ids)
+        self.assertEqual(
+            [(user_id, event["data"]["state"]) for user_id, event in events],
+            [(self.client_obj.user_id, "WARNING")]
+        )
+        self.assertEqual(broker._poll_once(self.user_ids), [])
+
+    def test_next_crossing_is_scheduled_without_polling_the_ticket(self):
+        ticket = make_ticket(self.client_obj)
+        self.age(ticket, 5)
+        broker = LiveBroker()
+        broker._poll_once(self.user_ids)
+
+        # HIGH is 8 hours: 70% falls 5.6 hours after creation
+        ticket.refresh_from_db()
+        expected = ticket.created_at + datetime.timedelta(hours=5.6)
+        self.assertAlmostEqual(broker._due_at[ticket.id], expected.timestamp(), places=3)
+
+    def test_disconnected_users_tickets_are_dropped(self):
+        ticket = make_ticket(self.client_obj)
+        broker = LiveBroker()
+        broker._poll_once(self.user_ids)
+        self.assertIn(ticket.id, broker._watched)
+
+        broker._poll_once(frozenset())
+        self.assertNotIn(ticket.id, broker._watched)
+
+
+# ---------------- RISK ---------------- #
+
+class RiskBatchTests(CoreTestCase):
+
+    def test_batch_levels_match_score_risk_at_the_threshold(self):
+        import numpy as np
+
+        # 50.0067% usage of a LOW ticket scores 40.004: MEDIUM, though it rounds to 40.0
+        usage = 50.0067
+        frame = RiskFrame(
+            ids=np.array([1]), priority_codes=np.array([0]), priority_names=["LOW"],
+            usage=np.array([usage]), escalations=np.array([0.0]),
+            scores=np.array([np.nan]), level_codes=np.array([-1]), loaded_at=timezone.now(),
+        )
+        scores, level_codes = frame.score()
+
+        self.assertEqual(scores[0], 40.0)
+        self.assertEqual(RISK_LEVELS[level_codes[0]], score_risk("LOW", usage, 0)[1])
+        self.assertEqual(RISK_LEVELS[level_codes[0]], "MEDIUM")
+
+    def test_whatif_rejects_thresholds_out_of_order(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pass"))
+        response = self.client.get("/api/risk-whatif/?low_max=80&medium_max=60")
+        self.assertEqual(response.status_code, 400)
+
+    def test_recompute_rescores_resolved_tickets(self):
+        ticket = make_ticket(make_client(), status="RESOLVED")
+        call_command("recompute_sla_deadlines", stdout=io.StringIO())
+
+        ticket.refresh_from_db()
+        # Resolved at once: no usage, HIGH weighs 3 * 10
+        self.assertEqual((ticket.risk_score, ticket.risk_level), (30.0, "LOW"))
+
+
+# ---------------- AUDIT JOURNAL ---------------- #
+
+class AuditTests(CoreTestCase):
+
+    def test_events_roll_back_with_their_savepoint(self):
+        with transaction.atomic():
+            audit.record("REOPENED", 1)
+            try:
+                with transaction.atomic():
+                    audit.record("DELETED", 1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertEqual(list(AuditEvent.objects.values_list("event_type", flat=True)), ["REOPENED"])
+
+    def test_record_many_is_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            audit.record_many(audit.event("ESCALATED", ticket_id, level=1) for ticket_id in range(50))
+
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertEqual(AuditEvent.objects.filter(event_type="ESCALATED").count(), 50)
+
+
+# ---------------- EMAIL OUTBOX ---------------- #
+
+class UnreachableConnection:
+
+    def open(self):
+        raise ConnectionRefusedError("SMTP server down")
+
+    def close(self):
+        raise AssertionError("never opened")
+
+
+class OutboxTests(CoreTestCase):
+
+    def test_connection_failure_backs_off_every_claimed_row(self):
+        for recipient in ("a@example.com", "b@example.com"):
+            queue_email(recipient, "subject", "body")
+        now = timezone.now()
+
+        self.assertEqual(dispatch_outbox(now=now, connection=UnreachableConnection()), (0, 2))
+
+        for row in OutboundEmail.objects.all():
+            self.assertEqual((row.status, row.attempts), ("PENDING", 1))
+            self.assertIn("SMTP server down", row.last_error)
+            self.assertGreaterEqual(row.next_attempt_at, now + datetime.timedelta(seconds=BACKOFF_BASE_SECONDS))
+
+
+# ---------------- RISK DATA API ---------------- #
+
+class RiskDataETagTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        self.tickets = [make_ticket(self.client_obj) for _ in range(3)]
+        self.client.force_login(self.client_obj.user)
+
+    def etag(self, **headers):
+        return self.client.get("/api/risk-data/?fields=ticket_id,risk_level", headers=headers)
+
+    def test_etag_follows_database_writes(self):
+        etag = self.etag()["ETag"]
+        self.assertEqual(self.etag(if_none_match=etag).status_code, 304)
+
+        # A write by another process, seen only through the database
+        Ticket.objects.filter(id=self.tickets[0].id).update(risk_level="HIGH", **stamp_values())
+        response = self.etag(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_engineer_etag_moves_when_a_ticket_is_reassigned_away(self):
+        engineer = make_engineer()
+        for ticket in self.tickets:
+            ticket.assigned_to = engineer
+            ticket.save()
+        self.client.force_login(engineer)
+        etag = self.etag()["ETag"]
+
+        Ticket.objects.filter(id=self.tickets[0].id).update(assigned_to=None, **stamp_values())
+        self.assertEqual(self.etag(if_none_match=etag).status_code, 200)
+
+
+# ---------------- CHANGE FEED ---------------- #
+
+class ChangeFeedTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        self.later = timezone.now() + datetime.timedelta(minutes=1)
+
+    def feed(self, since=None, limit=100):
+        return changes_since(Ticket.all_objects.all(), ArchivedTicket.objects.all(), since, limit, now=self.later)
+
+    def test_cursor_pages_through_every_change_once(self):
+        tickets = [make_ticket(self.client_obj) for _ in range(5)]
+
+        seen, cursor, has_more = [], None, True
+        while has_more:
+            rows, cursor, has_more = self.feed(cursor, limit=2)
+            seen += [row["id"] for row in rows]
+
+        self.assertEqual(seen, [ticket.id for ticket in tickets])
+        self.assertEqual(self.feed(cursor)[0], [])
+
+        tickets[0].status = "IN_PROGRESS"
+        tickets[0].save()
+        rows, _, _ = self.feed(cursor)
+        self.assertEqual([(row["id"], row["status"]) for row in rows], [(tickets[0].id, "IN_PROGRESS")])
+
+    def test_unsettled_writes_are_held_back(self):
+        make_ticket(self.client_obj)
+        rows, cursor, _ = changes_since(Ticket.all_objects.all(), ArchivedTicket.objects.all())
+        self.assertEqual(rows, [])
+        self.assertIsNone(cursor)
+
+    def test_archived_ticket_leaves_a_tombstone(self):
+        ticket = make_ticket(self.client_obj, status="RESOLVED")
+        _, cursor, _ = self.feed()
+
+        archive_tickets(resolved_before=self.later)
+        rows, cursor, _ = self.feed(cursor)
+        self.assertEqual([(row["id"], row["archived"]) for row in rows], [(ticket.id, True)])
+
+        restore_ticket(ArchivedTicket.objects.get(ticket_id=ticket.id))
+        rows, _, _ = self.feed(cursor)
+        self.assertEqual([(row["id"], row["archived"]) for row in rows], [(ticket.id, False)])
+
+
+# ---------------- SLA METRICS ---------------- #
+
+class SLAMetricsTests(CoreTestCase):
+
+    def test_database_metrics_match_the_python_calculation(self):
+        client = make_client()
+        now = timezone.now()
+        tickets = [
+            # 2.5 of 4 hours used: ON_TRACK
+            make_ticket(client, priority="CRITICAL", total_pause_duration=0.5),
+            # 7.5 of 8 hours: CRITICAL_RISK
+            make_ticket(client, priority="HIGH"),
+            # 18 of 24 hours: WARNING
+            make_ticket(client, priority="MEDIUM"),
+            make_ticket(client, priority="LOW", status="RESOLVED", resolved_at=now),
+        ]
+        for ticket, hours in zip(tickets, (3, 7.5, 18, 80)):
+            ticket.created_at = now - datetime.timedelta(hours=hours)
+            ticket.save()
+
+        rows = Ticket.objects.with_sla_metrics(now).in_bulk([ticket.id for ticket in tickets])
+        self.assertEqual(
+            [rows[ticket.id].sla_bucket for ticket in tickets],
+            ["ON_TRACK", "CRITICAL_RISK", "WARNING", "RESOLVED"]
+        )
+
+        for ticket in tickets:
+            row = rows[ticket.id]
+            expected = sla_time_metrics(row, row.sla_hours, now)
+            self.assertAlmostEqual(row.usage_percent, expected["usage_percent"], places=1)
+            self.assertAlmostEqual(row.remaining_seconds / 3600, expected["remaining_hours"], places=1)
+
+    def test_closest_to_breach_leaves_out_breached_tickets(self):
+        client = make_client()
+        now = timezone.now()
+        deadlines = {
+            "overdue": (now - datetime.timedelta(hours=1), "NEW"),
+            "breached": (now + datetime.timedelta(minutes=5), "BREACHED"),
+            "resolved": (now + datetime.timedelta(minutes=10), "RESOLVED"),
+            "later": (now + datetime.timedelta(hours=2), "NEW"),
+            "soon": (now + datetime.timedelta(minutes=30), "IN_PROGRESS"),
+        }
+        for description, (deadline, status) in deadlines.items():
+            ticket = make_ticket(client, description=description, status=status)
+            Ticket.objects.filter(id=ticket.id).update(sla_deadline=deadline)
+
+        self.assertEqual(
+            [ticket.description for ticket in Ticket.objects.closest_to_breach(now=now)],
+            ["soon", "later"]
+        )
+
+    def test_ticket_without_a_contract_has_no_sla(self):
+        client = make_client()
+        ticket = make_ticket(client, priority="HIGH")
+        SLAContract.objects.filter(client=client, priority="HIGH").delete()
+
+        row = Ticket.objects.with_sla_metrics().get(id=ticket.id)
+        self.assertEqual(row.sla_bucket, "NO_SLA_DEFINED")
+        self.assertIsNone(row.sla_hours)
+
+
+# ---------------- BUSINESS CALENDAR ---------------- #
+
+class BusinessCalendarTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        calendar = BusinessCalendar.objects.create(name="office", timezone="UTC", client=self.client_obj)
+        for weekday in range(5):
+            WorkingHours.objects.create(
+                calendar=calendar,
+                weekday=weekday,
+                start_time=datetime.time(9),
+                end_time=datetime.time(17)
+            )
+        Holiday.objects.create(calendar=calendar, date=datetime.date(2026, 10, 19))
+
+        # Friday, an hour before close; Monday the 19th is a holiday
+        self.friday = datetime.datetime(2026, 10, 16, 16, tzinfo=datetime.timezone.utc)
+        self.calendar = sla_cache.get_ticket_calendar(self.client_obj.id, None)
+
+    def test_deadline_skips_the_weekend_and_holiday(self):
+        ticket = make_ticket(self.client_obj, priority="HIGH")
+        ticket.created_at = self.friday
+        ticket.sla_deadline = None
+        ticket.save()
+
+        # 1 hour on Friday, 7 on Tuesday
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.sla_deadline, datetime.datetime(2026, 10, 20, 16, tzinfo=datetime.timezone.utc))
+
+    def test_recompute_fixes_every_chunk(self):
+        tickets = [make_ticket(self.client_obj, priority="HIGH") for _ in range(5)]
+        Ticket.objects.filter(id__in=[ticket.id for ticket in tickets]).update(
+            created_at=self.friday,
+            sla_deadline=self.friday
+        )
+
+        stdout = io.StringIO()
+        call_command("recompute_sla_deadlines", chunk_size=2, stdout=stdout)
+
+        self.assertIn("Scanned 5 tickets, updated 5 deadlines", stdout.getvalue())
+        self.assertEqual(
+            set(Ticket.objects.values_list("sla_deadline", flat=True)),
+            {datetime.datetime(2026, 10, 20, 16, tzinfo=datetime.timezone.utc)}
+        )
+
+    def test_elapsed_time_only_counts_working_hours(self):
+        tuesday = datetime.datetime(2026, 10, 20, 10, tzinfo=datetime.timezone.utc)
+        self.assertEqual(self.calendar.business_seconds(self.friday, tuesday), 2 * 3600)
+
+        saturday = datetime.datetime(2026, 10, 17, 12, tzinfo=datetime.timezone.utc)
+        self.assertEqual(self.calendar.business_seconds(saturday, tuesday - datetime.timedelta(hours=1)), 0)
+
+    def test_deadline_starting_outside_hours_begins_at_next_opening(self):
+        saturday = datetime.datetime(2026, 10, 17, 12, tzinfo=datetime.timezone.utc)
+        self.assertEqual(
+            self.calendar.add_business_seconds(saturday, 3600),
+            datetime.datetime(2026, 10, 20, 10, tzinfo=datetime.timezone.utc)
+        )
+
+
+# ---------------- GOVERNANCE ROLLUPS ---------------- #
+
+class RollupTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        self.department = Department.objects.create(name="Network Operations")
+
+    def buckets(self):
+        return sorted(GovernanceRollup.objects.values_list(
+            "day", "department_id", "priority", "created", "resolved", "breached", "in_progress"
+        ))
+
+    def assert_matches_rebuild(self):
+        counted = self.buckets()
+        rebuild_rollups()
+        self.assertEqual([bucket for bucket in counted if bucket[3]], self.buckets())
+
+    def test_counts_follow_create_resolve_and_delete(self):
+        tickets = [
+            make_ticket(self.client_obj, department=self.department, priority=priority)
+            for priority in ("HIGH", "HIGH", "LOW", "LOW")
+        ]
+        self.assertEqual(rollup_snapshot()["total"], 4)
+
+        tickets[0].status = "RESOLVED"
+        tickets[0].save()
+        tickets[1].status = "IN_PROGRESS"
+        tickets[1].breached = True
+        tickets[1].save()
+        tickets[2].soft_delete()
+        tickets[3].delete()
+
+        snapshot = rollup_snapshot()
+        self.assertEqual(
+            (snapshot["total"], snapshot["resolved"], snapshot["in_progress"], snapshot["breached"]),
+            (2, 1, 1, 1)
+        )
+        self.assert_matches_rebuild()
+
+        tickets[2].restore()
+        self.assertEqual(rollup_snapshot()["total"], 3)
+        self.assert_matches_rebuild()
+
+    def test_priority_change_moves_the_ticket_between_buckets(self):
+        ticket = make_ticket(self.client_obj, department=self.department, priority="HIGH")
+        ticket.priority = "CRITICAL"
+        ticket.save()
+
+        self.assertEqual(
+            [(priority, created) for _, _, priority, created, *_ in self.buckets() if created],
+            [("CRITICAL", 1)]
+        )
+        self.assert_matches_rebuild()
+
+
+# ---------------- ENGINEER LOAD ---------------- #
+
+class EngineerLoadTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        self.department = Department.objects.create(name="Network Operations")
+        team = Team.objects.create(name="network", department=self.department)
+        self.engineers = [make_engineer(f"eng{index}") for index in range(2)]
+        for engineer in self.engineers:
+            EngineerProfile.objects.create(user=engineer, team=team)
+
+    def loads(self):
+        return dict(EngineerLoad.objects.values_list("user_id", "active_tickets"))
+
+    def assert_matches_rebuild(self):
+        counted = sorted(EngineerLoad.objects.values_list("user_id", "active_tickets", "weighted_load"))
+        rebuild_engineer_load()
+        self.assertEqual(
+            counted,
+            sorted(EngineerLoad.objects.values_list("user_id", "active_tickets", "weighted_load"))
+        )
+
+    def test_counters_follow_assign_reassign_resolve_and_delete(self):
+        first, second = self.engineers
+        tickets = [
+            make_ticket(self.client_obj, department=self.department, assigned_to=first)
+            for _ in range(3)
+        ]
+        self.assertEqual(self.loads(), {first.id: 3, second.id: 0})
+
+        tickets[0].assigned_to = second
+        tickets[0].priority = "CRITICAL"
+        tickets[0].save()
+        tickets[1].status = "RESOLVED"
+        tickets[1].save()
+        tickets[2].soft_delete()
+
+        self.assertEqual(self.loads(), {first.id: 0, second.id: 1})
+        self.assert_matches_rebuild()
+
+        tickets[1].status = "REOPENED"
+        tickets[1].save()
+        self.assertEqual(self.loads(), {first.id: 1, second.id: 1})
+        self.assert_matches_rebuild()
+
+
+# ---------------- ASSIGNMENT ---------------- #
+
+class AssignmentTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        self.department = Department.objects.create(name="Network Operations")
+        team = Team.objects.create(name="network", department=self.department)
+        self.small, self.large = make_engineer("small"), make_engineer("large")
+        EngineerProfile.objects.create(user=self.small, team=team, capacity=1)
+        EngineerProfile.objects.create(user=self.large, team=team, capacity=2)
+
+    def assign(self, engineer):
+        return make_ticket(self.client_obj, department=self.department, assigned_to=engineer)
+
+    def pick(self):
+        with transaction.atomic():
+            load = pick_engineer(self.department.id, "HIGH", "NETWORK", LeastLoadedStrategy())
+        return load and load.user
+
+    def test_engineers_at_capacity_are_skipped(self):
+        self.assign(self.small)
+        self.assign(self.large)
+        # Both carry one ticket; the tie would go to the lower id without the cap
+        self.assertEqual(self.pick(), self.large)
+
+        self.assign(self.large)
+        self.assertIsNone(self.pick())
+
+    def test_freed_capacity_drains_the_queue(self):
+        working = self.assign(self.small)
+        self.assign(self.large)
+        self.assign(self.large)
+        queued = self.assign(None)
+        self.assertEqual(drain_queue(self.department.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            working.status = "RESOLVED"
+            working.save()
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.assigned_to, self.small)
+        self.assertEqual(drain_queue(self.department.id), 0)
+
+
+# ---------------- NOTIFICATIONS ---------------- #
+
+class NotificationTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        self.user = make_engineer()
+        self.ticket = make_ticket(self.client_obj)
+
+    def rows(self):
+        return list(Notification.objects.filter(user=self.user).order_by("id").values_list(
+            "event_type", "count", "message"
+        ))
+
+    def test_repeats_coalesce_into_one_unread_row(self):
+        notify(self.user.id, "first", self.ticket.id, "ESCALATED")
+        notify(self.user.id, "second", self.ticket.id, "ESCALATED")
+        notify(self.user.id, "assigned", self.ticket.id, "ASSIGNED")
+
+        self.assertEqual(self.rows(), [("ESCALATED", 2, "second"), ("ASSIGNED", 1, "assigned")])
+
+    def test_read_or_old_rows_are_not_reused(self):
+        notify(self.user.id, "first", self.ticket.id, "ESCALATED")
+        Notification.objects.filter(user=self.user).update(is_read=True)
+        notify(self.user.id, "second", self.ticket.id, "ESCALATED")
+        Notification.objects.filter(user=self.user, is_read=False).update(
+            created_at=timezone.now() - datetime.timedelta(seconds=COALESCE_SECONDS + 1)
+        )
+        notify(self.user.id, "third", self.ticket.id, "ESCALATED")
+
+        self.assertEqual([count for _, count, _ in self.rows()], [1, 1, 1])
+
+    def test_buffer_digests_a_burst_for_one_user(self):
+        other = make_ticket(self.client_obj)
+        buffer = NotificationBuffer(digest_threshold=1)
+        buffer.add(self.user.id, "a", self.ticket.id, "ESCALATED")
+        buffer.add(self.user.id, "b", self.ticket.id, "ESCALATED")
+        buffer.add(self.user.id, "c", other.id, "ASSIGNED")
+        buffer.flush()
+
+        self.assertEqual(
+            self.rows(),
+            [("DIGEST", 3, f"3 new updates (2 escalated, 1 assigned) on tickets #{self.ticket.id}, #{other.id}.")]
+        )
+
+
+# ---------------- KEYSET PAGINATION ---------------- #
+
+class KeysetTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        client = make_client()
+        now = timezone.now()
+        # Shared and missing deadlines exercise the id tie-break and the NULL tail
+        deadlines = [now, None, now + datetime.timedelta(hours=1), now, None, now - datetime.timedelta(hours=1)]
+        statuses = ["NEW", "NEW", "RESOLVED", "IN_PROGRESS", "RESOLVED", "NEW"]
+
+        self.tickets = []
+        for deadline, status in zip(deadlines, statuses):
+            ticket = make_ticket(client, status=status)
+            Ticket.objects.filter(id=ticket.id).update(sla_deadline=deadline)
+            self.tickets.append(Ticket.objects.get(id=ticket.id))
+
+    def walk(self, order, size=2):
+        seen, cursor = [], None
+        while True:
+            page = ticket_page(Ticket.objects.all(), order, cursor, size)
+            seen += [ticket.id for ticket in page.tickets]
+            cursor = page.next_cursor
+            if cursor is None:
+                return seen
+
+    def expected(self, tickets):
+        # Deadline order, missing deadlines last, ties by id
+        return [
+            ticket.id for ticket in sorted(
+                tickets,
+                key=lambda ticket: (ticket.sla_deadline is None, ticket.sla_deadline or 0, ticket.id)
+            )
+        ]
+
+    def test_pages_cover_every_ticket_once_in_order(self):
+        open_tickets = [ticket for ticket in self.tickets if ticket.status != "RESOLVED"]
+        resolved = [ticket for ticket in self.tickets if ticket.status == "RESOLVED"]
+
+        for size in (1, 2, 4):
+            self.assertEqual(self.walk("urgency", size), self.expected(open_tickets) + self.expected(resolved))
+            self.assertEqual(self.walk("deadline", size), self.expected(self.tickets))
+            self.assertEqual(self.walk("id", size), sorted((ticket.id for ticket in self.tickets), reverse=True))
+
+    def test_cursor_round_trips_with_and_without_a_deadline(self):
+        dated, undated = self.tickets[0], self.tickets[1]
+
+        self.assertEqual(
+            decode_cursor(encode_cursor(1, dated, "urgency"), "urgency"),
+            (1, dated.sla_deadline, dated.id)
+        )
+        self.assertEqual(
+            decode_cursor(encode_cursor(0, undated, "deadline"), "deadline"),
+            (0, None, undated.id)
+        )
+
+    def test_malformed_cursor_is_rejected(self):
+        for token in ("not-a-cursor", encode_cursor(5, self.tickets[0], "urgency")):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(token, "urgency")
+
+
+# ---------------- ARCHIVE ---------------- #
+
+class ArchiveTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        self.engineer = make_engineer()
+        self.ticket = make_ticket(self.client_obj, assigned_to=self.engineer, status="RESOLVED")
+        Ticket.objects.filter(id=self.ticket.id).update(
+            resolved_at=timezone.now() - datetime.timedelta(days=400)
+        )
+        notify(self.engineer.id, "resolved", self.ticket.id, "ASSIGNED")
+
+        self.assertEqual(archive_tickets(), 1)
+
+    def test_archive_moves_the_row_and_its_related_rows(self):
+        self.assertFalse(Ticket.all_objects.filter(id=self.ticket.id).exists())
+        self.assertFalse(Notification.objects.filter(ticket_id=self.ticket.id).exists())
+
+        archived = ArchivedTicket.objects.get(ticket_id=self.ticket.id)
+        self.assertEqual((archived.client_id, archived.status), (self.client_obj.id, "RESOLVED"))
+        self.assertEqual(len(archived.data["notifications"]), 1)
+
+    def test_lookup_by_id_resolves_after_archiving(self):
+        ticket = get_ticket(self.ticket.id, client_id=self.client_obj.id)
+        self.assertTrue(ticket.is_archived)
+        self.assertEqual((ticket.id, ticket.description), (self.ticket.id, "test"))
+        self.assertIsNone(get_ticket(self.ticket.id, client_id=self.client_obj.id + 1))
+
+        self.client.force_login(self.engineer)
+        response = self.client.get(f"/engineer/update-ticket/{self.ticket.id}/")
+        self.assertContains(response, f"Ticket #{self.ticket.id}")
+
+    def test_engineer_update_moves_the_ticket_back(self):
+        self.client.force_login(self.engineer)
+        self.client.post(f"/engineer/update-ticket/{self.ticket.id}/", {"status": "IN_PROGRESS"})
+
+        self.assertFalse(ArchivedTicket.objects.filter(ticket_id=self.ticket.id).exists())
+        self.assertEqual(Ticket.objects.get(id=self.ticket.id).status, "IN_PROGRESS")
+
+    def test_reopen_restores_the_ticket(self):
+        self.client.force_login(self.client_obj.user)
+        self.client.get(f"/ticket/reopen/{self.ticket.id}/")
+
+        self.assertFalse(ArchivedTicket.objects.filter(ticket_id=self.ticket.id).exists())
+        ticket = Ticket.objects.get(id=self.ticket.id)
+        self.assertEqual((ticket.status, ticket.resolved_at), ("REOPENED", None))
+        self.assertEqual(
+            list(Notification.objects.filter(ticket_id=ticket.id).order_by("id").values_list("event_type", flat=True)),
+            ["ASSIGNED", "REOPENED"]
+        )
+
+
+# ---------------- GOVERNANCE ---------------- #
+
+class GovernanceTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser("root", "root@example.com", "pass")
+        client = make_client()
+        self.departments = [Department.objects.create(name=name) for name in ("Network", "Cloud")]
+        teams = [
+            Team.objects.create(name=name, department=department)
+            for name, department in zip(("net", "cloud"), self.departments)
+        ]
+
+        self.engineers = []
+        for index, team in enumerate((teams[0], teams[0], teams[1])):
+            engineer = make_engineer(f"eng{index}")
+            EngineerProfile.objects.create(user=engineer, team=team)
+            self.engineers.append(engineer)
+
+        # (engineer, department, status, breached)
+        for engineer, department, status, breached in (
+            (0, 0, "NEW", False),
+            (0, 0, "RESOLVED", False),
+            (0, 0, "RESOLVED", True),
+            (1, 0, "IN_PROGRESS", True),
+            (1, 0, "RESOLVED", False),
+            (2, 1, "NEW", False),
+            (2, 1, "REOPENED", False),
+        ):
+            make_ticket(
+                client,
+                assigned_to=self.engineers[engineer],
+                department=self.departments[department],
+                status=status,
+                breached=breached
+            )
+
+    def test_snapshot_matches_per_metric_queries(self):
+        now = timezone.now()
+        for hours, escalations, ticket in zip((2, 5, 30), (0, 1, 3), Ticket.objects.filter(status="RESOLVED")):
+            Ticket.objects.filter(id=ticket.id).update(
+                created_at=now - datetime.timedelta(hours=hours),
+                resolved_at=now,
+                escalation_count=escalations
+            )
+
+        # The figures as the per-metric queries computed them
+        tickets = Ticket.objects.all()
+        total = tickets.count()
+        resolved, breached = tickets.filter(status="RESOLVED").count(), tickets.filter(breached=True).count()
+        resolution_hours = [
+            (ticket.resolved_at - ticket.created_at).total_seconds() / 3600
+            for ticket in tickets.filter(resolved_at__isnull=False)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            snapshot = governance_snapshot(Ticket.objects.all())
+        self.assertEqual(len(queries.captured_queries), 1)
+
+        self.assertEqual(calculate_sla_health(snapshot), round((resolved - breached) / total * 100, 2))
+        self.assertEqual(calculate_breach_rate(snapshot), round(breached / total * 100, 2))
+        self.assertAlmostEqual(
+            calculate_total_escalations(snapshot),
+            sum(tickets.values_list("escalation_count", flat=True)) / total
+        )
+        self.assertEqual(
+            calculate_average_resolution_time(snapshot),
+            round(sum(resolution_hours) / len(resolution_hours), 2)
+        )
+        self.assertEqual(
+            (snapshot["total"], snapshot["in_progress"]),
+            (total, tickets.filter(status="IN_PROGRESS").count())
+        )
+
+    def test_engineer_performance_matches_per_engineer_counts(self):
+        expected = []
+        for engineer in sorted(self.engineers, key=lambda user: user.username):
+            tickets = Ticket.objects.filter(assigned_to=engineer)
+            resolved = tickets.filter(status="RESOLVED")
+            expected.append((
+                engineer.username,
+                tickets.count(),
+                tickets.filter(status__in=("NEW", "IN_PROGRESS")).count(),
+                resolved.count(),
+                tickets.filter(breached=True).count(),
+            ))
+
+        self.assertEqual(
+            [(row["engineer"], row["total"], row["active"], row["resolved"], row["breached"])
+             for row in engineer_performance()],
+            expected
+        )
+        self.assertEqual(engineer_performance()[0]["success_rate"], 50.0)
+
+    def test_team_load_matches_per_team_counts(self):
+        self.assertEqual(
+            [(row["team"], row["active_tickets"]) for row in team_load()],
+            [
+                (team.name, Ticket.objects.filter(department=team.department, status__in=("NEW", "IN_PROGRESS")).count())
+                for team in Team.objects.order_by("name", "id")
+            ]
+        )
+
+    def test_query_count_does_not_grow_with_staff(self):
+        with CaptureQueriesContext(connection) as before:
+            engineer_performance()
+            team_load()
+
+        team = Team.objects.create(name="more", department=self.departments[1])
+        for index in range(5):
+            EngineerProfile.objects.create(user=make_engineer(f"extra{index}"), team=team)
+
+        with CaptureQueriesContext(connection) as after:
+            engineer_performance()
+            team_load()
+        self.assertEqual(len(after.captured_queries), len(before.captured_queries))
+
+    def test_performance_api_pages_only_when_asked(self):
+        self.client.force_login(self.admin)
+
+        self.assertEqual(len(self.client.get("/api/engineer-performance/").json()), 3)
+
+        page = self.client.get("/api/engineer-performance/", {"page_size": 2, "page": 2}).json()
+        self.assertEqual((page["count"], page["num_pages"], len(page["results"])), (3, 2, 1))
+
+        page = self.client.get("/api/team-load/", {"page_size": -5}).json()
+        self.assertEqual(len(page["results"]), 1)
+
+        for url in ("/api/engineer-performance/", "/api/team-load/"):
+            self.assertEqual(self.client.get(url, {"page_size": "abc"}).status_code, 400)
+
+
+# ---------------- BULK INGESTION ---------------- #
+
+class IngestionTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        department = Department.objects.create(name="Network Operations")
+        team = Team.objects.create(name="network", department=department)
+        self.engineer = make_engineer()
+        EngineerProfile.objects.create(user=self.engineer, team=team, capacity=1)
+
+    def test_bad_rows_are_reported_and_good_ones_created(self):
+        self.client.force_login(self.client_obj.user)
+        response = self.client.post(
+            "/api/tickets/bulk/",
+            json.dumps([
+                {"description": "link down", "priority": "high", "category": "network"},
+                {"description": 123, "priority": 1},
+                {"description": "x", "priority": "URGENT", "category": "NETWORK"},
+                {"description": "x", "priority": "LOW", "category": "PLUMBING"},
+                "not a row",
+                {"description": "flapping", "priority": "LOW", "category": "NETWORK"},
+            ]),
+            content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        result = response.json()
+        self.assertEqual((result["created"], result["queued"]), (2, 1))
+        self.assertEqual(result["errors"], [
+            {"row": 2, "error": "description, priority must be text."},
+            {"row": 3, "error": "Invalid priority 'URGENT'."},
+            {"row": 4, "error": "Invalid category 'PLUMBING'."},
+            {"row": 5, "error": "Row must be an object."},
+        ])
+
+        tickets = Ticket.objects.filter(client=self.client_obj).order_by("id")
+        self.assertEqual(
+            [(ticket.description, ticket.priority, ticket.assigned_to_id) for ticket in tickets],
+            [("link down", "HIGH", self.engineer.id), ("flapping", "LOW", None)]
+        )
+
+    def test_only_invalid_rows_is_a_bad_request(self):
+        self.client.force_login(self.client_obj.user)
+        response = self.client.post(
+            "/api/tickets/bulk/",
+            json.dumps({"tickets": [{"description": "x", "priority": "LOW", "category": ["NETWORK"]}]}),
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"], [{"row": 1, "error": "category must be text."}])
+
+    def test_import_command_reads_a_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tickets.csv")
+            with open(path, "w", newline="", encoding="utf-8") as handle:
+                handle.write("description,priority,category\n")
+                handle.write("disk full,CRITICAL,NETWORK\n")
+                handle.write(",LOW,NETWORK\n")
+
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command("import_tickets", path, client=self.client_obj.id, stdout=stdout, stderr=stderr)
+
+        self.assertIn("Created 1 tickets (0 queued), 1 rejected", stdout.getvalue())
+        self.assertEqual(stderr.getvalue().strip(), "Row 2: Description is required.")
+        self.assertTrue(Ticket.objects.filter(client=self.client_obj, description="disk full").exists())
+
+
+# ---------------- QUERY PLANS ---------------- #
+
+class QueryPlanTests(CoreTestCase):
+    """The hot Ticket queries seek the indexes meant for them (SQLite plans)."""
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN output is SQLite's")
+
+    def assert_uses(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(f"USING INDEX {index}", plan.replace("COVERING INDEX", "INDEX"))
+
+    def test_open_deadline_paths_use_the_partial_indexes(self):
+        self.assert_uses(Ticket.objects.closest_to_breach(), "core_ticket_open_deadline_idx")
+        self.assert_uses(
+            _ordered(Ticket.objects.filter(ORDERS["urgency"][0]), "urgency")[:51],
+            "core_ticket_open_deadline_idx"
+        )
+        self.assert_uses(
+            _ordered(Ticket.objects.filter(assigned_to_id=1).filter(ORDERS["urgency"][0]), "urgency")[:51],
+            "core_ticket_assignee_open_idx"
+        )
+
+    def test_resolved_and_full_deadline_orders_use_the_deadline_index(self):
+        self.assert_uses(
+            _ordered(Ticket.objects.filter(ORDERS["urgency"][1]), "urgency")[:51],
+            "core_ticket_sla_deadline_"
+        )
+        self.assert_uses(_ordered(Ticket.objects.all(), "deadline")[:51], "core_ticket_sla_deadline_")
+
+    def test_counts_and_filters_use_their_composites(self):
+        self.assert_uses(
+            Ticket.objects.filter(assigned_to_id=1, status="NEW", breached=True),
+            "core_ticket_assignee_idx"
+        )
+        self.assert_uses(
+            Ticket.objects.filter(department_id__in=[1, 2], status__in=("NEW", "IN_PROGRESS"))
+            .values("department").annotate(active=Count("id")).order_by(),
+            "core_ticket_department_idx"
+        )
+        self.assert_uses(queued_tickets(1)[:100], "core_ticket_department_idx")
+        self.assert_uses(Ticket.objects.filter(risk_level="HIGH").order_by("id"), "core_ticket_risk_idx")
+
+    def test_foreign_keys_without_their_own_index_still_seek(self):
+        # Cascades and SET_NULL go through all_objects: the partial indexes cannot serve them
+        for column in ("client_id", "assigned_to_id", "department_id"):
+            plan = Ticket.all_objects.filter(**{column: 1}).explain()
+            self.assertRegex(plan, rf"SEARCH core_ticket USING (COVERING )?INDEX \w+ \({column}=\?")
+
+
+# ---------------- SLA BATCH ENGINE ---------------- #
+
+class SLABatchTests(CoreTestCase):
+
+    # HIGH is 8 hours: not due, past the 50% rule, past 80% and breached
+    AGES = (1, 5, 9)
+
+    def setUp(self):
+        super().setUp()
+        EscalationRule.objects.create(priority="HIGH", threshold_percent=50, escalate_to_level=1)
+        EscalationRule.objects.create(priority="HIGH", threshold_percent=80, escalate_to_level=2)
+
+        department = Department.objects.create(name="Network Operations")
+        self.team = Team.objects.create(name="network", department=department)
+        self.engineer, self.lead = make_engineer("eng"), make_engineer("lead")
+        EngineerProfile.objects.create(user=self.engineer, team=self.team, capacity=100)
+        EngineerProfile.objects.create(user=self.lead, team=self.team, is_team_lead=True, capacity=100)
+
+        self.clients = iter(make_client(f"client{index}") for index in range(3))
+
+    def make_tickets(self, copies=1):
+        client = next(self.clients)
+        now = timezone.now()
+        tickets = []
+        for hours in self.AGES * copies:
+            ticket = make_ticket(client, assigned_to=self.engineer, department=self.team.department)
+            ticket.created_at = now - datetime.timedelta(hours=hours)
+            ticket.save()
+            tickets.append(ticket)
+        return list(Ticket.objects.filter(client=client).order_by("id"))
+
+    def outcome(self, tickets):
+        rows = Ticket.objects.in_bulk([ticket.id for ticket in tickets])
+        events = {}
+        for ticket_id, event_type in AuditEvent.objects.order_by("id").values_list("ticket_id", "event_type"):
+            events.setdefault(ticket_id, []).append(event_type)
+
+        return [
+            (
+                rows[ticket.id].status,
+                rows[ticket.id].breached,
+                rows[ticket.id].current_escalation_level,
+                rows[ticket.id].escalation_count,
+                rows[ticket.id].assigned_to_id,
+                events.get(ticket.id, []),
+            )
+            for ticket in tickets
+        ]
+
+    def test_batch_writes_what_the_per_ticket_path_writes(self):
+        batch, single = self.make_tickets(), self.make_tickets()
+
+        evaluate_sla_batch(batch)
+        for ticket in single:
+            calculate_sla_status(ticket)
+
+        expected = [
+            ("NEW", False, 0, 0, self.engineer.id, []),
+            ("NEW", False, 1, 1, self.lead.id, ["ESCALATED", "REASSIGNED"]),
+            ("BREACHED", True, 2, 1, self.lead.id, ["STATUS_CHANGED", "ESCALATED", "REASSIGNED"]),
+        ]
+        self.assertEqual(self.outcome(batch), expected)
+        self.assertEqual(self.outcome(single), expected)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        small, large = self.make_tickets(), self.make_tickets(copies=4)
+        # Rules load into the process cache once, on first use
+        sla_cache.get_escalation_rules()
+
+        with CaptureQueriesContext(connection) as small_queries:
+            evaluate_sla_batch(small)
+        with CaptureQueriesContext(connection) as large_queries:
+            evaluate_sla_batch(large)
+
+        self.assertEqual(len(large_queries.captured_queries), len(small_queries.captured_queries))
+
+
+# ---------------- SLA SWEEP ---------------- #
+
+class SLASweepTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        now = timezone.now()
+        # HIGH is 8 hours
+        self.overdue = make_ticket(self.client_obj)
+        self.overdue.created_at = now - datetime.timedelta(hours=9)
+        self.overdue.save()
+        self.fresh = make_ticket(self.client_obj)
+        self.overdue.refresh_from_db()
+
+    def test_dashboard_does_not_write(self):
+        admin = User.objects.create_superuser("root", "root@example.com", "pass")
+        self.client.force_login(admin)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get("/").status_code, 200)
+
+        writes = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))
+            and "django_session" not in query["sql"]
+        ]
+        self.assertEqual(writes, [])
+
+        ticket = Ticket.objects.get(id=self.overdue.id)
+        self.assertEqual((ticket.status, ticket.updated_at), ("NEW", self.overdue.updated_at))
+
+    def test_sweep_applies_breaches(self):
+        stdout = io.StringIO()
+        call_command("sla_sweep", chunk_size=1, stdout=stdout)
+
+        self.assertIn("swept 2 tickets in 2 chunks", stdout.getvalue())
+        self.assertEqual(
+            [(ticket.status, ticket.breached) for ticket in Ticket.objects.order_by("id")],
+            [("BREACHED", True), ("NEW", False)]
+        )
+
+
+# ---------------- EXPORTS ---------------- #
+
+class ExportTests(CoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_obj = make_client()
+        self.tickets = [make_ticket(self.client_obj, description=f"ticket {index}") for index in range(3)]
+        self.tickets[2].soft_delete()
+        self.admin = User.objects.create_superuser("root", "root@example.com", "pass")
+
+    def export(self, **params):
+        self.client.force_login(self.admin)
+        response = self.client.get("/api/export/tickets/", params)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def test_csv_has_the_header_and_live_rows(self):
+        response, body = self.export()
+        self.assertEqual(response["Content-Type"], "text/csv")
+
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(tuple(rows[0]), DATASETS["tickets"].columns)
+        self.assertEqual([row[0] for row in rows[1:]], [str(ticket.id) for ticket in self.tickets[:2]])
+
+        _, body = self.export(include_deleted="1")
+        self.assertEqual(len(body.decode().splitlines()), 4)
+
+    def test_ndjson_rows_are_objects(self):
+        response, body = self.export(format="ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([row["description"] for row in rows], ["ticket 0", "ticket 1"])
+        self.assertEqual(set(rows[0]), set(DATASETS["tickets"].columns))
+
+    def test_gzip_output_decompresses(self):
+        response, body = self.export(gzip="1")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('filename="tickets.csv.gz"', response["Content-Disposition"])
+
+        _, plain = self.export()
+        self.assertEqual(gzip.decompress(body), plain)
+
+    def test_only_admins_may_export(self):
+        for user in (self.client_obj.user, make_engineer()):
+            self.client.force_login(user)
+            self.assertEqual(self.client.get("/api/export/tickets/").status_code, 403)
+
+    def test_unknown_format_and_dataset_are_rejected(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get("/api/export/tickets/", {"format": "xml"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/export/passwords/").status_code, 404)
+
+
+# ---------------- ROLES ---------------- #
+
+class RoleTests(CoreTestCase):
+
+    def role_queries(self, queries):
+        # _load_roles() is the only query joining groups, client and engineer profile
+        return [query for query in queries.captured_queries if '"auth_group"."name"' in query["sql"]]
+
+    def test_admin_only_view_admits_admins_alone(self):
+        client_obj = make_client()
+        group_admin = User.objects.create_user("boss", "boss@example.com", "pass")
+        group_admin.groups.add(Group.objects.get_or_create(name=ADMIN)[0])
+        superuser = User.objects.create_superuser("root", "root@example.com", "pass")
+
+        for user, status in (
+            (group_admin, 200),
+            (superuser, 200),
+            (make_engineer(), 403),
+            (client_obj.user, 403),
+        ):
+            self.client.force_login(user)
+            self.assertEqual(self.client.get("/api/team-load/").status_code, status, user.username)
+
+        self.client.logout()
+        self.assertEqual(self.client.get("/api/team-load/").status_code, 302)
+
+    def test_roles_resolve_once_per_request_and_are_cached(self):
+        self.client.force_login(make_engineer())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get("/").status_code, 200)
+        self.assertEqual(len(self.role_queries(queries)), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/")
+        self.assertEqual(self.role_queries(queries), [])
+
+    def test_get_roles_is_memoised_on_the_user(self):
+        user = make_engineer()
+        with self.assertNumQueries(1):
+            roles = get_roles(user)
+            self.assertIs(get_roles(user), roles)
+        self.assertTrue(roles.is_engineer)
+        self.assertFalse(roles.is_admin)
+
+    def test_group_change_drops_cached_roles(self):
+        user = make_engineer()
+        self.client.force_login(user)
+        self.assertEqual(self.client.get("/api/team-load/").status_code, 403)
 
-# Create your tests here.
+        with self.captureOnCommitCallbacks(execute=True):
+            user.groups.add(Group.objects.get_or_create(name=ADMIN)[0])
+        self.assertEqual(self.client.get("/api/team-load/").status_code, 200)
\ No newline at end of file
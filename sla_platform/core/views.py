@@ -1,12 +1,20 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+
+from django.shortcuts import render, redirect
+from django.http import Http404, JsonResponse, HttpResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User, Group
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
-from django.core.mail import send_mail
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
 from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 
+from django.db import transaction
 from django.db.models import Count, Q
 
 from .models import (
@@ -17,28 +25,61 @@ from .models import (
     Team,
     SLAContract,
     Notification,
-    TicketAuditLog,
-    TicketAudit
+    ArchivedTicket
 )
 
-from .sla_engine import calculate_sla_status, calculate_time_metrics
+from .sla_cache import cache_stats as sla_cache_stats, get_calendars
+from .sla_engine import sla_row_metrics
+from .ingestion import ingest_tickets
+from .exports import CONTENT_TYPES, DATASETS, stream_export
+from .archive import get_ticket, get_ticket_for_update
+from .keyset import (
+    DEFAULT_ORDER,
+    DEFAULT_PAGE_SIZE,
+    FILTERS as KEYSET_FILTERS,
+    MAX_PAGE_SIZE,
+    ORDERS as KEYSET_ORDERS,
+    InvalidCursor,
+    filter_tickets,
+    ticket_page,
+)
+from .notifications import notify, unread_notifications
+from .live import broker as live_broker, event_stream
+from .outbox import queue_email
+from . import audit
+from .assignment import CATEGORY_DEPT_MAP, has_engineers, pick_engineer, notify_assignment
+from .risk_engine import DEFAULT_RISK_MODEL, PRIORITY_WEIGHTS, get_risk_frame
+from .rollups import rollup_snapshot, rollup_trend
+from .changes import (
+    DEFAULT_LIMIT as CHANGES_DEFAULT_LIMIT,
+    MAX_LIMIT as CHANGES_MAX_LIMIT,
+    InvalidCursor as InvalidChangeCursor,
+    changes_since,
+    scope_version,
+)
+from .roles import ADMIN, get_roles, require_role
 from .governance_engine import (
+    governance_snapshot,
     calculate_sla_health,
     calculate_breach_rate,
     calculate_total_escalations,
-    calculate_average_resolution_time
+    calculate_average_resolution_time,
+    engineer_performance as governance_engineer_performance,
+    team_load
 )
 
 # ---------------- ROLE CHECK FUNCTIONS ---------------- #
 
+# Resolved once per request (core.roles), not one query per check
+
 def is_admin(user):
-    return user.groups.filter(name='ADMIN').exists() or user.is_superuser
+    return get_roles(user).is_admin
 
 def is_engineer(user):
-    return user.groups.filter(name='ENGINEERS').exists()
+    return get_roles(user).is_engineer
 
 def is_client(user):
-    return hasattr(user, 'client')
+    return get_roles(user).is_client
 
 
 # ---------------- CLIENT REGISTER ---------------- #
@@ -112,6 +153,64 @@ def engineer_register(request):
 
 # ---------------- MAIN DASHBOARD ---------------- #
 
+# Statuses counted as active on the dashboards
+OPEN_STATUSES = ["NEW", "IN_PROGRESS", "REOPENED"]
+
+
+def _ticket_kpis(tickets):
+    """Dashboard KPI counters in one aggregate() pass."""
+    return tickets.aggregate(
+        total=Count("id"),
+        breached_total=Count("id", filter=Q(breached=True)),
+        resolved=Count("id", filter=Q(status="RESOLVED")),
+        active=Count("id", filter=Q(status__in=OPEN_STATUSES)),
+        sla_met=Count("id", filter=Q(status="RESOLVED", breached=False)),
+    )
+
+
+def _ticket_table(request, tickets):
+    """
+    Keyset page of `tickets` from ?order=&cursor=&page_size= and the
+    status/priority/category/department filters, plus the template
+    context for the filter form and the page links.
+    """
+    order = request.GET.get("order") or DEFAULT_ORDER
+    if order not in KEYSET_ORDERS:
+        order = DEFAULT_ORDER
+
+    try:
+        page_size = min(max(_int_param(request, "page_size") or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    except ValueError:
+        page_size = DEFAULT_PAGE_SIZE
+    tickets = filter_tickets(tickets, request.GET)
+
+    try:
+        page = ticket_page(tickets, order, request.GET.get("cursor"), page_size)
+    except InvalidCursor:
+        page = ticket_page(tickets, order, None, page_size)
+
+    params = request.GET.copy()
+    params.pop("cursor", None)
+    first_url = f"?{params.urlencode()}" if params else "?"
+    next_url = None
+    if page.next_cursor:
+        params["cursor"] = page.next_cursor
+        next_url = f"?{params.urlencode()}"
+
+    return page, {
+        "order": order,
+        "orders": list(KEYSET_ORDERS),
+        "filters": {name: request.GET.get(name, "") for name in KEYSET_FILTERS},
+        "status_choices": Ticket.STATUS_CHOICES,
+        "priority_choices": Ticket.PRIORITY_CHOICES,
+        "category_choices": Ticket.CATEGORY_CHOICES,
+        "departments": Department.objects.order_by("name"),
+        "is_first_page": not request.GET.get("cursor"),
+        "first_page_url": first_url,
+        "next_page_url": next_url,
+    }
+
+
 @login_required
 def dashboard(request):
     user = request.user
@@ -120,45 +219,53 @@ def dashboard(request):
     if is_engineer(user):
         base_qs = Ticket.objects.filter(assigned_to=user)
     elif is_client(user):
-        base_qs = Ticket.objects.filter(client=user.client)
+        base_qs = Ticket.objects.filter(client_id=get_roles(user).client_id)
     else:
         base_qs = Ticket.objects.all()
 
     # ✅ KPI counts computed in BACKEND (no JS dependency)
-    total_tickets = base_qs.count()
-    breached_count = base_qs.filter(breached=True).count()
-    resolved_count = base_qs.filter(status="RESOLVED").count()
-    active_count = base_qs.filter(status__in=["NEW", "IN_PROGRESS", "REOPENED"]).count()
+    kpis = _ticket_kpis(base_qs)
+
+    # ✅ Read-only: SLA state is advanced by `manage.py sla_sweep`,
+    # usage and remaining time are computed by the database.
+    # Only one keyset page of rows is loaded, with its foreign keys joined.
+    now = timezone.now()
+    calendars = get_calendars()
+
+    page, table = _ticket_table(
+        request,
+        base_qs.select_related("client", "assigned_to", "department").with_sla_metrics(now)
+    )
 
-    # ✅ Build dashboard rows (your existing structure)
     dashboard_data = []
-    for ticket in base_qs:
-        metrics = calculate_time_metrics(ticket)
-        sla_status = calculate_sla_status(ticket)
+    for ticket in page.tickets:
+        sla_status, remaining_hours, usage_percent = sla_row_metrics(ticket, now, calendars)
 
         dashboard_data.append({
             "ticket": ticket,
             "sla_status": sla_status,
-            "remaining_hours": metrics["remaining_hours"] if metrics else None,
-            "usage_percent": metrics["usage_percent"] if metrics else None,
+            "remaining_hours": remaining_hours,
+            "usage_percent": usage_percent,
         })
 
-    notifications = Notification.objects.filter(
-        user=user,
-        is_read=False
-    ).order_by("-created_at")
+    # Newest unread only; the full count is shown separately
+    notifications, unread_count = unread_notifications(user)
 
     return render(request, "dashboard.html", {
         "tickets": dashboard_data,
         "notifications": notifications,
+        "unread_count": unread_count,
         "is_engineer": is_engineer(user),
         "is_client": is_client(user),
+        # The SSE stream only runs under ASGI
+        "live_stream": isinstance(request, ASGIRequest),
 
         # ✅ KPIs for template
-        "total_tickets": total_tickets,
-        "breached_count": breached_count,
-        "resolved_count": resolved_count,
-        "active_count": active_count,
+        "total_tickets": kpis["total"],
+        "breached_count": kpis["breached_total"],
+        "resolved_count": kpis["resolved"],
+        "active_count": kpis["active"],
+        **table,
     })
 
 
@@ -175,35 +282,69 @@ def client_dashboard(request):
         return HttpResponse("Client profile not found.")
 
     tickets = Ticket.objects.filter(client=client)
+    kpis = _ticket_kpis(tickets)
 
-    total_tickets = tickets.count()
-    breached_count = tickets.filter(breached=True).count()
-
-    open_tickets = tickets.filter(status__in=["NEW", "IN_PROGRESS", "REOPENED"]).count()
+    # Archived tickets are not listed but still count
+    archived = ArchivedTicket.objects.filter(client_id=client.id, is_deleted=False).aggregate(
+        total=Count("id"),
+        breached_total=Count("id", filter=Q(breached=True)),
+        sla_met=Count("id", filter=Q(status="RESOLVED", breached=False)),
+    )
 
-    sla_met = tickets.filter(status="RESOLVED", breached=False).count()
+    page, table = _ticket_table(request, tickets.select_related("assigned_to"))
 
     return render(request, "client_dashboard.html", {
-        "tickets": tickets,
-        "total_tickets": total_tickets,
-        "breached_count": breached_count,
-        "open_tickets": open_tickets,
-        "sla_met": sla_met,
+        "tickets": page.tickets,
+        "total_tickets": kpis["total"] + archived["total"],
+        "listed_tickets": kpis["total"],
+        "archived_tickets": archived["total"],
+        "breached_count": kpis["breached_total"] + archived["breached_total"],
+        "open_tickets": kpis["active"],
+        "sla_met": kpis["sla_met"] + archived["sla_met"],
+        **table,
     })
 
 
 # ---------------- GOVERNANCE DASHBOARD ---------------- #
 
-@login_required
+def _governance_range(request):
+    """
+    (start, end) dates from ?days=N (last N days) or ?start=&end=
+    (YYYY-MM-DD). Missing bounds are open; raises ValueError on bad input.
+    """
+    days = request.GET.get("days")
+    if days:
+        days = int(days)
+        if days < 1:
+            raise ValueError("days must be positive")
+        today = timezone.localdate()
+        return today - timezone.timedelta(days=days - 1), today
+
+    start = request.GET.get("start")
+    end = request.GET.get("end")
+    return (
+        timezone.datetime.fromisoformat(start).date() if start else None,
+        timezone.datetime.fromisoformat(end).date() if end else None,
+    )
+
+
+@require_role(ADMIN, redirect_to='dashboard')
 def governance_dashboard(request):
-    if not is_admin(request.user):
-        return redirect('dashboard')
+    try:
+        start, end = _governance_range(request)
+    except ValueError:
+        start, end = None, None
+
+    # Served from the per-day rollups instead of scanning every ticket
+    snapshot = rollup_snapshot(start, end)
 
     context = {
-        "sla_health": calculate_sla_health(),
-        "breach_rate": calculate_breach_rate(),
-        "total_escalations": calculate_total_escalations(),
-        "avg_resolution_time": calculate_average_resolution_time(),
+        "sla_health": calculate_sla_health(snapshot),
+        "breach_rate": calculate_breach_rate(snapshot),
+        "total_escalations": calculate_total_escalations(snapshot),
+        "avg_resolution_time": calculate_average_resolution_time(snapshot),
+        "start": start,
+        "end": end,
     }
 
     return render(request, "governance_dashboard.html", context)
@@ -211,66 +352,290 @@ def governance_dashboard(request):
 
 # ---------------- GOVERNANCE API ---------------- #
 
-@login_required
+@require_role(ADMIN)
 def governance_api(request):
-    if not is_admin(request.user):
-        return JsonResponse({"error": "Unauthorized"}, status=403)
+    try:
+        start, end = _governance_range(request)
+    except ValueError:
+        return JsonResponse({"error": "Invalid date range"}, status=400)
+
+    snapshot = rollup_snapshot(start, end)
 
     data = {
-        "sla_health": calculate_sla_health(),
-        "breach_rate": calculate_breach_rate(),
-        "total_escalations": calculate_total_escalations(),
-        "avg_resolution_time": calculate_average_resolution_time(),
+        "sla_health": calculate_sla_health(snapshot),
+        "breach_rate": calculate_breach_rate(snapshot),
+        "total_escalations": calculate_total_escalations(snapshot),
+        "avg_resolution_time": calculate_average_resolution_time(snapshot),
     }
 
+    # Per-day series only when a range was asked for
+    if start or end:
+        data["start"] = start
+        data["end"] = end
+        data["trend"] = [
+            {
+                "day": day["day"],
+                "total": day["total"],
+                "sla_health": calculate_sla_health(day),
+                "breach_rate": calculate_breach_rate(day),
+                "avg_resolution_time": calculate_average_resolution_time(day),
+            }
+            for day in rollup_trend(start, end)
+        ]
+
     return JsonResponse(data)
 
 
 # ---------------- RISK DATA API ---------------- #
 
+# Response fields, in output order; the first four are plain columns
+RISK_FIELDS = ("ticket_id", "risk_score", "risk_level", "priority", "usage_percent", "sla_status")
+RISK_COLUMNS = {
+    "ticket_id": "id",
+    "risk_score": "risk_score",
+    "risk_level": "risk_level",
+    "priority": "priority",
+}
+
+# What sla_row_metrics() reads from a with_sla_metrics() row
+SLA_METRIC_COLUMNS = (
+    "client_id", "department_id", "status", "created_at", "resolved_at",
+    "total_pause_duration", "sla_hours", "sla_bucket", "remaining_seconds", "usage_percent",
+)
+
+RISK_PAGE_SIZE = 500
+MAX_RISK_PAGE_SIZE = 5000
+
+# usage_percent/sla_status move with the clock; their ETag turns over this often
+RISK_ETAG_SECONDS = 60
+
+
+def _ticket_scope(user, manager=Ticket.objects):
+    """(scope name, tickets) visible to the user, or (None, None)."""
+    roles = get_roles(user)
+    if roles.is_client:
+        return f"client:{roles.client_id}", manager.filter(client_id=roles.client_id)
+    if roles.is_engineer:
+        return f"engineer:{user.id}", manager.filter(assigned_to_id=user.id)
+    if roles.is_admin:
+        return "all", manager.all()
+    return None, None
+
+
+def _risk_rows(rows, fields, now):
+    calendars = get_calendars() if "usage_percent" in fields or "sla_status" in fields else None
+
+    for row in rows:
+        item = {field: getattr(row, RISK_COLUMNS[field]) for field in fields if field in RISK_COLUMNS}
+        if calendars is not None:
+            sla_status, remaining_hours, usage_percent = sla_row_metrics(row, now, calendars)
+            if "usage_percent" in fields:
+                item["usage_percent"] = usage_percent
+            if "sla_status" in fields:
+                item["sla_status"] = sla_status
+        yield {field: item[field] for field in fields}
+
+
+def _risk_json(rows, next_after, chunk_size=500):
+    yield f'{{"next_after": {json.dumps(next_after)}, "tickets": ['.encode()
+
+    separator = ""
+    chunk = []
+    for item in rows:
+        chunk.append(separator + json.dumps(item))
+        separator = ","
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk).encode()
+            chunk = []
+
+    yield ("".join(chunk) + "]}").encode()
+
+
+def _risk_ndjson(rows, chunk_size=500):
+    chunk = []
+    for item in rows:
+        chunk.append(json.dumps(item) + "\n")
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk).encode()
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode()
+
+
 @login_required
 def risk_data_api(request):
+    """
+    Risk and SLA figures of the user's tickets, streamed in id order.
+    ?after=<id>&limit=N pages (next_after / X-Next-After give the next
+    cursor), ?fields= picks from RISK_FIELDS, ?risk_level= and ?priority=
+    filter (comma-separated), ?format=ndjson (or Accept:
+    application/x-ndjson) streams one object per line, and ?closest=N
+    returns the N open tickets nearest to breach instead. The ETag follows
+    the newest write to the scope's tickets (changes.scope_version), so
+    If-None-Match pollers get 304 until a ticket of theirs moves.
+    """
+    scope, tickets = _ticket_scope(request.user)
+    if tickets is None:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
 
-    if is_client(request.user):
-        tickets = Ticket.objects.filter(client=request.user.client)
+    fields = RISK_FIELDS
+    if request.GET.get("fields"):
+        fields = tuple(field.strip() for field in request.GET["fields"].split(",") if field.strip())
+        unknown = [field for field in fields if field not in RISK_FIELDS]
+        if unknown or not fields:
+            return JsonResponse(
+                {"error": f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(RISK_FIELDS)}"},
+                status=400
+            )
+
+    try:
+        after = _int_param(request, "after") or 0
+        limit = min(_int_param(request, "limit") or RISK_PAGE_SIZE, MAX_RISK_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "after and limit must be integers"}, status=400)
+    if after < 0 or limit < 1:
+        return JsonResponse({"error": "after must be >= 0 and limit >= 1"}, status=400)
+
+    ndjson = request.GET.get("format") == "ndjson" \
+        or "application/x-ndjson" in request.headers.get("Accept", "")
+    with_sla = "usage_percent" in fields or "sla_status" in fields
+    now = timezone.now()
+
+    # Soft-deleted rows count too, so a delete moves the version
+    _, written = _ticket_scope(request.user, Ticket.all_objects)
+    _, archived = _ticket_scope(request.user, ArchivedTicket.objects)
+    version = scope_version(written, archived, count=scope.startswith("engineer:"))
+    etag_source = [scope, version, sorted(request.GET.lists()), ndjson]
+    if with_sla:
+        etag_source.append(int(now.timestamp()) // RISK_ETAG_SECONDS)
+    etag = quote_etag(hashlib.md5(repr(etag_source).encode()).hexdigest())
+
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    for param in ("risk_level", "priority"):
+        if request.GET.get(param):
+            tickets = tickets.filter(**{f"{param}__in": request.GET[param].split(",")})
+
+    columns = ["id"] + [RISK_COLUMNS[field] for field in fields if field in RISK_COLUMNS and field != "ticket_id"]
+
+    # ?closest=N -> the N open tickets nearest to breach
+    closest = request.GET.get("closest")
+    next_after = None
+    if closest and closest.isdigit():
+        rows = tickets.closest_to_breach(limit=min(int(closest), 500), now=now)
+    else:
+        page = tickets.filter(id__gt=after).order_by("id")
+        # Index-only probe of the page boundary, so the cursor can lead the stream
+        boundary = list(page.values_list("id", flat=True)[limit - 1:limit + 1])
+        if len(boundary) == 2:
+            next_after = boundary[0]
+        rows = page.with_sla_metrics(now) if with_sla else page
+        rows = rows[:limit]
+
+    if with_sla:
+        columns += [column for column in SLA_METRIC_COLUMNS if column not in columns]
+
+    rows = _risk_rows(rows.values_list(*columns, named=True).iterator(chunk_size=1000), fields, now)
+    chunks = _risk_ndjson(rows) if ndjson else _risk_json(rows, next_after)
+    if isinstance(request, ASGIRequest):
+        chunks = _async_chunks(chunks)
+
+    response = StreamingHttpResponse(
+        chunks,
+        content_type="application/x-ndjson" if ndjson else "application/json"
+    )
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    response["Vary"] = "Accept, Cookie"
+    if next_after is not None:
+        response["X-Next-After"] = str(next_after)
+    return response
 
-    elif is_engineer(request.user):
-        tickets = Ticket.objects.filter(assigned_to=request.user)
 
-    elif is_admin(request.user):
-        tickets = Ticket.objects.all()
+# ---------------- TICKET CHANGE FEED ---------------- #
 
-    else:
+@login_required
+def ticket_changes_api(request):
+    """
+    Tickets created, updated or soft-deleted after ?since=<cursor> (absent
+    = from the start), oldest change first, up to ?limit= rows. Poll again
+    with the returned cursor; has_more means the next page is already
+    waiting. Soft-deleted tickets are included with is_deleted, archived
+    ones as a final row with archived=true.
+    """
+    _, tickets = _ticket_scope(request.user, Ticket.all_objects)
+    if tickets is None:
         return JsonResponse({"error": "Unauthorized"}, status=403)
+    _, archived = _ticket_scope(request.user, ArchivedTicket.objects)
 
-    data = []
+    try:
+        limit = min(_int_param(request, "limit") or CHANGES_DEFAULT_LIMIT, CHANGES_MAX_LIMIT)
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+    if limit < 1:
+        return JsonResponse({"error": "limit must be >= 1"}, status=400)
 
-    for ticket in tickets:
-        data.append({
-            "ticket_id": ticket.id,
-            "risk_score": ticket.risk_score,
-            "risk_level": ticket.risk_level,
-            "priority": ticket.priority,
-        })
+    try:
+        rows, cursor, has_more = changes_since(tickets, archived, request.GET.get("since"), limit)
+    except InvalidChangeCursor as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
 
-    return JsonResponse({"tickets": data})
-
-
-# 🔥 Category → Department mapping
-CATEGORY_DEPT_MAP = {
-    'NETWORK': 'Network Operations',
-    'CLOUD': 'Cloud Infrastructure',
-    'SERVER': 'Server Administration',
-    'DATABASE': 'Database Administration',
-    'DEVOPS': 'DevOps',
-    'CYBER': 'Cybersecurity',
-    'RISK': 'Risk & Compliance',
-    'APP': 'Application Support',
-    'AI': 'AI/ML Operations',
-    'DATA': 'Data Engineering',
-    'SRE': 'SRE (Site Reliability Engineering)',
-    'INCIDENT': 'Incident Response Team',
-}
+    return JsonResponse({
+        "cursor": cursor,
+        "has_more": has_more,
+        "changes": rows,
+    })
+
+
+# ---------------- RISK WHAT-IF API ---------------- #
+
+@require_role(ADMIN)
+def risk_whatif_api(request):
+    """
+    Re-score all tickets under alternative weights/thresholds without writing.
+    e.g. ?usage_weight=0.7&escalation_weight=8&low_max=35&medium_max=65&weight_CRITICAL=5
+    """
+    model = {}
+    try:
+        for param in ("usage_weight", "priority_factor", "escalation_weight"):
+            if param in request.GET:
+                model[param] = float(request.GET[param])
+
+        weights = {
+            priority: float(request.GET[f"weight_{priority}"])
+            for priority in PRIORITY_WEIGHTS
+            if f"weight_{priority}" in request.GET
+        }
+        if weights:
+            model["priority_weights"] = weights
+
+        if "low_max" in request.GET or "medium_max" in request.GET:
+            low_max, medium_max = DEFAULT_RISK_MODEL["thresholds"]
+            model["thresholds"] = (
+                float(request.GET.get("low_max", low_max)),
+                float(request.GET.get("medium_max", medium_max)),
+            )
+    except ValueError:
+        return JsonResponse({"error": "Model parameters must be numbers."}, status=400)
+
+    if "thresholds" in model and not model["thresholds"][0] < model["thresholds"][1]:
+        return JsonResponse({"error": "low_max must be below medium_max."}, status=400)
+
+    frame = get_risk_frame()
+
+    return JsonResponse({
+        "model": {
+            **DEFAULT_RISK_MODEL,
+            **model,
+            "priority_weights": {**PRIORITY_WEIGHTS, **model.get("priority_weights", {})},
+        },
+        "baseline": frame.simulate(),
+        "scenario": frame.simulate(**model),
+        "frame_loaded_at": frame.loaded_at,
+    })
 
 
 @login_required
@@ -300,69 +665,172 @@ def create_ticket(request):
         except Department.DoesNotExist:
             return HttpResponse("Department not configured in admin.")
 
-        try:
-            sla = SLAContract.objects.get(
+        if not has_engineers(department.id):
+            return HttpResponse("No engineers available in this department.")
+
+        # The strategy picks from the cached department roster; the locked load
+        # row keeps concurrent creates from pushing an engineer over capacity.
+        # When everyone is saturated the ticket is queued unassigned.
+        with transaction.atomic():
+            engineer = pick_engineer(department.id, priority, category)
+
+            ticket = Ticket.objects.create(
                 client=client,
-                priority=priority
+                description=description,
+                priority=priority,
+                category=category,
+                department=department,
+                assigned_to=engineer.user if engineer else None,
+                status="NEW"
             )
-        except SLAContract.DoesNotExist:
-            sla = None
 
-        engineers = EngineerProfile.objects.filter(
-            team__department=department
-        ).select_related("user")
+            if engineer:
+                notify_assignment(ticket)
 
-        if not engineers.exists():
-            return HttpResponse("No engineers available in this department.")
+        return redirect("client_dashboard")
 
-        least_loaded_engineer = None
-        least_ticket_count = None
+    return render(request, "create_ticket.html")
 
-        for engineer in engineers:
 
-            active_count = Ticket.objects.filter(
-                assigned_to=engineer.user,
-                status__in=["NEW", "IN_PROGRESS", "REOPENED"]
-            ).count()
+# ---------------- BULK TICKET INGESTION ---------------- #
 
-            if active_count >= 5:
-                continue
+MAX_BULK_TICKETS = 5000
 
-            if least_ticket_count is None or active_count < least_ticket_count:
-                least_ticket_count = active_count
-                least_loaded_engineer = engineer.user
 
-        if least_loaded_engineer is None:
-            return HttpResponse("All engineers currently overloaded.")
+def _parse_bulk_body(request):
+    """Tickets from a JSON array, {"tickets": [...]} or NDJSON body."""
+    body = request.body.decode("utf-8")
 
-        ticket = Ticket.objects.create(
-            client=client,
-            description=description,
-            priority=priority,
-            category=category,
-            department=department,
-            assigned_to=least_loaded_engineer,
-            status="NEW"
-        )
+    if request.content_type == "application/x-ndjson":
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+    payload = json.loads(body)
+    if isinstance(payload, dict):
+        payload = payload.get("tickets")
+    if not isinstance(payload, list):
+        raise ValueError("Expected a list of tickets.")
+    return payload
+
+
+@login_required
+def bulk_create_tickets(request):
+    """
+    POST many tickets at once. Clients create tickets for themselves;
+    admins give a `client` id per ticket.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST required"}, status=405)
+
+    if is_client(request.user):
+        client_id = get_roles(request.user).client_id
+    elif is_admin(request.user):
+        client_id = None
+    else:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
 
-        Notification.objects.create(
-            user=least_loaded_engineer,
-            ticket=ticket,
-            message=f"You have been assigned Ticket #{ticket.id}"
+    try:
+        rows = _parse_bulk_body(request)
+    except ValueError as exc:
+        # json.JSONDecodeError is a ValueError too
+        return JsonResponse({"error": f"Invalid payload: {exc}"}, status=400)
+
+    if len(rows) > MAX_BULK_TICKETS:
+        return JsonResponse(
+            {"error": f"At most {MAX_BULK_TICKETS} tickets per request."},
+            status=413
         )
 
-        if least_loaded_engineer.email:
-            send_mail(
-                subject="New SLA Ticket Assigned",
-                message=f"You have been assigned Ticket #{ticket.id}",
-                from_email="noreply@sla-enterprise.com",
-                recipient_list=[least_loaded_engineer.email],
-                fail_silently=True
-            )
+    result = ingest_tickets(rows, client_id=client_id)
 
-        return redirect("client_dashboard")
+    return JsonResponse(result.as_dict(), status=201 if result.created else 400)
 
-    return render(request, "create_ticket.html")
+
+# ---------------- LIVE STREAM (SSE) ---------------- #
+
+@login_required
+async def live_stream(request):
+    """
+    Server-Sent Events: new notifications and SLA state changes
+    (warning, critical, breach) of the user's tickets. Needs ASGI; under
+    WSGI it answers 204, which tells EventSource not to reconnect, instead
+    of pinning a worker thread for the life of the connection.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+
+    last_event_id = request.headers.get("Last-Event-ID")
+    if last_event_id is not None and not last_event_id.isdigit():
+        last_event_id = None
+
+    response = StreamingHttpResponse(
+        event_stream(user.id, int(last_event_id) if last_event_id else None),
+        content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+# ---------------- DATA EXPORT ---------------- #
+
+def _async_chunks(chunks):
+    """
+    Serve a sync iterator chunk by chunk under ASGI; Django would otherwise
+    consume it whole before sending. thread_sensitive keeps the DB cursor
+    on one thread.
+    """
+    chunks = iter(chunks)
+    sentinel = object()
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+
+    async def stream():
+        while True:
+            chunk = await next_chunk(chunks, sentinel)
+            if chunk is sentinel:
+                return
+            yield chunk
+
+    return stream()
+
+
+@require_role(ADMIN)
+def export_data(request, dataset):
+    """
+    Stream a dataset as CSV or NDJSON.
+    ?format=csv|ndjson, ?gzip=1, ?start=&end= (YYYY-MM-DD, inclusive)
+    and, for tickets, ?include_deleted=1.
+    """
+    if dataset not in DATASETS:
+        return JsonResponse({"error": f"Unknown dataset '{dataset}'"}, status=404)
+
+    fmt = request.GET.get("format", "csv")
+    compress = request.GET.get("gzip") == "1"
+
+    try:
+        start, end = _governance_range(request)
+        chunks = stream_export(
+            dataset,
+            fmt,
+            compress=compress,
+            start=start,
+            end=end,
+            include_deleted=request.GET.get("include_deleted") == "1"
+        )
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    if isinstance(request, ASGIRequest):
+        chunks = _async_chunks(chunks)
+
+    filename = f"{dataset}.{fmt}" + (".gz" if compress else "")
+    response = StreamingHttpResponse(
+        chunks,
+        content_type="application/gzip" if compress else CONTENT_TYPES[fmt]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
 
 # ---------------- AUTH ---------------- #
@@ -404,32 +872,36 @@ def update_ticket_status(request, ticket_id):
     if not is_engineer(request.user):
         return HttpResponse("Only engineers can update tickets.")
 
-    try:
-        ticket = Ticket.objects.get(id=ticket_id, assigned_to=request.user)
-    except Ticket.DoesNotExist:
-        return HttpResponse("Ticket not found or not assigned to you.")
+    lookup = {"assigned_to_id": request.user.id, "is_deleted": False}
 
     if request.method == "POST":
         new_status = request.POST.get("status")
-        old_status = ticket.status
-        ticket.status = new_status
-        ticket.save()
 
-        TicketAuditLog.objects.create(
-            ticket=ticket,
-            changed_by=request.user,
-            old_status=old_status,
-            new_status=ticket.status
-        )
-
-        TicketAudit.objects.create(
-            ticket=ticket,
-            action=f"Status changed to {new_status}",
-            performed_by=request.user
-        )
+        with transaction.atomic():
+            # An archived ticket is moved back to the hot table before it changes
+            ticket = get_ticket_for_update(ticket_id, **lookup)
+            if ticket is None:
+                return HttpResponse("Ticket not found or not assigned to you.")
+
+            old_status = ticket.status
+            ticket.status = new_status
+            ticket.save()
+
+            if new_status != old_status:
+                audit.record(
+                    "STATUS_CHANGED",
+                    ticket.id,
+                    request.user.id,
+                    old=old_status,
+                    new=new_status
+                )
 
         return redirect('dashboard')
 
+    ticket = get_ticket(ticket_id, **lookup)
+    if ticket is None:
+        return HttpResponse("Ticket not found or not assigned to you.")
+
     return render(request, "update_ticket.html", {"ticket": ticket})
 
 
@@ -438,10 +910,12 @@ def update_ticket_status(request, ticket_id):
 @login_required
 def governance_metrics(request):
 
-    total = Ticket.objects.count()
-    breached = Ticket.objects.filter(breached=True).count()
-    resolved = Ticket.objects.filter(status="RESOLVED").count()
-    in_progress = Ticket.objects.filter(status="IN_PROGRESS").count()
+    snapshot = governance_snapshot()
+
+    total = snapshot["total"]
+    breached = snapshot["breached"]
+    resolved = snapshot["resolved"]
+    in_progress = snapshot["in_progress"]
 
     data = {
         "total_tickets": total,
@@ -454,47 +928,89 @@ def governance_metrics(request):
     return JsonResponse(data)
 
 
+def _int_param(request, name):
+    value = request.GET.get(name)
+    return int(value) if value else None
+
+
+def _paginated(request, rows, default_size=50, max_size=200):
+    """
+    Slice rows by ?page=&page_size= into a JSON-ready page, or None when
+    neither is given. Raises ValueError for a non-integer page_size.
+    """
+    if "page" not in request.GET and "page_size" not in request.GET:
+        return None
+
+    page_size = min(max(_int_param(request, "page_size") or default_size, 1), max_size)
+    paginator = Paginator(rows, page_size)
+    page = paginator.get_page(request.GET.get("page"))
+
+    return {
+        "count": paginator.count,
+        "page": page.number,
+        "num_pages": paginator.num_pages,
+        "results": list(page.object_list),
+    }
+
+
 @login_required
 def engineer_performance(request):
 
-    engineers = EngineerProfile.objects.all()
-    performance_data = []
+    # ?team=&department= filter, ?sort=-success_rate|load|... orders
+    try:
+        performance_data = governance_engineer_performance(
+            team=_int_param(request, "team"),
+            department=_int_param(request, "department"),
+            sort=request.GET.get("sort")
+        )
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
 
-    for engineer in engineers:
+    try:
+        page = _paginated(request, performance_data)
+    except ValueError:
+        return JsonResponse({"error": "page_size must be an integer"}, status=400)
 
-        total = Ticket.objects.filter(assigned_to=engineer.user).count()
-        resolved = Ticket.objects.filter(
-            assigned_to=engineer.user,
-            status="RESOLVED"
-        ).count()
+    # Without ?page/?page_size the response stays the original bare list
+    if page is None:
+        return JsonResponse(performance_data, safe=False)
+    return JsonResponse(page)
 
-        breached = Ticket.objects.filter(
-            assigned_to=engineer.user,
-            breached=True
-        ).count()
 
-        performance_data.append({
-            "engineer": engineer.user.username,
-            "total": total,
-            "resolved": resolved,
-            "breached": breached,
-        })
+@require_role(ADMIN)
+def team_load_api(request):
+    try:
+        load = team_load(
+            department=_int_param(request, "department"),
+            sort=request.GET.get("sort")
+        )
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    try:
+        page = _paginated(request, load)
+    except ValueError:
+        return JsonResponse({"error": "page_size must be an integer"}, status=400)
 
-    return JsonResponse(performance_data, safe=False)
+    if page is None:
+        return JsonResponse(load, safe=False)
+    return JsonResponse(page)
 
 
 @login_required
 def system_health(request):
 
-    total = Ticket.objects.count()
-    breached = Ticket.objects.filter(breached=True).count()
+    snapshot = governance_snapshot()
+
+    total = snapshot["total"]
+    breached = snapshot["breached"]
 
     if total == 0:
         health = 100
     else:
         health = round(((total - breached) / total) * 100, 2)
 
-    risk_high = Ticket.objects.filter(risk_level="HIGH").count()
+    risk_high = snapshot["high_risk"]
 
     return JsonResponse({
         "system_sla_health": health,
@@ -508,6 +1024,8 @@ def system_health(request):
 def backend_status(request):
 
     return JsonResponse({
+        "sla_cache": sla_cache_stats(),
+        "live_connections": live_broker.connection_count(),
         "load_balancing": True,
         "sla_engine": True,
         "escalation": True,
@@ -524,27 +1042,40 @@ def backend_status(request):
 @login_required
 def reopen_ticket(request, ticket_id):
 
-    if not hasattr(request.user, "client"):
+    if not is_client(request.user):
         return HttpResponse("Only client can reopen ticket.")
 
-    ticket = get_object_or_404(
-        Ticket,
-        id=ticket_id,
-        client=request.user.client
-    )
+    client_id = get_roles(request.user).client_id
 
-    if ticket.status != "RESOLVED":
-        return HttpResponse("Only resolved tickets can be reopened.")
+    with transaction.atomic():
+        # Old resolved tickets wait in the archive; reopening brings them back
+        ticket = get_ticket_for_update(ticket_id, client_id=client_id, is_deleted=False)
+        if ticket is None:
+            raise Http404("No such ticket.")
 
-    ticket.status = "REOPENED"
-    ticket.resolved_at = None
-    ticket.save()
+        if ticket.status != "RESOLVED":
+            return HttpResponse("Only resolved tickets can be reopened.")
 
-    Notification.objects.create(
-        user=ticket.assigned_to,
-        ticket=ticket,
-        message=f"Ticket #{ticket.id} has been reopened."
-    )
+        ticket.status = "REOPENED"
+        ticket.resolved_at = None
+        ticket.save()
+
+        audit.record("REOPENED", ticket.id, request.user.id)
+
+        if ticket.assigned_to:
+            notify(
+                ticket.assigned_to_id,
+                f"Ticket #{ticket.id} has been reopened.",
+                ticket.id,
+                "REOPENED"
+            )
+
+            queue_email(
+                ticket.assigned_to.email,
+                "SLA Ticket Reopened",
+                f"Ticket #{ticket.id} has been reopened by the client.",
+                ticket
+            )
 
     return redirect("client_dashboard")
 
@@ -554,21 +1085,35 @@ def reopen_ticket(request, ticket_id):
 @login_required
 def delete_ticket(request, ticket_id):
 
-    if not hasattr(request.user, "client"):
+    if not is_client(request.user):
         return HttpResponse("Only clients can delete tickets.")
 
-    ticket = get_object_or_404(
-        Ticket,
-        id=ticket_id,
-        client=request.user.client
-    )
+    with transaction.atomic():
+        ticket = get_ticket_for_update(
+            ticket_id,
+            client_id=get_roles(request.user).client_id,
+            is_deleted=False
+        )
+        if ticket is None:
+            raise Http404("No such ticket.")
 
-    ticket.soft_delete()
+        ticket.soft_delete()
 
-    Notification.objects.create(
-        user=ticket.assigned_to,
-        ticket=ticket,
-        message=f"Ticket #{ticket.id} was deleted by client."
-    )
+        audit.record("DELETED", ticket.id, request.user.id)
+
+        if ticket.assigned_to:
+            notify(
+                ticket.assigned_to_id,
+                f"Ticket #{ticket.id} was deleted by client.",
+                ticket.id,
+                "DELETED"
+            )
+
+            queue_email(
+                ticket.assigned_to.email,
+                "SLA Ticket Deleted",
+                f"Ticket #{ticket.id} was deleted by the client.",
+                ticket
+            )
 
     return redirect("client_dashboard")
\ No newline at end of file
@@ -46,6 +46,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.roles.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -120,4 +121,30 @@ STATIC_URL = '/static/'
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'   # because your dashboard url is path('', dashboard, name='dashboard')
 
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
\ No newline at end of file
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Ticket assignment policy: least_loaded, priority_weighted, round_robin or skill_match
+TICKET_ASSIGNMENT_STRATEGY = 'least_loaded'
+
+# Notifications: repeats of an unread event within this window fold into one row;
+# a user getting more rows than the threshold in one batch gets a single digest
+NOTIFICATION_COALESCE_SECONDS = 600
+NOTIFICATION_DIGEST_THRESHOLD = 10
+
+# Live stream (api/stream/, ASGI only): seconds between database polls per process
+LIVE_STREAM_POLL_SECONDS = 2
+
+# Ticket archive (manage.py archive_tickets): age in days before resolved /
+# soft-deleted tickets move out of the hot table
+TICKET_ARCHIVE_RESOLVED_DAYS = 365
+TICKET_ARCHIVE_DELETED_DAYS = 30
+
+# Seconds a user's resolved roles (core.roles) stay cached between requests
+ROLE_CACHE_SECONDS = 60
+
+# Change feed (api/tickets/changes/): seconds a write must age before the feed
+# serves it, covering transactions still open when their rows were stamped
+CHANGE_FEED_SETTLE_SECONDS = 5
+
+# Seconds between checks of the shared SLA cache generation (core.sla_cache) per process
+SLA_CACHE_CHECK_SECONDS = 5